@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead of hox CLI invocations: one at a time vs. bounded concurrent calls.
+
+Runs against bench/stub_hox.py (no network, no real hox needed) in a
+throwaway HOME, so manifests and the index are never touched. The stub's
+--startup-ms is a sleep (waiting on the network); the Python start-up before
+it is CPU. With --startup-ms 0 on a single core there is nothing to overlap
+and concurrent calls are no faster, or slightly slower, than serial ones.
+
+Usage:
+    python bench/bench_hox_concurrency.py [--calls 200] [--runs 500] [--startup-ms 80] [--workers 8]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="hox calls per overhead measurement")
+    parser.add_argument("--runs", type=int, default=500, help="runs in the import_to_hox manifest")
+    parser.add_argument("--startup-ms", type=float, default=80, help="stub start-up delay per call")
+    parser.add_argument("--workers", type=int, default=8, help="HOX_WORKERS for the pool")
+    opts = parser.parse_args()
+
+    # Configure before main.py is imported (it reads these at import time)
+    home = tempfile.mkdtemp(prefix="hox-bench-")
+    os.environ.update({
+        "HOME": home,
+        "HOX_BIN": str(ROOT / "bench" / "stub_hox.py"),
+        "HOX_WORKERS": str(opts.workers),
+        "HOX_STUB_STARTUP_MS": str(opts.startup_ms),
+        "HOX_STUB_LOG": os.path.join(home, "hox_calls.jsonl"),
+    })
+    sys.path.insert(0, str(ROOT))
+    import main as hox_mcp
+
+    calls = [["get", "jobs", f"--resource-id=reads-{i}"] for i in range(opts.calls)]
+
+    start = time.perf_counter()
+    for args in calls:
+        hox_mcp._run_hox(args)
+    serial = (time.perf_counter() - start) / opts.calls
+
+    start = time.perf_counter()
+    hox_mcp._run_hox_batch(calls)
+    concurrent = (time.perf_counter() - start) / opts.calls
+
+    # End to end: import a manifest (set, dedup search, imports, tags), first
+    # with a single worker (one process at a time), then concurrently
+    runs = [f"SRR{10_000_000 + i}" for i in range(opts.runs)]
+    timings = {}
+    pool = hox_mcp._HOX_POOL
+    for label, executor in (("serial", ThreadPoolExecutor(max_workers=1)), ("concurrent", pool)):
+        hox_mcp._HOX_POOL = executor
+        hox_mcp._save_manifest({
+            "name": f"bench_{label}", "status": "approved", "tags": {"bench": "hox_concurrency"},
+            "accessions": [{"accession": "SRP000001", "runs": runs}], "total_runs": len(runs),
+        })
+        with open(os.environ["HOX_STUB_LOG"]) as f:
+            before = sum(1 for _ in f)
+        start = time.perf_counter()
+        result = json.loads(hox_mcp.import_to_hox(f"bench_{label}", dedup=False))
+        elapsed = time.perf_counter() - start
+        with open(os.environ["HOX_STUB_LOG"]) as f:
+            timings[label] = (elapsed, result, sum(1 for _ in f) - before)
+    hox_mcp._HOX_POOL = pool
+
+    print(f"stub start-up {opts.startup_ms:.0f} ms, {opts.workers} workers")
+    print(f"{'per-call, serial':<32}{serial * 1000:>10.1f} ms")
+    print(f"{'per-call, concurrent':<32}{concurrent * 1000:>10.1f} ms   ({serial / concurrent:.2f}x)")
+    for label, (elapsed, result, calls) in timings.items():
+        print(f"{f'import_to_hox {opts.runs} runs, {label}':<32}{elapsed:>10.2f} s    "
+              f"({result['started']} started, {result['tagged']} tagged, {calls} hox calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the discovery, manifest and import paths.
+
+Everything runs offline: NCBI calls go to an in-process bench/ncbi_standin.py,
+hox calls to bench/stub_hox.py, and manifests, the index and the run store
+live in a throwaway HOME.
+
+Results are saved per commit (git sha, "+dirty" for uncommitted trees) to
+bench/results.json, so two commits can be compared:
+
+Usage:
+    python bench/bench_suite.py                      # run all, save under HEAD
+    python bench/bench_suite.py --only list_runs     # substring filter
+    python bench/bench_suite.py --quick              # smaller inputs, one round
+    python bench/bench_suite.py --list               # saved commits
+    python bench/bench_suite.py --compare abc123     # saved abc123 vs HEAD
+    python bench/bench_suite.py --compare abc123 def456 --threshold 1.2
+
+--compare exits 1 when any benchmark's median got slower than the threshold
+ratio (default 1.10), so it can gate a CI job.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS = Path(__file__).resolve().parent / "results.json"
+
+# Synthetic studies served by the stand-in: accession -> experiments (one run each)
+STUDY_SIZES = {500: "SRP900500", 5000: "SRP905000", 50000: "SRP950000"}
+
+# (name, setup, rounds): setup(hm, quick) returns the callable to time
+BENCHMARKS = []
+
+
+def benchmark(name: str, rounds: int = 5):
+    def register(setup):
+        BENCHMARKS.append((name, setup, rounds))
+        return setup
+    return register
+
+
+# --- Discovery ---
+
+@benchmark("parse_entrez_summary.sra_2k", rounds=10)
+def _parse_sra(hm, quick):
+    from ncbi_standin import Synthetic
+    synthetic = Synthetic({}, 0)
+    items = [synthetic.sra_docsum(str(90050000000 + i)) for i in range(500 if quick else 2000)]
+    return lambda: [hm._parse_entrez_summary(item, "sra") for item in items]
+
+
+@benchmark("parse_entrez_summary.gds_2k", rounds=10)
+def _parse_gds(hm, quick):
+    from ncbi_standin import Synthetic
+    synthetic = Synthetic({}, 0)
+    items = [synthetic.gds_docsum(str(200000000 + i)) for i in range(500 if quick else 2000)]
+    return lambda: [hm._parse_entrez_summary(item, "gds") for item in items]
+
+
+@benchmark("search_sra.100_studies", rounds=3)
+def _search_sra(hm, quick):
+    return lambda: hm._search_sra("brain RNA-seq", "Homo sapiens", 100, None)
+
+
+def _list_runs(size):
+    def setup(hm, quick):
+        study = STUDY_SIZES[size]
+        return lambda: hm._list_runs_entrez(study, fields="accession,spots")
+    return setup
+
+
+benchmark("list_runs_entrez.500", rounds=5)(_list_runs(500))
+benchmark("list_runs_entrez.5k", rounds=3)(_list_runs(5000))
+benchmark("list_runs_entrez.50k", rounds=1)(_list_runs(50000))
+
+
+@benchmark("extract_ffq_summary.10k_runs", rounds=5)
+def _ffq_summary(hm, quick):
+    return lambda: hm._extract_ffq_summary("SRP950000", _ffq_tree(1000 if quick else 10000))
+
+
+def _ffq_tree(runs: int) -> dict:
+    """A study as ffq returns it: samples -> experiments -> runs -> files."""
+    rng = random.Random(runs)
+    samples = {}
+    for i in range(runs):
+        srr, srx, srs = f"SRR{20000000 + i}", f"SRX{20000000 + i}", f"SRS{20000000 + i // 2}"
+        sample = samples.setdefault(srs, {
+            "accession": srs, "title": f"sample {i // 2}", "organism": "Homo sapiens",
+            "attributes": {"tissue": rng.choice(["blood", "liver"]), "age": str(rng.randint(18, 90))},
+            "experiments": {},
+        })
+        sample["experiments"][srx] = {
+            "accession": srx, "title": f"experiment {i}", "platform": "ILLUMINA",
+            "instrument": "Illumina NovaSeq 6000",
+            "runs": {srr: {
+                "accession": srr, "experiment": srx, "study": "SRP950000", "sample": srs,
+                "title": f"run {i}", "library_strategy": "RNA-Seq", "library_source": "TRANSCRIPTOMIC",
+                "spots": str(rng.randint(10**7, 10**8)), "bases": str(rng.randint(10**9, 10**10)),
+                "files": {"ftp": [{"url": f"ftp://ftp.sra.ebi.ac.uk/{srr}_{r}.fastq.gz", "md5": "0" * 32,
+                                   "size": str(rng.randint(10**8, 10**9))} for r in (1, 2)]},
+            }},
+        }
+    return {"SRP950000": {"accession": "SRP950000", "title": "Synthetic study",
+                          "abstract": "Synthetic abstract " * 20, "samples": samples}}
+
+
+# --- Manifests ---
+
+@benchmark("list_manifests.1k", rounds=5)
+def _list_manifests(hm, quick):
+    for i in range(100 if quick else 1000):
+        hm._save_manifest({
+            "name": f"bench_list_{i:04d}", "description": "list_manifests benchmark",
+            "status": "pending", "tags": {"bench": "list"}, "created": "2025-01-01T00:00:00",
+            "accessions": [{"accession": f"SRP{800000 + i}", "status": "ok",
+                            "runs": [f"SRR{80000000 + i * 20 + j}" for j in range(20)]}],
+            "total_runs": 20,
+        })
+    return lambda: hm.list_manifests()
+
+
+def _export(fmt):
+    def setup(hm, quick):
+        import web_app
+        name = _export_manifest(hm, 10000 if quick else 100000)
+        manifest = hm._load_manifest(name)
+        if fmt == "json":
+            return lambda: sum(len(chunk) for chunk in web_app._export_json(name, manifest))
+        return lambda: sum(len(chunk) for chunk in web_app._export_lines(manifest, fmt))
+    return setup
+
+
+def _export_manifest(hm, runs: int) -> str:
+    name = f"bench_export_{runs}"
+    if hm._manifest_path(name).exists():
+        return name
+    rng = random.Random(runs)
+    entries = []
+    for study in range(runs // 1000):
+        records = [{
+            "accession": f"SRR{30000000 + study * 1000 + i}", "strategy": rng.choice(["RNA-Seq", "WGS"]),
+            "platform": "Illumina NovaSeq 6000", "spots": rng.randint(10**7, 10**8),
+            "bases": rng.randint(10**9, 10**10), "source": "TRANSCRIPTOMIC",
+        } for i in range(1000)]
+        hm._store_runs(records, study=f"SRP{700000 + study}")
+        entries.append({"accession": f"SRP{700000 + study}", "status": "ok",
+                        "runs": [r["accession"] for r in records]})
+    hm._save_manifest({"name": name, "description": "export benchmark", "status": "approved",
+                       "tags": {}, "accessions": entries, "total_runs": runs})
+    return name
+
+
+benchmark("export.100k.csv", rounds=3)(_export("csv"))
+benchmark("export.100k.ndjson", rounds=3)(_export("ndjson"))
+benchmark("export.100k.json", rounds=3)(_export("json"))
+
+
+# --- Import ---
+
+@benchmark("import_to_hox.200_runs", rounds=2)
+def _import(hm, quick):
+    runs = [f"SRR{40000000 + i}" for i in range(50 if quick else 200)]
+    hm._store_runs([{"accession": r, "spots": 10**7, "bases": 10**9} for r in runs], study="SRP600000")
+    manifest = {"name": "bench_import", "status": "approved", "tags": {"bench": "import"},
+                "accessions": [{"accession": "SRP600000", "status": "ok", "runs": runs}],
+                "total_runs": len(runs)}
+
+    def run():
+        hm._save_manifest(manifest)  # drops the previous round's import results
+        return hm.import_to_hox("bench_import")
+    return run
+
+
+# --- Harness ---
+
+def _start_standin(quick: bool) -> str:
+    import ncbi_standin
+    sizes = {acc: min(size, 5000) if quick else size for size, acc in STUDY_SIZES.items()}
+    opts = argparse.Namespace(
+        fixtures=tempfile.mkdtemp(prefix="standin-"), record=False, strict=False,
+        latency_ms=0, jitter_ms=0, rate_429=0, study=list(sizes.items()), default_hits=2000,
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ncbi_standin.make_handler(ncbi_standin.StandIn(opts)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _measure(fn, rounds: int) -> dict:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": rounds,
+    }
+
+
+def _git_sha() -> str:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{sha}+dirty" if dirty else sha
+
+
+def _load_results() -> dict:
+    return json.loads(RESULTS.read_text()) if RESULTS.exists() else {}
+
+
+def _resolve(results: dict, ref: str) -> str:
+    """Saved key for a sha prefix (exact key wins, then the newest prefix match)."""
+    if ref in results:
+        return ref
+    matches = [k for k in results if k.startswith(ref)]
+    if not matches:
+        sys.exit(f"no saved results for {ref!r} (see --list)")
+    return max(matches, key=lambda k: results[k]["date"])
+
+
+def run(opts) -> None:
+    home = tempfile.mkdtemp(prefix="hox-bench-")
+    sys.path.insert(0, str(ROOT))
+    sys.path.insert(0, str(ROOT / "bench"))
+    base = _start_standin(opts.quick)
+    # Configure before main.py is imported (it reads these at import time)
+    os.environ.update({
+        "HOME": home,
+        "HOX_NCBI_BASE": f"{base}/entrez/eutils",
+        "HOX_ENA_BASE": f"{base}/ena",
+        "HOX_NCBI_RPS": "0",
+        "HOX_BIN": str(ROOT / "bench" / "stub_hox.py"),
+        "HOX_STUB_STARTUP_MS": str(opts.hox_startup_ms),
+    })
+    import main as hm
+
+    selected = [b for b in BENCHMARKS if not opts.only or any(o in b[0] for o in opts.only.split(","))]
+    sha = _git_sha()
+    measured = {}
+    print(f"{'benchmark':<34}{'median':>10}{'min':>10}{'stdev':>10}  rounds   ({sha})")
+    for name, setup, rounds in selected:
+        fn = setup(hm, opts.quick)
+        fn()  # warm-up: caches, imports, first-touch of the store
+        stats = _measure(fn, 1 if opts.quick else rounds)
+        measured[name] = stats
+        print(f"{name:<34}{stats['median'] * 1000:>8.1f}ms{stats['min'] * 1000:>8.1f}ms"
+              f"{stats['stdev'] * 1000:>8.1f}ms  {stats['rounds']:>6}")
+
+    if opts.quick or opts.no_save:
+        return
+    results = _load_results()
+    saved = results.setdefault(sha, {"results": {}})
+    saved.update({
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.machine()} x{os.cpu_count()}",
+    })
+    saved["results"].update(measured)
+    RESULTS.write_text(json.dumps(results, indent=2))
+    print(f"saved under {sha} in {RESULTS.relative_to(ROOT)}")
+
+
+def compare(base_ref: str, head_ref: str, threshold: float) -> int:
+    results = _load_results()
+    base_key, head_key = _resolve(results, base_ref), _resolve(results, head_ref)
+    base, head = results[base_key]["results"], results[head_key]["results"]
+
+    print(f"{'benchmark':<34}{base_key:>14}{head_key:>14}{'ratio':>9}")
+    regressions = 0
+    for name in sorted(set(base) | set(head)):
+        if name not in base or name not in head:
+            old = f"{base[name]['median'] * 1000:.1f}ms" if name in base else "-"
+            new = f"{head[name]['median'] * 1000:.1f}ms" if name in head else "-"
+            print(f"{name:<34}{old:>14}{new:>14}")
+            continue
+        ratio = head[name]["median"] / base[name]["median"] if base[name]["median"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag, regressions = "  SLOWER", regressions + 1
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:<34}{base[name]['median'] * 1000:>12.1f}ms{head[name]['median'] * 1000:>12.1f}ms"
+              f"{ratio:>8.2f}x{flag}")
+    if regressions:
+        print(f"{regressions} benchmark(s) slower than {threshold:.2f}x")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help="comma-separated substrings of benchmark names to run")
+    parser.add_argument("--quick", action="store_true", help="small inputs, one round, nothing saved")
+    parser.add_argument("--no-save", action="store_true", help="don't record the results")
+    parser.add_argument("--hox-startup-ms", type=float, default=20, help="stub hox start-up delay per call")
+    parser.add_argument("--compare", nargs="+", metavar="SHA", help="BASE [HEAD] saved results to compare")
+    parser.add_argument("--threshold", type=float, default=1.10, help="median ratio counted as a regression")
+    parser.add_argument("--list", action="store_true", help="list saved results")
+    opts = parser.parse_args()
+
+    if opts.list:
+        for key, saved in sorted(_load_results().items(), key=lambda kv: kv[1]["date"]):
+            print(f"{key:<16}{saved['date']}  {len(saved['results'])} benchmarks  {saved.get('machine', '')}")
+    elif opts.compare:
+        head = opts.compare[1] if len(opts.compare) > 1 else _git_sha()
+        sys.exit(compare(opts.compare[0], head, opts.threshold))
+    else:
+        run(opts)
+
+
+if __name__ == "__main__":
+    main()
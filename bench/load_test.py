@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Load test for web_app: replays UI sessions at increasing concurrency.
+
+Each virtual user loops the curator's path through the UI: search SRA, list
+a study's runs, create a manifest from them, approve it, export it as CSV and
+poll its import status. Every stage runs for --duration seconds at the next
+concurrency level and reports, per route, p50/p95/p99 latency, throughput and
+error rate. /api/health is sampled alongside to show how busy FastAPI's
+worker thread pool gets (busy threads, requests queued for one).
+
+By default the app is started here, under uvicorn, against the NCBI stand-in
+and the stub hox, in a throwaway HOME; --url targets a running server instead.
+
+Usage:
+    python bench/load_test.py --users 1,4,16,64 --duration 20
+    python bench/load_test.py --url http://127.0.0.1:8000 --users 8 --json load.json
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+
+QUERIES = ["brain RNA-seq", "prefrontal cortex", "liver single cell", "blood ATAC", "lung WGS",
+           "hippocampus depression", "colon cancer", "schizophrenia"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url: str, proc: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            sys.exit(f"{proc.args[0]} exited with {proc.returncode}")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    sys.exit(f"timed out waiting for {url}")
+
+
+def start_servers(opts) -> tuple:
+    """Start the NCBI stand-in and uvicorn web_app; returns (base url, processes)."""
+    standin_port, app_port = _free_port(), _free_port()
+    standin = subprocess.Popen(
+        [sys.executable, str(ROOT / "bench" / "ncbi_standin.py"), "--port", str(standin_port),
+         "--latency-ms", str(opts.ncbi_latency_ms), "--fixtures", tempfile.mkdtemp(prefix="standin-")],
+        stdout=subprocess.DEVNULL,
+    )
+    _wait_for(f"http://127.0.0.1:{standin_port}/_standin/stats", standin)
+
+    env = dict(os.environ,
+               HOME=tempfile.mkdtemp(prefix="hox-load-"),
+               HOX_NCBI_BASE=f"http://127.0.0.1:{standin_port}/entrez/eutils",
+               HOX_ENA_BASE=f"http://127.0.0.1:{standin_port}/ena",
+               HOX_NCBI_RPS="0",
+               HOX_BIN=str(ROOT / "bench" / "stub_hox.py"))
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "web_app:app", "--port", str(app_port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    base = f"http://127.0.0.1:{app_port}"
+    _wait_for(f"{base}/api/health", app)
+    return base, [app, standin]
+
+
+class Recorder:
+    """Latency samples and errors per route for the current stage."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, session: requests.Session, route: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, url, timeout=120, **kwargs)
+            resp.content  # read the whole (possibly streamed) body
+            ok = resp.status_code < 400
+            if ok and resp.headers.get("content-type", "").startswith("application/json"):
+                # Tools report failures as {"error": ...} with a 200
+                data = resp.json()
+                ok = not (isinstance(data, dict) and "error" in data)
+        except (requests.RequestException, ValueError):
+            resp, ok = None, False
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.samples[route].append(elapsed)
+            if not ok:
+                self.errors[route] += 1
+        return resp if ok else None
+
+
+def user_session(base: str, rec: Recorder, user: int, stop: threading.Event):
+    """One virtual user: search -> runs -> create -> approve -> export -> status, repeated."""
+    session = requests.Session()
+    rng = random.Random(user)
+    iteration = 0
+    while not stop.is_set():
+        iteration += 1
+        resp = rec.call(session, "GET /api/search", "GET", f"{base}/api/search",
+                        params={"query": rng.choice(QUERIES), "database": "sra", "limit": 20})
+        studies = resp.json().get("studies", []) if resp is not None else []
+        if not studies:
+            continue
+        study = rng.choice(studies)["accession"]
+
+        resp = rec.call(session, "GET /api/runs/{study}", "GET", f"{base}/api/runs/{study}")
+        runs = resp.json().get("runs", []) if resp is not None else []
+        if not runs:
+            continue
+
+        name = f"load_u{user}_{iteration}"
+        resp = rec.call(session, "POST /api/manifests", "POST", f"{base}/api/manifests", json={
+            "name": name, "description": "load test", "tags": "source=load_test",
+            "studies": [{"accession": study, "title": "", "runs": runs}],
+        })
+        if resp is None:
+            continue
+        rec.call(session, "POST /api/manifests/{name}/approve", "POST", f"{base}/api/manifests/{name}/approve")
+        rec.call(session, "GET /api/manifests/{name}/export", "GET", f"{base}/api/manifests/{name}/export",
+                 params={"format": "csv"})
+        rec.call(session, "GET /api/import-status", "GET", f"{base}/api/import-status", params={"manifest": name})
+
+
+def sample_pool(base: str, samples: list, stop: threading.Event, interval: float):
+    session = requests.Session()
+    while not stop.wait(interval):
+        try:
+            samples.append(session.get(f"{base}/api/health", timeout=5).json()["threadpool"])
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+
+
+def _percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_stage(base: str, users: int, duration: float, interval: float) -> dict:
+    rec = Recorder()
+    stop = threading.Event()
+    pool_samples = []
+    threads = [threading.Thread(target=user_session, args=(base, rec, u, stop), daemon=True)
+               for u in range(users)]
+    threads.append(threading.Thread(target=sample_pool, args=(base, pool_samples, stop, interval), daemon=True))
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start  # includes draining in-flight requests
+
+    routes = {}
+    for route, times in sorted(rec.samples.items()):
+        routes[route] = {
+            "requests": len(times),
+            "errors": rec.errors[route],
+            "error_rate": rec.errors[route] / len(times),
+            "rps": len(times) / elapsed,
+            "p50_ms": _percentile(times, 0.50) * 1000,
+            "p95_ms": _percentile(times, 0.95) * 1000,
+            "p99_ms": _percentile(times, 0.99) * 1000,
+        }
+    pool = {}
+    if pool_samples:
+        pool = {
+            "size": pool_samples[-1]["size"],
+            "busy_mean": statistics.fmean(s["busy"] for s in pool_samples),
+            "busy_max": max(s["busy"] for s in pool_samples),
+            "waiting_mean": statistics.fmean(s["waiting"] for s in pool_samples),
+            "waiting_max": max(s["waiting"] for s in pool_samples),
+            "saturated": sum(s["busy"] >= s["size"] for s in pool_samples) / len(pool_samples),
+        }
+    total = sum(r["requests"] for r in routes.values())
+    return {"users": users, "seconds": elapsed, "requests": total, "rps": total / elapsed,
+            "errors": sum(r["errors"] for r in routes.values()), "routes": routes, "threadpool": pool}
+
+
+def print_stage(stage: dict):
+    print(f"\n{stage['users']} users: {stage['requests']} requests in {stage['seconds']:.1f}s, "
+          f"{stage['rps']:.1f} req/s, {stage['errors']} errors")
+    print(f"  {'route':<38}{'req/s':>8}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for route, r in stage["routes"].items():
+        print(f"  {route:<38}{r['rps']:>8.2f}{r['error_rate'] * 100:>6.1f}%"
+              f"{r['p50_ms']:>7.0f}ms{r['p95_ms']:>7.0f}ms{r['p99_ms']:>7.0f}ms")
+    pool = stage["threadpool"]
+    if pool:
+        print(f"  threadpool: {pool['busy_mean']:.1f} busy on average (max {pool['busy_max']} of {pool['size']}), "
+              f"{pool['waiting_mean']:.1f} queued (max {pool['waiting_max']}), "
+              f"saturated {pool['saturated'] * 100:.0f}% of samples")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="target a running web_app instead of starting one")
+    parser.add_argument("--users", default="1,4,16,64", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per concurrency level")
+    parser.add_argument("--ncbi-latency-ms", type=float, default=50, help="stand-in latency per NCBI call")
+    parser.add_argument("--sample-interval", type=float, default=0.25, help="seconds between /api/health samples")
+    parser.add_argument("--json", help="also write the results to this file")
+    opts = parser.parse_args()
+
+    procs = []
+    base = opts.url.rstrip("/") if opts.url else None
+    if base is None:
+        base, procs = start_servers(opts)
+    try:
+        stages = []
+        for users in (int(u) for u in opts.users.split(",")):
+            stage = run_stage(base, users, opts.duration, opts.sample_interval)
+            print_stage(stage)
+            stages.append(stage)
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+    if opts.json:
+        Path(opts.json).write_text(json.dumps({"url": base, "stages": stages}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the NCBI E-utilities and ENA endpoints used by main.py/ffq.
+
+Answers from recorded fixtures when it has one for a request, otherwise from
+deterministic synthetic data, so benchmarks and load tests run air-gapped and
+give the same answers every time.
+
+    replay (default)  fixtures first, synthetic data for everything else
+    --strict          fixtures only (404 for unrecorded requests)
+    --record          forward to the real services and save every 200 response
+
+Synthetic data covers what main.py parses: SRA/GDS esearch (counts, idlists,
+history server), esummary docsums, gds->sra elink and BioSample efetch. ENA and
+the SRA efetch calls ffq makes are fixtures-only: record them once with --record.
+
+Usage:
+    python bench/ncbi_standin.py --port 8765 --latency-ms 40 --rate-429 0.02 \\
+        --study SRP999999:50000
+    HOX_NCBI_BASE=http://127.0.0.1:8765/entrez/eutils HOX_ENA_BASE=http://127.0.0.1:8765/ena \\
+        HOX_NCBI_RPS=0 python test_tools.py list_runs '{"study_accession": "SRP999999"}'
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+UPSTREAM = {
+    "/entrez/eutils": "https://eutils.ncbi.nlm.nih.gov/entrez/eutils",
+    "/ena": "https://www.ebi.ac.uk/ena",
+}
+
+# Query parameters that don't change the answer (left out of fixture keys)
+VOLATILE_PARAMS = {"api_key", "tool", "email"}
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+STRATEGIES = ["RNA-Seq", "WGS", "WXS", "ChIP-Seq", "ATAC-seq", "miRNA-Seq", "Bisulfite-Seq"]
+SOURCES = {"RNA-Seq": "TRANSCRIPTOMIC", "miRNA-Seq": "TRANSCRIPTOMIC"}
+PLATFORMS = ["Illumina NovaSeq 6000", "Illumina HiSeq 2500", "Illumina NextSeq 500", "NextSeq 2000"]
+TISSUES = ["prefrontal cortex", "hippocampus", "blood", "liver", "lung", "colon"]
+
+_STUDY_RE = re.compile(r"\b((?:SRP|ERP|DRP)\d+|PRJ(?:NA|EB|DB)\d+)\b", re.IGNORECASE)
+
+
+class Synthetic:
+    """Deterministic SRA/GEO records; study sizes can be scaled up per accession."""
+
+    def __init__(self, studies: dict, default_hits: int):
+        self.studies = studies  # accession -> experiment count
+        self.default_hits = default_hits
+        self.histories = {}  # WebEnv -> uid list
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _seed(*parts) -> int:
+        return int(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:12], 16)
+
+    def _study_for(self, term: str) -> tuple:
+        """(study accession, experiment count, uid base) the term resolves to."""
+        match = _STUDY_RE.search(term)
+        if match:
+            study = match.group(1).upper()
+            count = self.studies.get(study, 24)
+        else:
+            study = f"SRP{self._seed(term) % 900000 + 100000}"
+            count = self.default_hits
+        return study, count, int(study[3:] if study.startswith(("SRP", "ERP", "DRP")) else study[5:]) * 100000
+
+    # --- SRA ---
+
+    def esearch(self, db: str, params: dict) -> dict:
+        term = params.get("term", "")
+        retstart = int(params.get("retstart", 0))
+        retmax = int(params.get("retmax", 20))
+        if "[MDAT]" in term:
+            uids = []  # nothing changed since any date
+        elif db == "sra":
+            study, count, base = self._study_for(term)
+            uids = [str(base + i) for i in range(count)]
+        elif db == "gds":
+            uids = [str(200000000 + self._seed(term, i) % 99999) for i in range(self.default_hits)]
+        else:
+            uids = [str(self._seed(db, term, i) % 10**8) for i in range(self.default_hits)]
+
+        result = {"count": str(len(uids)), "retmax": str(min(retmax, len(uids))), "retstart": str(retstart),
+                  "idlist": uids[retstart:retstart + retmax]}
+        if params.get("usehistory") == "y":
+            webenv = f"MCID_STANDIN_{self._seed(db, term)}"
+            with self.lock:
+                self.histories[webenv] = uids
+            result.update({"webenv": webenv, "querykey": "1"})
+        return {"header": {"type": "esearch", "version": "0.3"}, "esearchresult": result}
+
+    def _uids(self, params: dict) -> list:
+        if params.get("WebEnv"):
+            with self.lock:
+                uids = self.histories.get(params["WebEnv"], [])
+            start = int(params.get("retstart", 0))
+            return uids[start:start + int(params.get("retmax", 20))]
+        ids = params.get("id", "")
+        ids = ids if isinstance(ids, list) else [ids]
+        return [u for chunk in ids for u in str(chunk).split(",") if u]
+
+    def sra_docsum(self, uid: str) -> dict:
+        n = int(uid)
+        study_num, i = divmod(n, 100000)
+        rng = random.Random(n)
+        study = f"SRP{study_num:06d}"
+        strategy = rng.choice(STRATEGIES)
+        platform = rng.choice(PLATFORMS)
+        spots = rng.randint(5_000_000, 80_000_000)
+        bases = spots * rng.choice([100, 150, 200, 300])
+        biosample = f"SAMN{10000000 + n % 90000000}"
+        date = f"20{rng.randint(12, 25)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+        expxml = (
+            f'<Summary><Title>{study} sample {i + 1}</Title>'
+            f'<Platform instrument_model="{platform}">ILLUMINA</Platform>'
+            f'<Statistics total_runs="1" total_spots="{spots}" total_bases="{bases}" total_size="{bases // 2}" '
+            f'load_done="true" cluster_name="public"/></Summary>'
+            f'<Experiment acc="SRX{n}" ver="1" status="public" name="{study} sample {i + 1}"/>'
+            f'<Study acc="{study}" name="Synthetic study {study}"/>'
+            f'<Organism taxid="9606" ScientificName="Homo sapiens"/>'
+            f'<Sample acc="SRS{n}" name=""/>'
+            f'<Library_descriptor LIBRARY_STRATEGY="{strategy}" LIBRARY_SOURCE="{SOURCES.get(strategy, "GENOMIC")}">'
+            f'<LIBRARY_NAME>lib{i}</LIBRARY_NAME><LIBRARY_STRATEGY>{strategy}</LIBRARY_STRATEGY>'
+            f'<LIBRARY_SOURCE>{SOURCES.get(strategy, "GENOMIC")}</LIBRARY_SOURCE>'
+            f'<LIBRARY_SELECTION>cDNA</LIBRARY_SELECTION><LIBRARY_LAYOUT><PAIRED/></LIBRARY_LAYOUT>'
+            f'</Library_descriptor>'
+            f'<Bioproject>PRJNA{study_num}</Bioproject><Biosample>{biosample}</Biosample>'
+        )
+        runs = (f'<Run acc="SRR{n}" total_spots="{spots}" total_bases="{bases}" load_done="true" '
+                f'is_public="true" cluster_name="public" static_data_available="true"/>')
+        return {"uid": uid, "expxml": expxml, "runs": runs, "extlinks": "",
+                "createdate": date, "updatedate": date}
+
+    def gds_docsum(self, uid: str) -> dict:
+        rng = random.Random(int(uid))
+        gse = int(uid) % 300000
+        summary = f"Synthetic GEO series {gse} profiling {rng.choice(TISSUES)} samples."
+        return {
+            "uid": uid, "accession": f"GSE{gse}", "gse": str(gse), "title": f"Synthetic series GSE{gse}",
+            "summary": summary * 3, "taxon": "Homo sapiens", "gdstype": "Expression profiling by high throughput sequencing",
+            "gpl": str(rng.randint(10000, 30000)), "n_samples": rng.randint(4, 400),
+            "pdat": f"20{rng.randint(12, 25)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}",
+        }
+
+    def esummary(self, db: str, params: dict) -> dict:
+        uids = self._uids(params)
+        make = self.gds_docsum if db == "gds" else self.sra_docsum
+        result = {"uids": uids}
+        for uid in uids:
+            if uid.isdigit():
+                result[uid] = make(uid)
+        return {"header": {"type": "esummary", "version": "0.3"}, "result": result}
+
+    def elink(self, params: dict) -> dict:
+        linksets = []
+        for uid in self._uids(params):
+            rng = random.Random(int(uid) if uid.isdigit() else self._seed(uid))
+            base = (rng.randint(100000, 999999)) * 100000
+            links = [str(base + i) for i in range(rng.randint(2, 40))]
+            linksets.append({"dbfrom": params.get("dbfrom", "gds"), "ids": [uid], "linksetdbs": [
+                {"dbto": params.get("db", "sra"), "linkname": f"{params.get('dbfrom', 'gds')}_sra", "links": links}
+            ]})
+        return {"header": {"type": "elink", "version": "0.3"}, "linksets": linksets}
+
+    def biosample_xml(self, params: dict) -> str:
+        parts = ['<?xml version="1.0" ?>\n<BioSampleSet>']
+        for acc in self._uids(params):
+            rng = random.Random(self._seed(acc))
+            attrs = {
+                "tissue": rng.choice(TISSUES),
+                "sex": rng.choice(["male", "female"]),
+                "age": str(rng.randint(18, 90)),
+                "disease": rng.choice(["MDD", "control", "bipolar disorder", "schizophrenia"]),
+            }
+            parts.append(f'<BioSample accession="{acc}" id="{self._seed(acc) % 10**8}"><Attributes>')
+            parts.extend(
+                f'<Attribute attribute_name="{k}" harmonized_name="{k}" display_name="{k}">{v}</Attribute>'
+                for k, v in attrs.items()
+            )
+            parts.append("</Attributes></BioSample>")
+        parts.append("</BioSampleSet>")
+        return "".join(parts)
+
+    def answer(self, path: str, params: dict):
+        """(status, content type, body) for an E-utilities request, or None."""
+        endpoint = path.rsplit("/", 1)[-1]
+        db = params.get("db", "")
+        if endpoint == "esearch.fcgi":
+            return 200, "application/json", json.dumps(self.esearch(db, params))
+        if endpoint == "esummary.fcgi":
+            return 200, "application/json", json.dumps(self.esummary(db, params))
+        if endpoint == "elink.fcgi":
+            return 200, "application/json", json.dumps(self.elink(params))
+        if endpoint == "efetch.fcgi" and db == "biosample":
+            return 200, "text/xml", self.biosample_xml(params)
+        return None
+
+
+class StandIn:
+    """Shared server state: fixtures, synthetic data, fault injection and stats."""
+
+    def __init__(self, opts):
+        self.fixtures = Path(opts.fixtures)
+        self.fixtures.mkdir(parents=True, exist_ok=True)
+        self.record = opts.record
+        self.strict = opts.strict
+        self.latency = opts.latency_ms / 1000
+        self.jitter = opts.jitter_ms / 1000
+        self.rate_429 = opts.rate_429
+        self.synthetic = Synthetic(dict(opts.study), opts.default_hits)
+        self.stats = {"requests": 0, "fixture": 0, "synthetic": 0, "recorded": 0, "injected_429": 0, "not_found": 0}
+        self.stats_lock = threading.Lock()
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def fixture_key(path: str, params: dict) -> str:
+        stable = sorted((k, v) for k, v in params.items() if k not in VOLATILE_PARAMS)
+        return hashlib.sha1(json.dumps([path, stable], sort_keys=True).encode()).hexdigest()
+
+    def upstream_url(self, path: str):
+        for prefix, base in UPSTREAM.items():
+            if path.startswith(prefix):
+                return base + path[len(prefix):]
+        return None
+
+    def handle(self, method: str, path: str, params: dict):
+        self.count("requests")
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.random() * self.jitter)
+        if self.rate_429 and random.random() < self.rate_429:
+            self.count("injected_429")
+            return 429, "application/json", json.dumps({"error": "API rate limit exceeded"})
+
+        fixture = self.fixtures / f"{self.fixture_key(path, params)}.json"
+        if self.record:
+            url = self.upstream_url(path)
+            if url is None:
+                self.count("not_found")
+                return 404, "text/plain", "unknown endpoint"
+            key = "data" if method == "POST" else "params"
+            resp = requests.request(method, url, timeout=60, **{key: params})
+            content_type = resp.headers.get("Content-Type", "text/plain")
+            if resp.status_code == 200:
+                fixture.write_text(json.dumps({"path": path, "params": params, "status": 200,
+                                               "content_type": content_type, "body": resp.text}))
+                self.count("recorded")
+            return resp.status_code, content_type, resp.text
+
+        if fixture.exists():
+            self.count("fixture")
+            saved = json.loads(fixture.read_text())
+            return saved["status"], saved["content_type"], saved["body"]
+        if not self.strict and path.startswith("/entrez/eutils"):
+            answer = self.synthetic.answer(path, params)
+            if answer:
+                self.count("synthetic")
+                return answer
+        self.count("not_found")
+        return 404, "text/plain", f"no fixture for {path}"
+
+
+def make_handler(standin: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _params(self, body: str = "") -> dict:
+            merged = {}
+            for source in (urlparse(self.path).query, body):
+                for key, values in parse_qs(source, keep_blank_values=True).items():
+                    merged.setdefault(key, []).extend(values)
+            return {k: v[0] if len(v) == 1 else v for k, v in merged.items()}
+
+        def _respond(self, method: str, body: str = ""):
+            path = urlparse(self.path).path
+            if path == "/_standin/stats":
+                status, content_type, text = 200, "application/json", json.dumps(standin.stats)
+            else:
+                status, content_type, text = standin.handle(method, path, self._params(body))
+            data = text.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._respond("GET")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self._respond("POST", self.rfile.read(length).decode())
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def _study_arg(value: str) -> tuple:
+    accession, _, runs = value.partition(":")
+    return accession.upper(), int(runs or 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local NCBI E-utilities / ENA stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=str(DEFAULT_FIXTURES), help="fixture directory")
+    parser.add_argument("--record", action="store_true", help="forward to the real services and save fixtures")
+    parser.add_argument("--strict", action="store_true", help="fixtures only, no synthetic fallback")
+    parser.add_argument("--latency-ms", type=float, default=0, help="added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="random extra latency, up to this much")
+    parser.add_argument("--rate-429", type=float, default=0, help="fraction of requests answered with 429")
+    parser.add_argument("--study", type=_study_arg, action="append", default=[],
+                        help="synthetic study size, ACCESSION:EXPERIMENTS (repeatable)")
+    parser.add_argument("--default-hits", type=int, default=200, help="synthetic hits for other searches")
+    opts = parser.parse_args()
+
+    server = ThreadingHTTPServer((opts.host, opts.port), make_handler(StandIn(opts)))
+    print(f"NCBI/ENA stand-in on http://{opts.host}:{opts.port} "
+          f"({'record' if opts.record else 'strict replay' if opts.strict else 'replay + synthetic'})")
+    print(f"  HOX_NCBI_BASE=http://{opts.host}:{opts.port}/entrez/eutils")
+    print(f"  HOX_ENA_BASE=http://{opts.host}:{opts.port}/ena")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the hox CLI, for benchmarks and offline runs.
+
+Answers the commands main.py issues with plausible --json output after a
+configurable start-up delay (what a real call spends on process start,
+profile loading and TLS/auth before doing any work).
+
+Usage:
+    HOX_BIN=bench/stub_hox.py python test_tools.py import_to_hox '{"manifest_name": "x"}'
+
+Environment:
+    HOX_STUB_STARTUP_MS   simulated per-process overhead (default 80)
+    HOX_STUB_EXISTING     comma-separated run accessions that already exist as reads
+    HOX_STUB_JOB_STATUS   status reported for jobs (default "completed")
+    HOX_STUB_LOG          file each call is appended to as a JSON line (args, stdin)
+    HOX_STUB_FAIL         comma-separated verbs that fail (e.g. "attach,tag")
+    HOX_STUB_JOBS         file imported reads IDs are appended to; a tenant-wide
+                          `get jobs` then lists a job for each of them
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+
+
+def _id(kind: str, key: str) -> str:
+    return f"{kind}-{hashlib.sha1(key.encode()).hexdigest()[:12]}"
+
+
+def main(argv: list) -> int:
+    time.sleep(float(os.environ.get("HOX_STUB_STARTUP_MS", "80")) / 1000)
+
+    args = [a for a in argv if a != "--json" and not a.startswith("--profile=")]
+    opts = {a.split("=", 1)[0]: a.split("=", 1)[1] for a in args if a.startswith("--") and "=" in a}
+    verb, resource = (args + ["", ""])[:2]
+    existing = {r for r in os.environ.get("HOX_STUB_EXISTING", "").split(",") if r}
+    stdin = sys.stdin.read() if "--stdin" in args else ""
+    if os.environ.get("HOX_STUB_LOG"):
+        with open(os.environ["HOX_STUB_LOG"], "a") as f:
+            f.write(json.dumps({"args": args, "stdin": stdin}) + "\n")
+    if verb in os.environ.get("HOX_STUB_FAIL", "").split(","):
+        print(f"stub_hox: {verb} failed (HOX_STUB_FAIL)", file=sys.stderr)
+        return 1
+
+    if verb == "create" and resource == "set":
+        out = {"id": _id("set", opts["--name"]), "name": opts["--name"]}
+    elif verb == "import" and resource == "reads":
+        acc = opts.get("--from-accession", "")
+        # Each import makes a new reads resource
+        key = f"{acc}:{opts.get('--set', '')}:{time.time_ns()}"
+        out = {"id": _id("reads", key), "name": acc, "job": _id("job", key)}
+        if os.environ.get("HOX_STUB_JOBS"):
+            with open(os.environ["HOX_STUB_JOBS"], "a") as f:
+                f.write(out["id"] + "\n")
+    elif verb == "search" and resource == "reads":
+        names = [a.split("=", 1)[1] for a in args if a.startswith("--name=")]
+        out = [{"id": _id("reads", n), "name": n} for n in names if n in existing]
+    elif verb == "get" and resource == "jobs":
+        rid = opts.get("--resource-id")
+        status = os.environ.get("HOX_STUB_JOB_STATUS", "completed")
+        if rid:
+            rids = [rid]
+        elif os.environ.get("HOX_STUB_JOBS") and os.path.exists(os.environ["HOX_STUB_JOBS"]):
+            with open(os.environ["HOX_STUB_JOBS"]) as f:
+                rids = f.read().split()
+        else:
+            rids = []
+        out = [{"id": _id("job", r), "resource_id": r, "status": status} for r in rids]
+    elif verb == "tag":
+        tags = json.loads(stdin or "{}")
+        out = {"id": args[2] if len(args) > 2 else "", "tags": tags}
+    elif verb in ("attach", "detach"):
+        ids = [a for a in args[2:] if not a.startswith("--")]
+        out = [{"id": i, "set": opts.get("--set")} for i in ids]
+        out = out[0] if len(out) == 1 else out
+    else:
+        print(f"stub_hox: unsupported command: {' '.join(argv)}", file=sys.stderr)
+        return 2
+
+    print(json.dumps(out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Offline checks of tool behaviour: NCBI calls go to an in-process
+bench/ncbi_standin.py, hox calls to bench/stub_hox.py.
+
+Each check runs against a throwaway HOME, so manifests, the index and the
+run store start empty. Exits 1 if any check fails.
+
+Usage:
+    python check_tools.py              # run all checks
+    python check_tools.py run_tags     # substring filter
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+HOX_LOG = Path(tempfile.mkdtemp()) / "hox_calls.jsonl"
+
+sys.path.insert(0, str(ROOT / "bench"))
+import ncbi_standin  # noqa: E402
+
+# Synthetic study sizes (experiments, one run each)
+STANDIN_STUDIES = {"SRP990001": 300, "SRP990002": 120}
+STANDIN = ncbi_standin.StandIn(argparse.Namespace(
+    fixtures=tempfile.mkdtemp(prefix="standin-"), record=False, strict=False,
+    latency_ms=0, jitter_ms=0, rate_429=0, study=list(STANDIN_STUDIES.items()), default_hits=200,
+))
+_standin_server = ThreadingHTTPServer(("127.0.0.1", 0), ncbi_standin.make_handler(STANDIN))
+threading.Thread(target=_standin_server.serve_forever, daemon=True).start()
+
+# main reads these at import time
+os.environ["HOME"] = tempfile.mkdtemp()
+os.environ["HOX_BIN"] = str(ROOT / "bench" / "stub_hox.py")
+os.environ["HOX_STUB_STARTUP_MS"] = "0"
+os.environ["HOX_STUB_LOG"] = str(HOX_LOG)
+os.environ["HOX_STUB_JOBS"] = str(HOX_LOG.with_name("hox_jobs.txt"))
+os.environ["HOX_NCBI_BASE"] = f"http://127.0.0.1:{_standin_server.server_address[1]}/entrez/eutils"
+os.environ["HOX_ENA_BASE"] = f"http://127.0.0.1:{_standin_server.server_address[1]}/ena"
+os.environ["HOX_NCBI_RPS"] = "0"
+
+import main  # noqa: E402
+
+# ffq's answer for a study, trimmed to the fields _extract_ffq_summary reads:
+# library fields under their ffq names, platform as the instrument family
+FFQ_STUDY = {
+    "accession": "SRP900001",
+    "title": "Prefrontal cortex RNA-seq",
+    "runs": {
+        f"SRR90000{i}": {
+            "accession": f"SRR90000{i}",
+            "experiment": f"SRX90000{i}",
+            "title": f"sample {i}",
+            "library_strategy": "RNA-Seq",
+            "library_source": "TRANSCRIPTOMIC",
+            "platform": "ILLUMINA",
+            "spots": 1000,
+            "bases": 150000,
+        }
+        for i in range(1, 4)
+    },
+}
+
+
+def _hox_calls(verb: str) -> list:
+    if not HOX_LOG.exists():
+        return []
+    calls = [json.loads(line) for line in HOX_LOG.read_text().splitlines()]
+    return [c for c in calls if c["args"][:1] == [verb]]
+
+
+def check_run_tags_ffq():
+    """An ffq-built manifest's shared strategy and platform go on the set; only differing runs are tagged."""
+    fetch = main._fetch_sra_metadata
+    main._fetch_sra_metadata = lambda acc: FFQ_STUDY
+    try:
+        entry = main._manifest_entry("SRP900001")
+    finally:
+        main._fetch_sra_metadata = fetch
+    manifest = main._new_manifest("ffq_tags", "check", "disease=MDD")
+    manifest["accessions"].append(entry)
+    manifest["total_runs"] = len(entry["runs"])
+    main._save_manifest(manifest)
+    main.approve_manifest("ffq_tags")
+
+    result = json.loads(main.import_to_hox("ffq_tags", dedup=False))
+    assert result["started"] == 3 and result["tagged"] == 0, result
+    tag_calls = [c for c in _hox_calls("tag") if json.loads(c["stdin"]).get("manifest") == "ffq_tags"]
+    assert [c["args"][1] for c in tag_calls] == ["set"], tag_calls
+    tags = json.loads(tag_calls[0]["stdin"])
+    assert tags["strategy"] == "RNA-Seq" and tags["platform"] == "ILLUMINA", tags
+    assert tags["study"] == "SRP900001" and tags["disease"] == "MDD", tags
+
+    # A run on another platform is tagged with that platform only
+    main._store_runs([{"accession": "SRR900003", "platform": "OXFORD_NANOPORE"}], study="SRP900001")
+    set_tags, run_tags = main._run_tags(main._load_manifest("ffq_tags"))
+    assert set_tags["platform"] == "ILLUMINA", set_tags
+    assert run_tags == {"SRR900003": {"platform": "OXFORD_NANOPORE"}}, run_tags
+
+
+def _approved_manifest(name: str, runs: list) -> None:
+    manifest = main._new_manifest(name, "check")
+    manifest["accessions"].append({"accession": "SRP900002", "status": "ok", "runs": runs})
+    manifest["total_runs"] = len(runs)
+    main._save_manifest(manifest)
+    main.approve_manifest(name)
+
+
+def _manifest_status(name: str) -> dict:
+    main._status_cache.clear()
+    with main._finished_jobs_lock:
+        main._finished_jobs.clear()
+    return json.loads(main.get_import_status(manifest_name=name))
+
+
+def check_import_accounting():
+    """Failed attaches aren't linked, failed jobs don't block re-imports, skipped runs complete."""
+    runs = ["SRR900101", "SRR900102"]
+    env = {k: os.environ.get(k) for k in ("HOX_STUB_JOB_STATUS", "HOX_STUB_EXISTING", "HOX_STUB_FAIL")}
+    try:
+        # First import's jobs fail
+        os.environ["HOX_STUB_JOB_STATUS"] = "failed"
+        _approved_manifest("acct_a", runs)
+        main.import_to_hox("acct_a", tag=False)
+
+        # Failed jobs are imported again; the one existing run can't be attached
+        os.environ["HOX_STUB_EXISTING"] = "SRR900103"
+        os.environ["HOX_STUB_FAIL"] = "attach"
+        _approved_manifest("acct_b", runs + ["SRR900103"])
+        result = json.loads(main.import_to_hox("acct_b", tag=False))
+        assert (result["started"], result["skipped"], result["linked"], result["failed"]) == (2, 0, 0, 1), result
+
+        # Runs acct_b is importing are skipped, and complete when its jobs finish
+        os.environ["HOX_STUB_JOB_STATUS"] = "completed"
+        os.environ["HOX_STUB_FAIL"] = ""
+        _approved_manifest("acct_c", runs)
+        result = json.loads(main.import_to_hox("acct_c", tag=False))
+        assert (result["started"], result["skipped"]) == (0, 2), result
+        status = _manifest_status("acct_c")
+        assert status["percent_complete"] == 100.0, status
+        status = _manifest_status("acct_b")
+        assert status["counts"]["failed"] == 1 and status["failed_runs"] == ["SRR900103"], status
+    finally:
+        for key, value in env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@contextmanager
+def _patched(obj, **values):
+    """Set attributes of obj (os.environ keys if obj is a dict) and restore them afterwards."""
+    is_env = isinstance(obj, dict) or obj is os.environ
+    saved = {k: obj.get(k) if is_env else getattr(obj, k) for k in values}
+    for k, v in values.items():
+        if is_env:
+            obj[k] = v
+        else:
+            setattr(obj, k, v)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if not is_env:
+                setattr(obj, k, v)
+            elif v is None:
+                obj.pop(k, None)
+            else:
+                obj[k] = v
+
+
+def _wait_scheduler(name: str, timeout: float = 30) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = main._load_import_state(name)
+        if state.get("scheduler") != "running":
+            return state
+        time.sleep(0.05)
+    raise AssertionError(f"scheduler of {name} still running after {timeout}s")
+
+
+def _importing_manifest(name: str, runs: list, owner: dict) -> None:
+    """An approved manifest saved as mid-import by a scheduler with the given owner."""
+    _approved_manifest(name, runs)
+    manifest = main._load_manifest(name)
+    manifest["status"] = "importing"
+    manifest["import_results"] = {"manifest": name, "set_name": name, "imports": [], "success": 0, "failed": 0}
+    main._save_manifest(manifest)
+    main._write_import_state(name, {
+        "scheduler": "running", "owner": owner, "pending": runs, "in_flight": {}, "queued": len(runs),
+        "limits": {"max_in_flight_gb": None, "max_concurrent": 2}, "tag": False,
+    })
+
+
+def _imported(name: str) -> list:
+    return sorted(imp["run"] for imp in main._load_manifest(name)["import_results"]["imports"]
+                  if imp["status"] == "started")
+
+
+def check_import_claimed_once():
+    """Concurrent import_to_hox calls import a manifest once, with fcntl and the O_EXCL fallback."""
+    for label, lock_module in (("fcntl", main.fcntl), ("excl", None)):
+        name = f"claim_{label}"
+        runs = [f"SRR9002{i:02d}" for i in range(4)] if label == "fcntl" else [f"SRR9003{i:02d}" for i in range(4)]
+        _approved_manifest(name, runs)
+        with _patched(main, fcntl=lock_module), ThreadPoolExecutor(max_workers=4) as pool:
+            results = [json.loads(r) for r in pool.map(lambda _: main.import_to_hox(name, dedup=False, tag=False), range(4))]
+        started = [r for r in results if "started" in r]
+        assert len(started) == 1 and started[0]["started"] == 4, results
+        submitted = [c for c in _hox_calls("import") if c["args"][2].split("=", 1)[1] in runs]
+        assert len(submitted) == 4, submitted
+        assert _imported(name) == runs
+        if lock_module is None:
+            assert not (main.MANIFEST_DIR / f"{name}.lock").exists(), "O_EXCL lock file left behind"
+
+
+def check_import_claim_other_process():
+    """Another process can't claim a manifest whose scheduler runs here."""
+    name, runs = "claim_process", ["SRR900401", "SRR900402"]
+    _approved_manifest(name, runs)
+    with _patched(main, IMPORT_POLL_SECONDS=0.2):
+        with _patched(os.environ, HOX_STUB_JOB_STATUS="running"):
+            result = json.loads(main.import_to_hox(name, dedup=False, tag=False, max_concurrent=1))
+            assert result["queued"] == 2, result
+            child = subprocess.run(
+                [sys.executable, "-c", f"import main; print(main.import_to_hox({name!r}, tag=False))"],
+                cwd=ROOT, env=os.environ, capture_output=True, text=True, timeout=120,
+            )
+            other = json.loads(child.stdout.strip().splitlines()[-1])
+            assert "already being imported" in other.get("error", ""), (other, child.stderr[-500:])
+        assert _wait_scheduler(name)["scheduler"] == "finished"
+    assert _imported(name) == runs
+
+
+def check_orphan_resumed_at_startup():
+    """An import whose owner process died is resumed by _resume_orphaned_imports, once."""
+    name, runs = "orphan_dead_owner", ["SRR900501", "SRR900502", "SRR900503"]
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    _importing_manifest(name, runs, {"pid": dead.pid, "host": main._HOST, "heartbeat": time.time()})
+    assert _manifest_status(name)["scheduler"] == "orphaned"
+
+    with _patched(main, IMPORT_POLL_SECONDS=0):
+        assert name in main._resume_orphaned_imports()
+        assert _wait_scheduler(name)["scheduler"] == "finished"
+    assert _imported(name) == runs
+    assert name not in main._resume_orphaned_imports()
+
+
+def check_lost_heartbeat():
+    """A scheduler elsewhere is orphaned only once its heartbeat is stale; the new owner keeps beating."""
+    name, runs = "heartbeat_lost", ["SRR900601", "SRR900602"]
+    _importing_manifest(name, runs, {"pid": 1, "host": "other-host", "heartbeat": time.time()})
+    result = json.loads(main.import_to_hox(name, tag=False))
+    assert "already being imported" in result.get("error", ""), result
+
+    state = main._load_import_state(name)
+    state["owner"]["heartbeat"] = time.time() - main.IMPORT_HEARTBEAT_STALE_SECONDS - 1
+    main._write_import_state(name, state)
+    with _patched(main, IMPORT_POLL_SECONDS=1, IMPORT_HEARTBEAT_SECONDS=0.05):
+        with _patched(os.environ, HOX_STUB_JOB_STATUS="running"):
+            result = json.loads(main.import_to_hox(name, tag=False))
+            assert result.get("resumed") and result["queued"] == 2, result
+            time.sleep(0.3)
+            first = main._load_import_state(name)["owner"]
+            time.sleep(0.3)
+            second = main._load_import_state(name)["owner"]
+            assert (first["host"], first["pid"]) == (main._HOST, os.getpid()), first
+            assert second["heartbeat"] > first["heartbeat"], (first, second)
+        assert _wait_scheduler(name)["scheduler"] == "finished"
+    assert _imported(name) == runs
+
+
+def check_reimport_keeps_imports():
+    """Re-importing a manifest reuses its set and keeps, not resubmits, runs it already imported."""
+    name, runs = "reimport", ["SRR900701", "SRR900702"]
+    _approved_manifest(name, runs)
+    first = json.loads(main.import_to_hox(name, tag=False))
+    assert first["started"] == 2, first
+    set_id = main._load_manifest(name)["import_results"]["set_id"]
+
+    manifest = main._load_manifest(name)
+    manifest["accessions"][0]["runs"].append("SRR900703")
+    manifest["status"] = "approved"
+    main._save_manifest(manifest)
+    sets, imports = len(_hox_calls("create")), len(_hox_calls("import"))
+    result = json.loads(main.import_to_hox(name, tag=False))
+    assert (result["started"], result["previously_imported"], result["skipped"]) == (1, 2, 0), result
+    assert len(_hox_calls("create")) == sets, "set created again"
+    assert [c["args"][2] for c in _hox_calls("import")[imports:]] == ["--from-accession=SRR900703"]
+    assert main._load_manifest(name)["import_results"]["set_id"] == set_id
+    assert _imported(name) == runs + ["SRR900703"]
+
+
+def check_columnar_sidecar_versions():
+    """Loading never rewrites a manifest; each save writes a new sidecar and collects the old one after the JSON."""
+    name, runs = "columnar", [f"SRR9008{i:02d}" for i in range(20)]
+    with _patched(main, COLUMNAR_MIN_RUNS=10**9):
+        _approved_manifest(name, runs)
+    path = main._manifest_path(name)
+    before = path.read_text()
+    with _patched(main, COLUMNAR_MIN_RUNS=10):
+        assert list(main._load_manifest(name)["accessions"][0]["runs"]) == runs
+        assert path.read_text() == before, "load rewrote the manifest"
+        assert main._migrate_manifests() == [name]
+        sidecars = sorted(main.MANIFEST_DIR.glob(f"{name}.*runs.npy"))
+        assert [p.name for p in sidecars] == [json.loads(path.read_text())["run_table"]], sidecars
+
+        manifest = main._load_manifest(name)
+        held = manifest["accessions"][0]["runs"]
+        manifest["accessions"][0]["runs"] = runs[:15]
+        main._save_manifest(manifest)
+        table = json.loads(path.read_text())["run_table"]
+        assert [p.name for p in main.MANIFEST_DIR.glob(f"{name}.*runs.npy")] == [table]
+        assert table != sidecars[0].name and list(held) == runs, "old view broken by the save"
+        assert list(main._load_manifest(name)["accessions"][0]["runs"]) == runs[:15]
+        assert main._migrate_manifests() == []
+
+
+def check_refresh_fills_on_apply():
+    """Fields a refresh finds for runs the store lacks are reported by the check and stored only on apply."""
+    name, runs = "refresh_fills", ["SRR900901", "SRR900902"]
+    main._store_runs([{"accession": r, "spots": 1000} for r in runs], study="SRP900002")
+    _approved_manifest(name, runs)
+    fetched = [{"accession": r, "spots": 1000, "bases": 150000} for r in runs]
+    with _patched(main, _esearch_count=lambda db, term: 1, _fetch_sra_docsums=lambda term: [{}],
+                  _docsum_runs=lambda item: fetched):
+        result = json.loads(main.refresh_manifest(name))
+        assert result["studies"]["SRP900002"]["filled"] == {r: ["bases"] for r in runs}, result
+        assert not main._load_runs(runs)[runs[0]].get("bases"), "fill-in stored by the check"
+
+        applied = json.loads(main.refresh_manifest(name, apply=runs[0]))
+        assert applied["applied"]["filled"] == 1 and applied["pending"], applied
+        stored = main._load_runs(runs)
+        assert stored[runs[0]]["bases"] == 150000 and not stored[runs[1]].get("bases"), stored
+
+
+def check_existing_reads_attached_in_batches():
+    """Existing reads are attached to the set with one hox call per HOX_ATTACH_BATCH IDs."""
+    name, runs = "attach_batch", [f"SRR9010{i:02d}" for i in range(5)]
+    _approved_manifest(name, runs)
+    attaches = len(_hox_calls("attach"))
+    with _patched(os.environ, HOX_STUB_EXISTING=",".join(runs)), _patched(main, HOX_ATTACH_BATCH=3):
+        result = json.loads(main.import_to_hox(name, tag=False))
+    assert (result["linked"], result["started"]) == (5, 0), result
+    calls = _hox_calls("attach")[attaches:]
+    assert [len(c["args"]) - 3 for c in calls] == [3, 2], calls
+
+
+def check_list_runs_filters_and_paging():
+    """accession_pattern is a glob (or prefix); pages of a filtered study cover it once, from one fetch."""
+    study = "SRP990001"
+    everything = json.loads(main.list_runs(study, fields="all"))
+    assert everything["total_runs"] == STANDIN_STUDIES[study], everything["total_runs"]
+    runs = everything["runs"]
+
+    prefix = runs[0]["accession"][:-2]
+    by_prefix = json.loads(main.list_runs(study, accession_pattern=prefix.lower()))
+    assert [r["accession"] for r in by_prefix["runs"]] == [r["accession"] for r in runs if r["accession"].startswith(prefix)]
+    glob = json.loads(main.list_runs(study, accession_pattern="*1?"))
+    assert [r["accession"] for r in glob["runs"]] == [r["accession"] for r in runs if r["accession"][-2] == "1"]
+    assert json.loads(main.list_runs(study, accession_pattern="^(a+)+$"))["runs"] == []
+
+    strategy = runs[0]["strategy"]
+    wanted = [r["accession"] for r in runs if r["strategy"] == strategy and r["spots"] >= 20_000_000]
+    requests_before = STANDIN.stats["requests"]
+    paged, offset = [], 0
+    while offset is not None:
+        page = json.loads(main.list_runs(study, strategy=strategy.upper(), min_spots=20_000_000,
+                                         fields="accession,spots", offset=offset, limit=7))
+        assert page["matched"] == len(wanted) and all(set(r) == {"accession", "spots"} for r in page["runs"]), page
+        paged += [r["accession"] for r in page["runs"]]
+        offset = page["next_offset"]
+    assert paged == wanted
+    assert STANDIN.stats["requests"] - requests_before <= 3, "pages refetched the study"
+    assert set(runs[0]) >= {"platform_family", "biosample"}
+    assert not set(json.loads(main.list_runs(study, offset=0, limit=1))["runs"][0]) & {"platform_family", "biosample"}
+
+
+def check_platform_family_vocabulary():
+    """Only SRA platform names count as an instrument family; upper-case models stay models."""
+    for value, key in (("ILLUMINA", "platform_family"), ("OXFORD_NANOPORE", "platform_family"),
+                       ("MGISEQ2000RS", "platform"), ("HISEQ", "platform"), ("NextSeq 2000", "platform")):
+        assert main._canonical_run({"accession": "SRR1", "platform": value}) == {"accession": "SRR1", key: value}, value
+
+
+def check_curate_interrupt_and_force():
+    """Ctrl-C stops curate.py starting new lookups; an existing manifest is only replaced with --force."""
+    import curate
+
+    name, accessions = "curate_bulk", [f"SRP99{i:04d}" for i in range(40)]
+    source = Path(tempfile.mkdtemp()) / "accessions.txt"
+    source.write_text("\n".join(accessions))
+    opts = argparse.Namespace(name=name, inputs=[str(source)], column=None, workers=2, retry_errors=False,
+                              keep_checkpoint=False, force=False, description="check", tags=None)
+    resolved = []
+
+    def entry(acc):
+        resolved.append(acc)
+        time.sleep(0.01)
+        return {"accession": acc, "status": "ok", "runs": []}
+
+    def interrupted(futures, as_completed=curate.as_completed):
+        yield next(iter(as_completed(futures)))
+        raise KeyboardInterrupt
+
+    with _patched(curate, _manifest_entry=entry, as_completed=interrupted):
+        assert curate.curate(opts) == 130
+    time.sleep(0.1)
+    assert len(resolved) <= 2 * opts.workers, f"{len(resolved)} lookups after Ctrl-C"
+    assert len(curate.load_checkpoint(name)) == 1
+
+    with _patched(curate, _manifest_entry=entry):
+        assert curate.curate(opts) == 0
+    assert main._load_manifest(name)["total_runs"] == 0
+    curate.checkpoint_path(name).write_text("")
+    with _patched(curate, _manifest_entry=entry):
+        assert curate.curate(opts) == 1, "replaced an existing manifest without --force"
+        opts.force = True
+        assert curate.curate(opts) == 0
+
+
+def check_sample_table_predicates():
+    """get_sample_attributes filters agree with a row-by-row evaluation, and repeat calls reuse the table."""
+    study = "SRP990002"
+    everything = json.loads(main.get_sample_attributes(study, limit=1000))
+    assert everything["total_samples"] == STANDIN_STUDIES[study], everything["total_samples"]
+    samples = everything["samples"]
+
+    def number(value):
+        match = main._NUMBER_RE.search(value)
+        return float(match.group()) if match else None
+
+    tissue, disease = samples[0]["tissue"], samples[0]["disease"]
+    cases = {
+        f"tissue={tissue.upper()}": lambda s: s["tissue"].lower() == tissue.lower(),
+        f"disease!={disease}": lambda s: s["disease"].lower() != disease.lower(),
+        "tissue~CORTEX": lambda s: "cortex" in s["tissue"].lower(),
+        "age>=50": lambda s: number(s["age"]) is not None and number(s["age"]) >= 50,
+        "age<30": lambda s: number(s["age"]) is not None and number(s["age"]) < 30,
+        f"sex=female, age > 40 ,tissue~{tissue[:4]}": lambda s: s["sex"] == "female" and number(s["age"]) > 40
+                                                               and tissue[:4] in s["tissue"],
+    }
+    requests_before = STANDIN.stats["requests"]
+    for filters, predicate in cases.items():
+        result = json.loads(main.get_sample_attributes(study, filters=filters, limit=1000))
+        expected = [s["run"] for s in samples if predicate(s)]
+        assert result["run_accessions"] == expected and result["matched"] == len(expected), filters
+        assert [s["run"] for s in result["samples"]] == expected, filters
+    assert STANDIN.stats["requests"] == requests_before, "sample table rebuilt"
+
+    assert "Unknown attribute" in json.loads(main.get_sample_attributes(study, filters="colour=red"))["error"]
+    assert "Cannot parse" in json.loads(main.get_sample_attributes(study, filters="age"))["error"]
+
+
+def check_cached_status_singleflight_and_backoff():
+    """Concurrent status polls share one fetch; the interval doubles without progress and resets on it."""
+    key, calls = ("check", "status"), []
+    progress = {"done": 0}
+
+    def fetch():
+        calls.append(time.time())
+        time.sleep(0.2)
+        return {"done": progress["done"]}, progress["done"]
+
+    def expire():
+        main._status_cache[key]["expires"] = 0
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: main._cached_status(key, fetch), range(8)))
+    assert len(calls) == 1, f"{len(calls)} fetches for 8 concurrent callers"
+    assert sum(not r["cached"] for r in results) == 1, results
+    assert not main._status_locks, "per-key locks left behind"
+
+    intervals = []
+    for _ in range(6):
+        expire()
+        intervals.append(main._cached_status(key, fetch)["poll_after_seconds"])
+    low, high = main.STATUS_POLL_MIN_SECONDS, main.STATUS_POLL_MAX_SECONDS
+    assert intervals == [min(low * 2 ** i, high) for i in range(1, 7)], intervals
+
+    progress["done"] = 1
+    expire()
+    assert main._cached_status(key, fetch)["poll_after_seconds"] == low
+    fetches = len(calls)
+    assert main._cached_status(key, fetch)["cached"] and len(calls) == fetches
+    assert not main._cached_status(key, fetch, version="new")["cached"] and len(calls) == fetches + 1
+
+    failing = lambda: ({"error": "hox down"}, None)  # noqa: E731
+    expire()
+    assert main._cached_status(key, failing)["poll_after_seconds"] == low
+    assert key not in main._status_cache, "error cached"
+
+
+def check_web_validators():
+    """Web API responses carry ETag/Cache-Control, and If-None-Match gets a 304 until the content changes."""
+    from fastapi.testclient import TestClient
+    import web_app
+
+    client = TestClient(web_app.app)
+    gzip = {"Accept-Encoding": "gzip"}
+
+    runs = client.get("/api/runs/SRP990001", params={"fields": "all"}, headers=gzip)
+    assert runs.status_code == 200 and runs.headers["content-encoding"] == "gzip", runs.headers
+    assert runs.headers["cache-control"] == web_app.CACHE_CONTROL["accession"], runs.headers
+    etag = runs.headers["etag"]
+    again = client.get("/api/runs/SRP990001", params={"fields": "all"}, headers={**gzip, "If-None-Match": etag})
+    assert again.status_code == 304 and not again.content and again.headers["etag"] == etag, again.headers
+    plain = client.get("/api/runs/SRP990001", params={"fields": "all"}, headers={"Accept-Encoding": "identity"})
+    assert plain.headers["etag"] != etag and "content-encoding" not in plain.headers, plain.headers
+    other = client.get("/api/runs/SRP990001", params={"fields": "all"},
+                       headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert other.status_code == 304, "a compressed variant's ETag didn't validate the identity one"
+
+    name = "web_etag"
+    _approved_manifest(name, ["SRR901101", "SRR901102"])
+    first = client.get("/api/manifests", params={"name": name})
+    assert first.headers["cache-control"] == web_app.CACHE_CONTROL["manifest"], first.headers
+    with _patched(web_app, list_manifests=None):
+        unchanged = client.get("/api/manifests", params={"name": name}, headers={"If-None-Match": first.headers["etag"]})
+    assert unchanged.status_code == 304, "revalidation loaded the manifest"
+    export = client.get(f"/api/manifests/{name}/export", params={"format": "csv"})
+    assert export.status_code == 200 and export.headers["etag"] != first.headers["etag"], export.headers
+
+    main._store_runs([{"accession": "SRR901101", "spots": 5}], study="SRP900002")
+    changed = client.get("/api/manifests", params={"name": name}, headers={"If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200 and changed.headers["etag"] != first.headers["etag"], "run store write kept the ETag"
+    time.sleep(0.01)
+    manifest = main._load_manifest(name)
+    manifest["description"] = "edited"
+    main._save_manifest(manifest)
+    edited = client.get("/api/manifests", params={"name": name}, headers={"If-None-Match": changed.headers["etag"]})
+    assert edited.status_code == 200 and edited.json()["description"] == "edited", edited.status_code
+
+    missing = client.get("/api/manifests", params={"name": "no_such_manifest"})
+    assert missing.headers["cache-control"] == "no-store" and "etag" not in missing.headers, missing.headers
+
+
+CHECKS = {name[len("check_"):]: fn for name, fn in globals().items() if name.startswith("check_")}
+
+
+def run(selected: list) -> int:
+    failed = 0
+    for name, fn in CHECKS.items():
+        if selected and not any(s in name for s in selected):
+            continue
+        try:
+            fn()
+            print(f"ok    {name}")
+        except Exception as e:
+            failed += 1
+            print(f"FAIL  {name}: {type(e).__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Headless bulk curation: build a manifest from thousands of accessions.
+
+Reads accessions from files or stdin (one per line, comma/whitespace
+separated, or a CSV/TSV column), resolves them through the same discovery
+layer as create_manifest - in parallel, sharing the process-wide NCBI rate
+limiter (ffq's E-utilities calls included) and run store - and writes a
+pending manifest. ENA and GEO pages ffq reads are not rate-limited here.
+
+Every resolved accession is appended to <name>.checkpoint.jsonl next to the
+manifests, so an interrupted run picks up where it stopped when re-run with
+the same name. An existing manifest of that name is only replaced with
+--force.
+
+Usage:
+    python curate.py mdd_bulk -d "MDD RNA-seq" accessions.txt
+    python curate.py mdd_bulk -d "MDD RNA-seq" --column run_accession sheet.csv --tags disease=MDD
+    cut -f1 ids.tsv | python curate.py mdd_bulk -d "MDD RNA-seq" --workers 8
+    python curate.py mdd_bulk -d "MDD RNA-seq" accessions.txt --retry-errors
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from main import (
+    MANIFEST_DIR,
+    _manifest_entry,
+    _manifest_path,
+    _new_manifest,
+    _save_manifest,
+)
+
+_SPLIT_RE = re.compile(r"[\s,;]+")
+
+
+def read_accessions(sources: list, column: str = None) -> list:
+    """Accessions from files ("-" is stdin), deduplicated in first-seen order."""
+    seen = {}
+    for source in sources or ["-"]:
+        f = sys.stdin if source == "-" else open(source, newline="")
+        try:
+            if column:
+                sample = f.read()
+                dialect = "excel-tab" if "\t" in sample.split("\n", 1)[0] else "excel"
+                values = (row.get(column, "") for row in csv.DictReader(sample.splitlines(), dialect=dialect))
+            else:
+                values = (v for line in f if not line.lstrip().startswith("#") for v in _SPLIT_RE.split(line))
+            for value in values:
+                value = value.strip().upper()
+                if value:
+                    seen.setdefault(value, None)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+    return list(seen)
+
+
+def checkpoint_path(name: str):
+    return MANIFEST_DIR / f"{name}.checkpoint.jsonl"
+
+
+def load_checkpoint(name: str) -> dict:
+    """Entries already resolved by an earlier run: {accession: entry}."""
+    path = checkpoint_path(name)
+    done = {}
+    if path.exists():
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted write
+                done[entry["accession"]] = entry
+    return done
+
+
+class Progress:
+    """Single-line progress with rate and ETA on stderr (a line per interval when not a TTY)."""
+
+    def __init__(self, total: int, done: int, interval: float = 10):
+        self.total = total
+        self.done = done
+        self.start_done = done
+        self.errors = 0
+        self.start = time.monotonic()
+        self.tty = sys.stderr.isatty()
+        self.interval = 0.2 if self.tty else interval
+        self.last = 0.0
+
+    def update(self, ok: bool):
+        self.done += 1
+        self.errors += not ok
+        now = time.monotonic()
+        if now - self.last >= self.interval or self.done == self.total:
+            self.last = now
+            self.show(now)
+
+    def show(self, now: float):
+        rate = (self.done - self.start_done) / max(now - self.start, 1e-9)
+        eta = (self.total - self.done) / rate if rate else 0
+        line = (f"[{self.done:>{len(str(self.total))}}/{self.total}] {self.done / self.total:6.1%}  "
+                f"{rate:5.1f}/s  ETA {_duration(eta)}  errors {self.errors}")
+        print(f"\r{line}" if self.tty else line, end="" if self.tty else "\n", file=sys.stderr, flush=True)
+
+    def finish(self):
+        if self.tty:
+            print(file=sys.stderr)
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def curate(opts) -> int:
+    accessions = read_accessions(opts.inputs, opts.column)
+    if not accessions:
+        print("No accessions given", file=sys.stderr)
+        return 1
+    if _manifest_path(opts.name).exists() and not opts.force:
+        print(f"Manifest '{opts.name}' already exists (use --force to replace it)", file=sys.stderr)
+        return 1
+
+    done = load_checkpoint(opts.name)
+    if opts.retry_errors:
+        done = {acc: e for acc, e in done.items() if e.get("status") == "ok"}
+    todo = [acc for acc in accessions if acc not in done]
+    if done:
+        print(f"Resuming: {len(accessions) - len(todo)} of {len(accessions)} already resolved", file=sys.stderr)
+
+    progress = Progress(len(accessions), len(accessions) - len(todo))
+    MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+    # Set on Ctrl-C: queued accessions are cancelled and workers that already
+    # picked one up skip it, so only requests already in flight finish
+    stop = threading.Event()
+
+    def resolve(acc):
+        return None if stop.is_set() else _manifest_entry(acc)
+
+    with open(checkpoint_path(opts.name), "a") as checkpoint:
+        pool = ThreadPoolExecutor(max_workers=opts.workers, thread_name_prefix="curate")
+        try:
+            futures = {pool.submit(resolve, acc): acc for acc in todo}
+            for future in as_completed(futures):
+                entry = future.result()
+                done[entry["accession"]] = entry
+                checkpoint.write(json.dumps(entry, default=str) + "\n")
+                checkpoint.flush()
+                progress.update(entry.get("status") == "ok")
+        except KeyboardInterrupt:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            progress.finish()
+            print(f"Interrupted; progress kept in {checkpoint_path(opts.name)}, re-run to resume", file=sys.stderr)
+            return 130
+        pool.shutdown()
+    progress.finish()
+
+    manifest = _new_manifest(opts.name, opts.description, opts.tags)
+    for acc in accessions:
+        entry = done[acc]
+        manifest["accessions"].append(entry)
+        manifest["total_runs"] += len(entry.get("runs") or [])
+    path = _save_manifest(manifest)
+    if not opts.keep_checkpoint:
+        checkpoint_path(opts.name).unlink(missing_ok=True)
+
+    errors = [{"accession": e["accession"], "error": e.get("error", "")}
+              for e in manifest["accessions"] if e.get("status") != "ok"]
+    print(json.dumps({
+        "created": opts.name,
+        "path": str(path),
+        "accession_count": len(manifest["accessions"]),
+        "total_runs": manifest["total_runs"],
+        "errors": len(errors),
+        "failed": errors[:20],
+        "status": "pending",
+        "next_step": f"Review with list_manifests(), then approve_manifest('{opts.name}')"
+                     + (" - or re-run with --retry-errors" if errors else ""),
+    }, indent=2))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("name", help="manifest name (becomes the filename)")
+    parser.add_argument("inputs", nargs="*", help="files with accessions (default/-: stdin)")
+    parser.add_argument("-d", "--description", required=True, help="what this data is for")
+    parser.add_argument("--tags", help="key=value pairs for Hox tags (e.g. disease=MDD,tissue=brain)")
+    parser.add_argument("--column", help="read accessions from this CSV/TSV column instead of free text")
+    parser.add_argument("--workers", type=int, default=4, help="accessions resolved in parallel (default 4)")
+    parser.add_argument("--retry-errors", action="store_true", help="re-resolve accessions that failed last time")
+    parser.add_argument("--keep-checkpoint", action="store_true", help="keep the checkpoint file after writing")
+    parser.add_argument("--force", action="store_true", help="replace an existing manifest of the same name")
+    sys.exit(curate(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,45 +11,735 @@ Tools:
 5. create_manifest    - Bundle accessions for approval
 6. list_manifests     - View pending/approved manifests
 7. approve_manifest   - Mark manifest ready for import
-8. import_to_hox      - Load approved manifest into warehouse
-9. get_import_status  - Check import job progress
+8. refresh_manifest   - Diff a manifest's studies against NCBI, apply new/changed runs
+9. import_to_hox      - Load approved manifest into warehouse
+10. get_import_status - Check import job progress
+11. search_local      - Offline full-text search over previously fetched metadata
+12. harvest_slice     - Incrementally harvest an SRA slice into the local index
+13. get_sample_attributes - BioSample attributes per run, filterable server-side
+14. get_metrics       - Counters/histograms for tools, upstream calls and hox
+15. profile_tool      - Profile one tool call (CPU stacks + allocations)
 
 Uses:
 - NCBI Entrez: For searching GEO/SRA databases
 - gget: For metadata retrieval (stable API, rich annotations)
 - ffq: For locating binary data files (FASTQ URLs, file sizes)
 """
+import atexit
+import bisect
+import contextvars
+import cProfile
+import fnmatch
+import functools
+import hashlib
+import heapq
+import inspect
 import json
+import os
+import pstats
+import random
+import re
+import shutil
+import socket
+import sqlite3
 import subprocess
+import sys
+import threading
+import tracemalloc
+import anyio.to_thread
+import numpy as np
 import requests
 import xml.etree.ElementTree as ET
+from collections import Counter, deque
+from collections.abc import Sequence
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Optional
 from mcp.server.fastmcp import FastMCP
+from starlette.responses import PlainTextResponse
 import gget
 
-# NCBI E-utilities base URL
-NCBI_BASE = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+try:
+    import fcntl
+except ImportError:  # Windows: _manifest_file_lock falls back to O_EXCL lock files
+    fcntl = None
+
+# NCBI E-utilities and ENA base URLs. HOX_NCBI_BASE / HOX_ENA_BASE point them
+# (and ffq's copies) at a local stand-in such as bench/ncbi_standin.py
+_NCBI_DEFAULT = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+_ENA_DEFAULT = "https://www.ebi.ac.uk/ena"
+NCBI_BASE = os.environ.get("HOX_NCBI_BASE", _NCBI_DEFAULT).rstrip("/")
+ENA_BASE = os.environ.get("HOX_ENA_BASE", _ENA_DEFAULT).rstrip("/")
+
+# NCBI allows 3 requests/second per client, 10 with an API key
+# (HOX_NCBI_RPS overrides, e.g. to lift the limit against a stand-in)
+NCBI_API_KEY = os.environ.get("NCBI_API_KEY", "")
+NCBI_RPS = float(os.environ.get("HOX_NCBI_RPS", "10" if NCBI_API_KEY else "3"))
 
 mcp = FastMCP("hox-bio")
 
 MANIFEST_DIR = Path.home() / ".hox" / "manifests"
 MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
 
+# Local SQLite index of every study/run summary we've fetched (see search_local)
+INDEX_DB = Path.home() / ".hox" / "index.db"
+
 
 import time
 
-def _ncbi_post(url: str, data: dict, retries: int = 2, timeout: int = 60):
-    """POST to NCBI with retry on 429 rate-limit."""
-    for attempt in range(retries + 1):
-        resp = requests.post(url, data=data, timeout=timeout)
-        if resp.status_code == 429 and attempt < retries:
-            time.sleep(1)
-            continue
-        resp.raise_for_status()
+_ncbi_lock = threading.Lock()
+_ncbi_next_slot = 0.0
+
+
+def _ncbi_wait() -> float:
+    """Block until this process may send its next NCBI request (shared across threads).
+
+    Returns the seconds spent waiting for a slot.
+    """
+    global _ncbi_next_slot
+    interval = 1.0 / NCBI_RPS if NCBI_RPS > 0 else 0.0
+    with _ncbi_lock:
+        now = time.monotonic()
+        slot = max(now, _ncbi_next_slot)
+        _ncbi_next_slot = slot + interval
+    if slot > now:
+        time.sleep(slot - now)
+    return max(0.0, slot - now)
+
+
+def _ncbi_request(method: str, url: str, payload: dict, retries: int, timeout: int):
+    """Rate-limited NCBI request with retry on 429 rate-limit."""
+    if NCBI_API_KEY:
+        payload = {**payload, "api_key": NCBI_API_KEY}
+    key = "data" if method == "POST" else "params"
+    endpoint = url.rsplit("/", 1)[-1].removesuffix(".fcgi")
+    with _span(f"ncbi {endpoint}", kind="client") as span:
+        if span.sampled:
+            ids = payload.get("id")
+            span.set(method=method, db=payload.get("db"), term=payload.get("term"),
+                     retstart=payload.get("retstart"), retmax=payload.get("retmax"),
+                     ids=len(ids) if isinstance(ids, list) else ids.count(",") + 1 if ids else None)
+        waited = 0.0
+        for attempt in range(retries + 1):
+            waited += _ncbi_wait()
+            start = time.perf_counter()
+            try:
+                resp = requests.request(method, url, timeout=timeout, **{key: payload})
+            except requests.RequestException:
+                _record_upstream("ncbi", endpoint, "error", time.perf_counter() - start)
+                raise
+            _record_upstream("ncbi", endpoint, str(resp.status_code), time.perf_counter() - start, len(resp.content))
+            span.set(status=resp.status_code, attempts=attempt + 1, bytes=len(resp.content),
+                     rate_wait_ms=round(waited * 1000, 1))
+            if resp.status_code == 429 and attempt < retries:
+                METRICS.inc("hox_upstream_retries_total", service="ncbi", reason="429")
+                time.sleep(1)
+                continue
+            resp.raise_for_status()
+            return resp
         return resp
-    return resp
+
+
+def _ncbi_get(url: str, params: dict, retries: int = 2, timeout: int = 30):
+    """GET from NCBI with rate limiting and retry on 429 rate-limit."""
+    return _ncbi_request("GET", url, params, retries, timeout)
+
+
+def _ncbi_post(url: str, data: dict, retries: int = 2, timeout: int = 60):
+    """POST to NCBI with rate limiting and retry on 429 rate-limit."""
+    return _ncbi_request("POST", url, data, retries, timeout)
+
+
+# ============================================================================
+# METRICS - Counters and histograms for tools, upstream calls and hox
+# ============================================================================
+
+# Histogram upper bounds: seconds for *_seconds metrics, counts otherwise
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+class Metrics:
+    """Thread-safe labelled counters and histograms (Prometheus text or JSON)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}  # name -> help text
+        self._buckets = {}  # histogram name -> upper bounds
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+
+    def describe(self, name: str, help_text: str, buckets: Optional[tuple] = None) -> None:
+        self._help[name] = help_text
+        if buckets:
+            self._buckets[name] = buckets
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        buckets = self._buckets.get(name, LATENCY_BUCKETS)
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * (len(buckets) + 2)
+            hist[bisect.bisect_left(buckets, value)] += 1
+            hist[-1] += value
+
+    def snapshot(self) -> dict:
+        """Current values as JSON-friendly dicts, plus hit rates per cache."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(hist) for key, hist in self._histograms.items()}
+
+        out = {"counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters.items()):
+            out["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), hist in sorted(histograms.items()):
+            buckets = self._buckets.get(name, LATENCY_BUCKETS)
+            cumulative = 0
+            le = {}
+            for bound, n in zip(list(buckets) + ["+Inf"], hist[:-1]):
+                cumulative += n
+                le[str(bound)] = cumulative
+            out["histograms"].setdefault(name, []).append(
+                {"labels": dict(labels), "count": cumulative, "sum": hist[-1], "buckets": le}
+            )
+
+        lookups = {}
+        for (name, labels), value in counters.items():
+            if name == "hox_cache_requests_total":
+                labels = dict(labels)
+                hits, total = lookups.get(labels["cache"], (0, 0))
+                lookups[labels["cache"]] = (hits + (value if labels["result"] == "hit" else 0), total + value)
+        out["cache_hit_rates"] = {cache: round(hits / total, 4) for cache, (hits, total) in lookups.items() if total}
+        return out
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        snap = self.snapshot()
+        lines = []
+        for kind, series in (("counter", snap["counters"]), ("histogram", snap["histograms"])):
+            for name, samples in series.items():
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for sample in samples:
+                    labels = sample["labels"]
+                    if kind == "counter":
+                        lines.append(f"{name}{_prom_labels(labels)} {sample['value']}")
+                        continue
+                    for bound, n in sample["buckets"].items():
+                        lines.append(f"{name}_bucket{_prom_labels({**labels, 'le': bound})} {n}")
+                    lines.append(f"{name}_sum{_prom_labels(labels)} {sample['sum']}")
+                    lines.append(f"{name}_count{_prom_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _prom_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = {k: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for k, v in labels.items()}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped.items()) + "}"
+
+
+METRICS = Metrics()
+METRICS.describe("hox_tool_calls_total", "MCP tool invocations by tool and outcome (ok, error, exception)")
+METRICS.describe("hox_tool_seconds", "MCP tool latency in seconds")
+METRICS.describe("hox_upstream_requests_total", "NCBI/ffq/gget calls by service, operation and status")
+METRICS.describe("hox_upstream_seconds", "Upstream call latency in seconds")
+METRICS.describe("hox_upstream_bytes_total", "Response bytes received from NCBI")
+METRICS.describe("hox_upstream_retries_total", "Upstream retries by service and reason")
+METRICS.describe("hox_cache_requests_total", "Cache lookups by cache and result (hit, miss)")
+METRICS.describe("hox_cli_commands_total", "hox CLI subprocesses by command and exit code")
+METRICS.describe("hox_cli_seconds", "hox CLI subprocess duration in seconds")
+METRICS.describe("hox_manifest_runs", "Runs per manifest written", SIZE_BUCKETS)
+METRICS.describe("hox_manifest_accessions", "Accessions per manifest written", SIZE_BUCKETS)
+METRICS.describe("hox_trace_export_errors_total", "Spans dropped because the trace export failed")
+
+
+def _record_upstream(service: str, operation: str, status: str, seconds: float, nbytes: int = 0) -> None:
+    METRICS.inc("hox_upstream_requests_total", service=service, operation=operation, status=status)
+    METRICS.observe("hox_upstream_seconds", seconds, service=service, operation=operation)
+    if nbytes:
+        METRICS.inc("hox_upstream_bytes_total", nbytes, service=service)
+
+
+@contextmanager
+def _upstream(service: str, operation: str, **attributes):
+    """Count, time and trace one library-mediated upstream call (ffq, gget)."""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with _span(f"{service} {operation}", kind="client", **attributes) as span:
+            yield span
+        status = "ok"
+    finally:
+        _record_upstream(service, operation, status, time.perf_counter() - start)
+
+
+def _is_error_result(result) -> bool:
+    """Tools report failures as a JSON object whose first key is "error"."""
+    return isinstance(result, str) and result.lstrip("{ \n").startswith('"error"')
+
+
+_TOOLS = {}  # name -> registered (wrapped) tool function
+
+# Worker threads for MCP tool calls: sync tools run off the event loop so one
+# session's slow call doesn't hold up the others
+MCP_TOOL_THREADS = int(os.environ.get("HOX_MCP_THREADS", "32"))
+_tool_limiter = None
+
+
+def _tool(fn):
+    """Register fn as an MCP tool, counting, timing and tracing every call.
+
+    Calls are profiled when HOX_PROFILE names the tool, or when the caller
+    asked for it (profile_tool, ?_profile=1 on a web route). The module-level
+    function stays synchronous (web_app and scripts call it directly); MCP
+    clients reach it through an async shim that runs it on a worker thread.
+    """
+    name = fn.__name__
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "exception"
+        try:
+            with _span(f"tool {name}", tool=name) as span:
+                if span.sampled:
+                    span.set(**signature.bind_partial(*args, **kwargs).arguments)
+                if _profile_request.get() is not None or name in PROFILE_TOOLS or "all" in PROFILE_TOOLS:
+                    result = _profiled(name, fn, args, kwargs)
+                else:
+                    result = fn(*args, **kwargs)
+                outcome = "error" if _is_error_result(result) else "ok"
+                if outcome == "error":
+                    span.fail(result)
+                return result
+        finally:
+            METRICS.observe("hox_tool_seconds", time.perf_counter() - start, tool=name)
+            METRICS.inc("hox_tool_calls_total", tool=name, outcome=outcome)
+
+    @functools.wraps(fn)
+    async def call_in_thread(*args, **kwargs):
+        global _tool_limiter
+        if _tool_limiter is None:
+            _tool_limiter = anyio.CapacityLimiter(MCP_TOOL_THREADS)
+        return await anyio.to_thread.run_sync(functools.partial(wrapper, *args, **kwargs), limiter=_tool_limiter)
+
+    mcp.tool()(call_in_thread)
+    _TOOLS[name] = wrapper
+    return wrapper
+
+
+@_tool
+def get_metrics(format: str = "json") -> str:
+    """
+    Snapshot of this server's metrics: tool latency, upstream NCBI/ffq/gget
+    calls, retries, cache hit rates, hox CLI durations and manifest sizes.
+
+    Args:
+        format: "json" (default) or "prometheus" (text exposition format)
+
+    Returns:
+        JSON with counters, histograms and cache hit rates (or Prometheus text)
+
+    Examples:
+        get_metrics()
+        get_metrics(format="prometheus")
+    """
+    if format == "prometheus":
+        return METRICS.render()
+    if format != "json":
+        return json.dumps({"error": f"Unknown format '{format}'", "formats": ["json", "prometheus"]})
+    return json.dumps(METRICS.snapshot(), indent=2)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def _metrics_route(request):
+    """Prometheus scrape endpoint when serving over HTTP (--transport streamable-http)."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+# ============================================================================
+# TRACING - Spans from tool call down to NCBI requests and hox subprocesses
+# ============================================================================
+
+# Fraction of tool calls / web requests traced (children follow their root)
+TRACE_SAMPLE = float(os.environ.get("HOX_TRACE_SAMPLE", "0"))
+
+# Where finished spans go: an OTLP/HTTP traces URL (e.g.
+# http://localhost:4318/v1/traces), otherwise JSON lines in HOX_TRACE_FILE
+TRACE_EXPORT = os.environ.get("HOX_TRACE_EXPORT", "")
+TRACE_FILE = Path(os.environ.get("HOX_TRACE_FILE", str(Path.home() / ".hox" / "traces.jsonl")))
+TRACE_FLUSH_SECONDS = 2
+
+# Characters kept per string attribute
+TRACE_ATTR_MAX = 200
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class Span:
+    """One timed operation; set() and fail() are no-ops on unsampled spans."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "error", "sampled")
+
+    def __init__(self, name: str, kind: str = "internal", parent: Optional["Span"] = None, sampled: bool = True):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {}
+        self.error = None
+        self.sampled = sampled
+
+    def set(self, **attributes) -> None:
+        if not self.sampled:
+            return
+        for key, value in attributes.items():
+            if value is None:
+                continue
+            if not isinstance(value, (str, int, float, bool)):
+                value = str(value)
+            if isinstance(value, str) and len(value) > TRACE_ATTR_MAX:
+                value = value[:TRACE_ATTR_MAX] + "..."
+            self.attributes[key] = value
+
+    def fail(self, message) -> None:
+        if self.sampled:
+            self.error = str(message)[:TRACE_ATTR_MAX]
+
+    def record(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": datetime.fromtimestamp(self.start_ns / 1e9).isoformat(),
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+_UNSAMPLED = Span("", sampled=False)
+_current_span = contextvars.ContextVar("hox_span", default=None)
+
+
+@contextmanager
+def _span(name: str, kind: str = "internal", **attributes):
+    """Trace the enclosed block as a child of the current span.
+
+    A span without a parent starts a trace, sampled at TRACE_SAMPLE; its
+    descendants share that decision.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        sampled = TRACE_SAMPLE > 0 and random.random() < TRACE_SAMPLE
+    else:
+        sampled = parent.sampled
+    span = Span(name, kind, parent, sampled) if sampled else _UNSAMPLED
+    span.set(**attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        if sampled:
+            span.end_ns = time.time_ns()
+            _export_span(span)
+
+
+def _carry_span(fn):
+    """Wrap fn so that, run on another thread, its spans nest under the caller's."""
+    parent = _current_span.get()
+
+    def run(*args, **kwargs):
+        token = _current_span.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_span.reset(token)
+
+    return run
+
+
+_trace_buffer = []
+_trace_lock = threading.Lock()
+_trace_write_lock = threading.Lock()
+_trace_flusher = None
+
+
+def _export_span(span: Span) -> None:
+    """Queue a finished span; a background thread writes batches every TRACE_FLUSH_SECONDS."""
+    global _trace_flusher
+    with _trace_lock:
+        _trace_buffer.append(span)
+        if _trace_flusher is None:
+            _trace_flusher = threading.Thread(target=_flush_traces_forever, daemon=True, name="trace-export")
+            _trace_flusher.start()
+            atexit.register(_flush_traces)
+
+
+def _flush_traces_forever():
+    while True:
+        time.sleep(TRACE_FLUSH_SECONDS)
+        _flush_traces()
+
+
+def _flush_traces() -> None:
+    with _trace_lock:
+        spans = list(_trace_buffer)
+        _trace_buffer.clear()
+    if not spans:
+        return
+    try:
+        with _trace_write_lock:
+            if TRACE_EXPORT.startswith(("http://", "https://")):
+                requests.post(TRACE_EXPORT, json=_otlp_payload(spans), timeout=10).raise_for_status()
+            else:
+                TRACE_FILE.parent.mkdir(parents=True, exist_ok=True)
+                with open(TRACE_FILE, "a") as f:
+                    f.writelines(json.dumps(span.record()) + "\n" for span in spans)
+    except (OSError, requests.RequestException):
+        METRICS.inc("hox_trace_export_errors_total", len(spans))
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": value}
+
+
+def _otlp_payload(spans: list) -> dict:
+    """OTLP/HTTP JSON ExportTraceServiceRequest for a batch of spans."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "hox-bio"}}]},
+        "scopeSpans": [{
+            "scope": {"name": "hox-bio"},
+            "spans": [{
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                "name": span.name,
+                "kind": _OTLP_KINDS[span.kind],
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            } for span in spans],
+        }],
+    }]}
+
+
+# ============================================================================
+# PROFILING - Opt-in CPU and allocation profiles of single tool calls
+# ============================================================================
+
+# Tools profiled on every call: comma-separated names, or "all"
+PROFILE_TOOLS = {t.strip() for t in os.environ.get("HOX_PROFILE", "").split(",") if t.strip()}
+
+# "sample": stack sampling of the calling thread, written as collapsed stacks
+# (flamegraph.pl, speedscope, inferno); "cprofile": deterministic, pstats output
+PROFILE_MODE = os.environ.get("HOX_PROFILE_MODE", "sample")
+PROFILE_INTERVAL = float(os.environ.get("HOX_PROFILE_INTERVAL_MS", "5")) / 1000
+
+PROFILE_DIR = Path.home() / ".hox" / "profiles"
+
+# Rows in the hotspot and allocation reports
+PROFILE_TOP = 25
+
+# One profile at a time: tracemalloc is process-wide
+_profile_lock = threading.Lock()
+
+# Set (to a list that collects report directories) to profile tool calls in this context
+_profile_request = contextvars.ContextVar("hox_profile", default=None)
+
+
+class _StackSampler:
+    """Samples one thread's Python stack every interval, counting identical stacks."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profile-sampler")
+
+    # Same names as cProfile.Profile, so either can be used
+    def enable(self):
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def hotspots(self) -> list:
+        """Leaf frames by share of samples (where the time was spent)."""
+        leaves = Counter()
+        for stack, n in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        total = sum(leaves.values()) or 1
+        return [{"frame": f, "samples": n, "share": round(n / total, 3)} for f, n in leaves.most_common(PROFILE_TOP)]
+
+
+def _profiled(name: str, fn, args: tuple, kwargs: dict):
+    """Run fn under the CPU profiler and tracemalloc, writing a report directory.
+
+    Reports land in PROFILE_DIR/<timestamp>-<tool>/ (summary.json, stacks.folded
+    or profile.prof + profile.txt, allocations.txt) and are appended to the
+    caller's _profile_request list. If another profile is running, fn runs
+    unprofiled.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return fn(*args, **kwargs)
+    out = PROFILE_DIR / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{name}"
+    started_tracing = not tracemalloc.is_tracing()
+    try:
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profiler = cProfile.Profile() if PROFILE_MODE == "cprofile" else _StackSampler(threading.get_ident(), PROFILE_INTERVAL)
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            _write_profile(out, name, profiler, before, after, peak, elapsed, args, kwargs)
+            collected = _profile_request.get()
+            if collected is not None:
+                collected.append(out)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+
+def _write_profile(out: Path, name: str, profiler, before, after, peak: int, elapsed: float,
+                   args: tuple, kwargs: dict) -> None:
+    out.mkdir(parents=True, exist_ok=True)
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    net = sum(stat.size_diff for stat in diff)
+    lines = [f"peak traced: {peak / 2**20:.1f} MiB, net change: {net / 2**20:+.1f} MiB", ""]
+    lines += [str(stat) for stat in diff[:PROFILE_TOP]]
+    (out / "allocations.txt").write_text("\n".join(lines) + "\n")
+
+    if isinstance(profiler, cProfile.Profile):
+        profiler.dump_stats(out / "profile.prof")
+        with open(out / "profile.txt", "w") as f:
+            stats = pstats.Stats(profiler, stream=f).sort_stats("cumulative")
+            stats.print_stats(PROFILE_TOP)
+        top = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:PROFILE_TOP]
+        hotspots = [{"frame": f"{func[2]} ({Path(func[0]).name}:{func[1]})", "calls": row[1],
+                     "cumulative_s": round(row[3], 4)} for func, row in top]
+        files = ["profile.prof", "profile.txt", "allocations.txt"]
+    else:
+        (out / "stacks.folded").write_text(profiler.folded())
+        hotspots = profiler.hotspots()
+        files = ["stacks.folded", "allocations.txt"]
+
+    summary = {
+        "tool": name,
+        "arguments": {"args": [str(a)[:200] for a in args], **{k: str(v)[:200] for k, v in kwargs.items()}},
+        "mode": "cprofile" if isinstance(profiler, cProfile.Profile) else "sample",
+        "seconds": round(elapsed, 4),
+        "peak_bytes": peak,
+        "net_bytes": net,
+        "top_allocations": [str(stat) for stat in diff[:5]],
+        "hotspots": hotspots[:10],
+        "files": files,
+    }
+    (out / "summary.json").write_text(json.dumps(summary, indent=2))
+
+
+@_tool
+def profile_tool(tool: str, arguments: str = "{}") -> str:
+    """
+    Run one tool call under the profiler and tracemalloc.
+
+    Writes a report to ~/.hox/profiles/<timestamp>-<tool>/: collapsed stacks
+    (stacks.folded, for flamegraph.pl/speedscope) or cProfile output
+    (HOX_PROFILE_MODE=cprofile), plus the top allocations (allocations.txt).
+
+    Args:
+        tool: Name of the tool to call (e.g., "search_studies")
+        arguments: The tool's arguments as a JSON object
+
+    Returns:
+        JSON with the report directory, timing, peak memory, hotspots and
+        top allocations, plus the start of the tool's own result
+
+    Examples:
+        profile_tool("search_studies", '{"query": "brain", "database": "sra", "limit": 100}')
+        profile_tool("create_manifest", '{"name": "x", "description": "y", "accessions": "SRP123456"}')
+    """
+    fn = _TOOLS.get(tool)
+    if fn is None or tool == "profile_tool":
+        return json.dumps({"error": f"Unknown tool '{tool}'", "tools": sorted(set(_TOOLS) - {"profile_tool"})})
+    try:
+        kwargs = json.loads(arguments or "{}")
+    except json.JSONDecodeError as e:
+        return json.dumps({"error": f"arguments is not valid JSON: {e}", "tool": tool})
+    if not isinstance(kwargs, dict):
+        return json.dumps({"error": "arguments must be a JSON object", "tool": tool})
+
+    collected = []
+    token = _profile_request.set(collected)
+    try:
+        result = fn(**kwargs)
+    except TypeError as e:
+        return json.dumps({"error": str(e), "tool": tool})
+    finally:
+        _profile_request.reset(token)
+    if not collected:
+        return json.dumps({"error": "Another profile is in progress; try again", "tool": tool})
+
+    summary = json.loads((collected[0] / "summary.json").read_text())
+    return json.dumps({
+        "profile_dir": str(collected[0]),
+        **summary,
+        "result_preview": result[:500] if isinstance(result, str) else str(result)[:500],
+    }, indent=2)
 
 
 # ============================================================================
@@ -71,18 +761,24 @@ _STRATEGY_TERMS = {
 }
 
 
-def _build_sra_query(query: str, organism: str, year: Optional[str]) -> str:
-    """Build an optimized SRA query with field tags for strategy terms."""
+def _build_sra_query(query: str, organism: str, year: Optional[str],
+                     strategy: Optional[str] = None) -> str:
+    """Build an optimized SRA query with field tags for strategy terms.
+
+    An explicit strategy (e.g. a facet value) replaces any strategy term in the query.
+    """
     terms = []
     remaining = query.lower()
 
     # Extract known strategy terms and convert to [Strategy] field tags
     strategy_found = None
-    for pattern, strategy in sorted(_STRATEGY_TERMS.items(), key=lambda x: -len(x[0])):
+    for pattern, term in sorted(_STRATEGY_TERMS.items(), key=lambda x: -len(x[0])):
         if pattern in remaining:
-            strategy_found = strategy
+            strategy_found = term
             remaining = remaining.replace(pattern, " ")
             break
+    if strategy:
+        strategy_found = strategy
 
     # Clean up remaining keywords
     keywords = [w.strip() for w in remaining.split() if w.strip()]
@@ -110,13 +806,26 @@ def _year_to_pdat(year: str) -> str:
     return f"{year}[PDAT]"
 
 
-@mcp.tool()
+def _build_gds_query(query: str, organism: str, year: Optional[str]) -> str:
+    """Build a GEO DataSets query with organism and PDAT filters."""
+    search_terms = [query]
+    if organism:
+        search_terms.append(f'"{organism}"[Organism]')
+    if year:
+        search_terms.append(_year_to_pdat(year))
+    return " AND ".join(search_terms)
+
+
+@_tool
 def search_studies(
     query: str,
     database: str = "gds",
     organism: str = "Homo sapiens",
     limit: int = 20,
-    year: Optional[str] = None
+    year: Optional[str] = None,
+    facets: Optional[str] = None,
+    facet_organisms: Optional[str] = None,
+    link_sra: bool = True
 ) -> str:
     """
     Search NCBI GEO/SRA for studies matching keywords.
@@ -130,27 +839,33 @@ def search_studies(
         organism: Filter by organism (default: "Homo sapiens", use "" for all)
         limit: Maximum results to return (default: 20, max: 100)
         year: Year filter (e.g., "2024", "2020-2022", "pre-2010")
+        facets: Count-only mode. Comma-separated facets to break counts down by -
+            "strategy" (SRA only), "year", "organism". One facet returns counts per
+            value; two return a count matrix. No summaries are fetched.
+        facet_organisms: Comma-separated organisms for the "organism" facet
+            (default: common model organisms)
+        link_sra: For GEO results, resolve the linked SRA study accession and
+            experiment/run counts in bulk (default: True)
 
     Returns:
         JSON with matching studies including accessions, titles, and summaries
+        (or result counts per facet value in facets mode)
 
     Examples:
         search_studies("brain tissue RNA-seq")
         search_studies("prefrontal cortex depression", organism="Homo sapiens")
         search_studies("single cell brain", database="sra", limit=50)
+        search_studies("brain", database="sra", facets="strategy,year")
     """
     try:
+        if facets:
+            return _search_facets(query, database, organism, year, facets, facet_organisms)
+
         if database == "sra":
             return _search_sra(query, organism, limit, year)
 
         # GDS search — already returns study-level results
-        search_terms = [query]
-        if organism:
-            search_terms.append(f'"{organism}"[Organism]')
-        if year:
-            search_terms.append(_year_to_pdat(year))
-
-        full_query = " AND ".join(search_terms)
+        full_query = _build_gds_query(query, organism, year)
 
         search_url = f"{NCBI_BASE}/esearch.fcgi"
         search_params = {
@@ -161,8 +876,7 @@ def search_studies(
             "usehistory": "y"
         }
 
-        resp = requests.get(search_url, params=search_params, timeout=30)
-        resp.raise_for_status()
+        resp = _ncbi_get(search_url, search_params)
         search_data = resp.json()
 
         result = search_data.get("esearchresult", {})
@@ -186,11 +900,11 @@ def search_studies(
             "retmode": "json"
         }
 
-        resp = requests.get(summary_url, params=summary_params, timeout=30)
-        resp.raise_for_status()
+        resp = _ncbi_get(summary_url, summary_params)
         summary_data = resp.json()
 
         studies = []
+        study_uids = []
         doc_sums = summary_data.get("result", {})
 
         for uid in id_list:
@@ -198,8 +912,20 @@ def search_studies(
                 study = _parse_entrez_summary(doc_sums[uid], database)
                 if study:
                     studies.append(study)
+                    study_uids.append(uid)
 
-        return json.dumps({
+        link_error = None
+        if link_sra and database == "gds":
+            try:
+                links = _link_gds_to_sra(study_uids)
+                for uid, study in zip(study_uids, studies):
+                    study.update(links.get(uid, {}))
+            except Exception as e:
+                link_error = str(e)
+
+        _index_records(studies, "study")
+
+        response = {
             "query": query,
             "database": database,
             "organism": organism,
@@ -207,7 +933,10 @@ def search_studies(
             "returned": len(studies),
             "studies": studies,
             "next_step": "Use get_study_info(accession) or list_runs(accession) for details"
-        }, indent=2)
+        }
+        if link_error:
+            response["sra_link_error"] = link_error
+        return json.dumps(response, indent=2)
 
     except Exception as e:
         return json.dumps({
@@ -217,6 +946,66 @@ def search_studies(
         })
 
 
+# SRA experiment UIDs per esummary POST when annotating GEO results
+LINK_SUMMARY_BATCH = 500
+
+
+def _link_gds_to_sra(gds_uids: list) -> dict:
+    """Map a page of GDS UIDs to SRA study accessions and run counts in bulk.
+
+    One elink call (repeated id= params keep a linkset per GDS UID) plus batched
+    esummary POSTs over the union of linked SRA experiments — no per-study calls.
+    """
+    if not gds_uids:
+        return {}
+
+    resp = _ncbi_post(f"{NCBI_BASE}/elink.fcgi", {
+        "dbfrom": "gds",
+        "db": "sra",
+        "id": list(gds_uids),
+        "retmode": "json",
+    })
+    linked = {}
+    for linkset in resp.json().get("linksets", []):
+        ids = linkset.get("ids", [])
+        if not ids:
+            continue
+        for linksetdb in linkset.get("linksetdbs", []):
+            if linksetdb.get("dbto") == "sra":
+                linked.setdefault(str(ids[0]), []).extend(str(u) for u in linksetdb.get("links", []))
+
+    sra_uids = sorted({u for uids in linked.values() for u in uids})
+    experiments = {}
+    for i in range(0, len(sra_uids), LINK_SUMMARY_BATCH):
+        batch = sra_uids[i:i + LINK_SUMMARY_BATCH]
+        doc_sums = _ncbi_post(f"{NCBI_BASE}/esummary.fcgi", {
+            "db": "sra",
+            "id": ",".join(batch),
+            "retmode": "json",
+        }).json().get("result", {})
+        for uid in batch:
+            if isinstance(doc_sums.get(uid), dict):
+                experiments[uid] = _parse_entrez_summary(doc_sums[uid], "sra")
+
+    _index_records(list(experiments.values()), "experiment")
+
+    annotations = {}
+    for gds_uid, uids in linked.items():
+        parsed = [experiments[u] for u in uids if u in experiments]
+        study_runs = {}
+        for exp in parsed:
+            acc = exp.get("accession", "")
+            study_runs[acc] = study_runs.get(acc, 0) + exp.get("runs", 0)
+        studies = sorted(study_runs, key=lambda acc: -study_runs[acc])
+        annotations[gds_uid] = {
+            "sra_study": studies[0] if studies else "",
+            "sra_studies": studies,
+            "sra_experiments": len(uids),
+            "sra_runs": sum(study_runs.values()),
+        }
+    return annotations
+
+
 def _search_sra(query: str, organism: str, limit: int, year: Optional[str]) -> str:
     """SRA-specific search: builds smart query, paginates, deduplicates by study."""
 
@@ -234,8 +1023,7 @@ def _search_sra(query: str, organism: str, limit: int, year: Optional[str]) -> s
         "sort": "relevance",
     }
 
-    resp = requests.get(search_url, params=search_params, timeout=30)
-    resp.raise_for_status()
+    resp = _ncbi_get(search_url, search_params)
     search_data = resp.json()
     result = search_data.get("esearchresult", {})
     total_count = int(result.get("count", 0))
@@ -269,8 +1057,7 @@ def _search_sra(query: str, organism: str, limit: int, year: Optional[str]) -> s
             "query_key": query_key,
             "sort": "relevance",
         }
-        resp = requests.get(search_url, params=fetch_params, timeout=30)
-        resp.raise_for_status()
+        resp = _ncbi_get(search_url, fetch_params)
         id_list = resp.json().get("esearchresult", {}).get("idlist", [])
 
         if not id_list:
@@ -278,18 +1065,19 @@ def _search_sra(query: str, organism: str, limit: int, year: Optional[str]) -> s
 
         # Fetch summaries for this page
         summary_url = f"{NCBI_BASE}/esummary.fcgi"
-        resp = requests.get(summary_url, params={
+        resp = _ncbi_get(summary_url, {
             "db": "sra", "id": ",".join(id_list), "retmode": "json"
         }, timeout=60)
-        resp.raise_for_status()
         doc_sums = resp.json().get("result", {})
 
+        experiments = []
         for uid in id_list:
             if uid not in doc_sums:
                 continue
             parsed = _parse_entrez_summary(doc_sums[uid], "sra")
             if not parsed:
                 continue
+            experiments.append(parsed)
 
             study_acc = parsed.get("accession", "")
             if not study_acc:
@@ -310,6 +1098,7 @@ def _search_sra(query: str, organism: str, limit: int, year: Optional[str]) -> s
                     "runs": parsed.get("runs", 0),
                 }
 
+        _index_records(experiments, "experiment")
         retstart += page_size
 
     # Sort by run count descending
@@ -325,6 +1114,116 @@ def _search_sra(query: str, organism: str, limit: int, year: Optional[str]) -> s
     }, indent=2)
 
 
+_FACET_ORGANISMS = [
+    "Homo sapiens", "Mus musculus", "Rattus norvegicus", "Danio rerio",
+    "Drosophila melanogaster", "Caenorhabditis elegans", "Saccharomyces cerevisiae",
+    "Arabidopsis thaliana",
+]
+
+# Parallel count requests; the NCBI rate limiter still paces them
+FACET_WORKERS = 6
+MAX_FACET_CELLS = 200
+
+
+def _facet_years() -> list:
+    """Year facet values: recent years individually, older ones in ranges (as the UI offers)."""
+    current = datetime.now().year
+    return [str(y) for y in range(current, 2017, -1)] + ["2015-2017", "2010-2014", "pre-2010"]
+
+
+def _facet_values(facet: str, database: str, facet_organisms: Optional[str]) -> list:
+    if facet == "strategy":
+        if database != "sra":
+            raise ValueError("The strategy facet is only available for database='sra'")
+        return sorted(set(_STRATEGY_TERMS.values()))
+    if facet == "year":
+        return _facet_years()
+    if facet == "organism":
+        if facet_organisms:
+            return [o.strip() for o in facet_organisms.split(",") if o.strip()]
+        return list(_FACET_ORGANISMS)
+    raise ValueError(f"Unknown facet '{facet}'. Use strategy, year or organism")
+
+
+def _esearch_count(database: str, term: str) -> int:
+    """Count-only esearch (retmax=0): no IDs or summaries are transferred."""
+    resp = _ncbi_get(f"{NCBI_BASE}/esearch.fcgi", {
+        "db": database,
+        "term": term,
+        "retmax": 0,
+        "retmode": "json",
+    })
+    return int(resp.json().get("esearchresult", {}).get("count", 0))
+
+
+def _search_facets(query: str, database: str, organism: str, year: Optional[str],
+                   facets: str, facet_organisms: Optional[str]) -> str:
+    """Count matrix over facet values via parallel retmax=0 esearch calls."""
+    start = time.perf_counter()
+    names = [f.strip().lower() for f in facets.split(",") if f.strip()]
+    if not names or len(names) > 2 or len(set(names)) != len(names):
+        return json.dumps({"error": "facets takes one or two distinct facet names", "facets": facets})
+
+    values = {name: _facet_values(name, database, facet_organisms) for name in names}
+    cells = [()]
+    for name in names:
+        cells = [cell + (v,) for cell in cells for v in values[name]]
+    if len(cells) > MAX_FACET_CELLS:
+        return json.dumps({
+            "error": f"{len(cells)} facet combinations exceeds the limit of {MAX_FACET_CELLS}",
+            "hint": "Use fewer facets or pass a shorter facet_organisms list"
+        })
+
+    def term_for(cell: tuple) -> str:
+        params = {"organism": organism, "year": year, "strategy": None}
+        params.update(zip(names, cell))
+        if database == "sra":
+            return _build_sra_query(query, params["organism"], params["year"], params["strategy"])
+        return _build_gds_query(query, params["organism"], params["year"])
+
+    def count(cell: tuple):
+        try:
+            return _esearch_count(database, term_for(cell))
+        except Exception as e:
+            return e
+
+    # The empty cell is the unfaceted total
+    with ThreadPoolExecutor(max_workers=FACET_WORKERS) as pool:
+        results = dict(zip([()] + cells, pool.map(_carry_span(count), [()] + cells)))
+
+    errors = [
+        {"cell": dict(zip(names, cell)), "error": str(n)}
+        for cell, n in results.items() if isinstance(n, Exception)
+    ]
+    counts = {cell: (None if isinstance(n, Exception) else n) for cell, n in results.items()}
+
+    response = {
+        "query": query,
+        "database": database,
+        "organism": organism,
+        "mode": "facets",
+        "facets": names,
+        "total_found": counts[()],
+    }
+    if len(names) == 1:
+        response["counts"] = {cell[0]: counts[cell] for cell in cells}
+    else:
+        rows, cols = values[names[0]], values[names[1]]
+        matrix = [[counts[(r, c)] for c in cols] for r in rows]
+        response.update({
+            "rows": rows,
+            "cols": cols,
+            "matrix": matrix,
+            "row_totals": [sum(n or 0 for n in row) for row in matrix],
+            "col_totals": [sum(row[j] or 0 for row in matrix) for j in range(len(cols))],
+        })
+    if errors:
+        response["errors"] = errors
+    response["took_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    response["next_step"] = "Pick a cell, then search_studies() without facets to fetch studies"
+    return json.dumps(response, indent=2)
+
+
 def _parse_entrez_summary(item: dict, database: str) -> dict:
     """Parse Entrez JSON summary into clean study record."""
     if database == "gds":
@@ -406,30 +1305,79 @@ def _extract_xml_text(xml_str: str, tag: str) -> str:
     return ""
 
 
+_ffq_endpoints_set = False
+_ffq_patch_lock = threading.Lock()
+
+
+class _FfqRequests:
+    """Stands in for the requests module inside ffq.utils.
+
+    ffq calls requests.get() for E-utilities itself; those calls go through
+    _ncbi_request so they share this process's NCBI rate limit (and API key)
+    with every other tool. Everything else is plain requests.
+    """
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def get(self, url, params=None, **kwargs):
+        if not url.startswith(NCBI_BASE):
+            return requests.get(url, params=params, **kwargs)
+        return _ncbi_request("GET", url, dict(params or {}), retries=2, timeout=kwargs.get("timeout") or 30)
+
+
+def _point_ffq_at_endpoints():
+    """Patch ffq once: rate-limit its NCBI requests and point it at any stand-in.
+
+    Its hard-coded NCBI/ENA URLs are rewritten when a stand-in base is configured.
+    """
+    global _ffq_endpoints_set
+    with _ffq_patch_lock:
+        if _ffq_endpoints_set:
+            return
+        from ffq import config, ffq, utils
+        utils.requests = _FfqRequests()
+        _ffq_endpoints_set = True
+        if NCBI_BASE == _NCBI_DEFAULT and ENA_BASE == _ENA_DEFAULT:
+            return
+        # ffq copies the constants into each module with `from .config import ...`
+        for module in (config, utils, ffq):
+            for name, value in list(vars(module).items()):
+                if isinstance(value, str) and name.isupper():
+                    new = value.replace(_NCBI_DEFAULT, NCBI_BASE).replace(_ENA_DEFAULT, ENA_BASE)
+                    if new != value:
+                        setattr(module, name, new)
+
+
 def _fetch_sra_metadata(accession: str) -> dict:
     """Fetch metadata for SRA/GEO accessions using ffq."""
     from ffq import ffq
 
+    _point_ffq_at_endpoints()
+
     acc_upper = accession.upper()
 
     # Route to appropriate ffq function based on accession prefix
     if acc_upper.startswith(('SRR', 'ERR', 'DRR')):
-        return ffq.ffq_run(accession)
+        fetch = ffq.ffq_run
     elif acc_upper.startswith('GSE'):
-        return ffq.ffq_gse(accession)
+        fetch = ffq.ffq_gse
     elif acc_upper.startswith('GSM'):
-        return ffq.ffq_gsm(accession)
+        fetch = ffq.ffq_gsm
     elif acc_upper.startswith(('SRP', 'ERP', 'DRP')):
-        return ffq.ffq_study(accession)
+        fetch = ffq.ffq_study
     elif acc_upper.startswith(('SRS', 'ERS', 'DRS')):
-        return ffq.ffq_sample(accession)
+        fetch = ffq.ffq_sample
     elif acc_upper.startswith(('SRX', 'ERX', 'DRX')):
-        return ffq.ffq_experiment(accession)
+        fetch = ffq.ffq_experiment
     elif acc_upper.startswith(('PRJNA', 'PRJEB', 'PRJDB')):
-        return ffq.ffq_bioproject(accession)
+        fetch = ffq.ffq_bioproject
     else:
         raise ValueError(f"Unknown accession type: {accession}")
 
+    with _upstream("ffq", fetch.__name__, accession=accession):
+        return fetch(accession)
+
 
 def _is_sra_accession(accession: str) -> bool:
     """Check if accession is an SRA/GEO type."""
@@ -463,8 +1411,8 @@ def _extract_ffq_summary(accession: str, data) -> dict:
                     "library_strategy": obj.get("library_strategy", ""),
                     "library_source": obj.get("library_source", ""),
                     "platform": obj.get("platform", ""),
-                    "spots": obj.get("spots", ""),
-                    "bases": obj.get("bases", "")
+                    "spots": _to_int(obj.get("spots")),
+                    "bases": _to_int(obj.get("bases"))
                 })
 
             for v in obj.values():
@@ -485,7 +1433,7 @@ def _extract_ffq_summary(accession: str, data) -> dict:
     return summary
 
 
-@mcp.tool()
+@_tool
 def get_study_info(accession: str) -> str:
     """
     Get metadata for a study or sample from GEO/SRA/ENA.
@@ -507,7 +1455,8 @@ def get_study_info(accession: str) -> str:
             data = _fetch_sra_metadata(accession)
         else:
             # Use gget.info() for Ensembl IDs
-            df = gget.info(accession)
+            with _upstream("gget", "info", accession=accession):
+                df = gget.info(accession)
             if df is None or (hasattr(df, 'empty') and df.empty):
                 return json.dumps({"error": "No data found", "accession": accession})
             if hasattr(df, 'to_dict'):
@@ -559,8 +1508,8 @@ def _extract_metadata_summary(accession: str, df) -> dict:
                 "library_strategy": record.get("library_strategy", ""),
                 "library_source": record.get("library_source", ""),
                 "platform": record.get("platform", record.get("instrument_platform", "")),
-                "spots": record.get("spots", record.get("total_spots", "")),
-                "bases": record.get("bases", record.get("total_bases", ""))
+                "spots": _to_int(record.get("spots", record.get("total_spots"))),
+                "bases": _to_int(record.get("bases", record.get("total_bases")))
             })
 
     summary["run_count"] = len(summary["runs"])
@@ -574,42 +1523,84 @@ def _extract_metadata_summary(accession: str, df) -> dict:
     return summary
 
 
-@mcp.tool()
-def list_runs(study_accession: str) -> str:
+@_tool
+def list_runs(
+    study_accession: str,
+    strategy: Optional[str] = None,
+    source: Optional[str] = None,
+    platform: Optional[str] = None,
+    min_spots: Optional[int] = None,
+    max_spots: Optional[int] = None,
+    min_bases: Optional[int] = None,
+    max_bases: Optional[int] = None,
+    accession_pattern: Optional[str] = None,
+    fields: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> str:
     """
     List all sequencing runs in a study with key metadata.
 
+    Filters are applied server-side, so only matching runs (and only the
+    requested fields) are returned - use them on large studies. Use
+    offset/limit to page through them; pages after the first are served
+    from the study's run list fetched for the first one.
+
     Args:
         study_accession: Study accession (GSE, SRP, PRJNA, ERP)
+        strategy: Only runs with this library strategy (e.g., "RNA-Seq")
+        source: Only runs with this library source (e.g., "TRANSCRIPTOMIC")
+        platform: Only runs whose instrument contains this text (e.g., "NovaSeq")
+        min_spots: Minimum spot (read) count
+        max_spots: Maximum spot (read) count
+        min_bases: Minimum base count
+        max_bases: Maximum base count
+        accession_pattern: Glob the run accession must match, case-insensitive
+                           ("SRR12*", "SRR1?34*"); text without * ? [ is a prefix
+        fields: Comma-separated fields to return (e.g., "accession,spots"). Default:
+                accession, sample, strategy, source, platform, spots, bases;
+                "all" adds platform_family and biosample
+        offset: Skip this many matching runs (default 0)
+        limit: Return at most this many runs (default: all); next_offset is
+               set while more remain
 
     Returns:
         JSON with run accessions and metadata (library type, platform, etc.)
 
-    Example:
+    Examples:
         list_runs("SRP123456")
+        list_runs("SRP123456", strategy="RNA-Seq", min_spots=10000000, fields="accession,spots")
+        list_runs("SRP123456", offset=2000, limit=2000)
     """
     try:
-        return _list_runs_entrez(study_accession)
+        return _list_runs_entrez(
+            study_accession,
+            filters={
+                "strategy": strategy, "source": source, "platform": platform,
+                "min_spots": min_spots, "max_spots": max_spots,
+                "min_bases": min_bases, "max_bases": max_bases,
+                "accession_pattern": accession_pattern,
+            },
+            fields=fields,
+            offset=offset,
+            limit=limit,
+        )
     except Exception as e:
         return json.dumps({"error": str(e), "study": study_accession})
 
 
-def _list_runs_entrez(study_accession: str) -> str:
-    """List runs via NCBI Entrez — fast, 2 HTTP calls, works on new studies."""
+def _list_runs_entrez(study_accession: str, filters: Optional[dict] = None,
+                      fields: Optional[str] = None, offset: int = 0,
+                      limit: Optional[int] = None) -> str:
+    """List runs via NCBI Entrez — fast, 2 HTTP calls, works on new studies.
 
-    # Search SRA for experiments belonging to this study
-    search_url = f"{NCBI_BASE}/esearch.fcgi"
-    resp = requests.get(search_url, params={
-        "db": "sra",
-        "term": f"{study_accession}[Study]",
-        "retmax": 500,
-        "retmode": "json",
-    }, timeout=30)
-    resp.raise_for_status()
-    result = resp.json().get("esearchresult", {})
-    id_list = result.get("idlist", [])
+    Paged requests (offset/limit given) reuse the study's runs for
+    STUDY_RUNS_TTL seconds, so walking a large study fetches it once.
+    """
+    paged = offset > 0 or limit is not None
+    runs = _cached_study_runs(study_accession) if paged else _fetch_study_runs(study_accession)
 
-    if not id_list:
+    if not runs:
         return json.dumps({
             "study": study_accession,
             "total_runs": 0,
@@ -617,6 +1608,106 @@ def _list_runs_entrez(study_accession: str) -> str:
             "message": "No experiments found for this study."
         }, indent=2)
 
+    matched = _filter_runs(runs, **(filters or {}))
+    response = {
+        "study": study_accession,
+        "total_runs": len(runs),
+    }
+    if len(matched) != len(runs):
+        response["matched"] = len(matched)
+    if paged:
+        offset = max(offset, 0)
+        end = len(matched) if limit is None else offset + max(limit, 0)
+        response["offset"] = offset
+        response["next_offset"] = end if end < len(matched) else None
+        matched = matched[offset:end]
+    response["runs"] = _project_runs(matched, fields)
+    return json.dumps(response, indent=2)
+
+
+def _to_int(value) -> int:
+    """Spot/base counts arrive as strings (or blanks) from NCBI/ffq; store ints."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return 0
+
+
+def _filter_runs(runs: list, strategy: Optional[str] = None, source: Optional[str] = None,
+                 platform: Optional[str] = None, min_spots: Optional[int] = None,
+                 max_spots: Optional[int] = None, min_bases: Optional[int] = None,
+                 max_bases: Optional[int] = None, accession_pattern: Optional[str] = None) -> list:
+    """Apply list_runs filters before serialization."""
+    strategy = strategy.lower() if strategy else None
+    source = source.lower() if source else None
+    platform = platform.lower() if platform else None
+    pattern = accession_pattern.upper() if accession_pattern else None
+    if pattern and not any(c in pattern for c in "*?["):
+        pattern += "*"
+
+    matched = []
+    for run in runs:
+        if strategy and run.get("strategy", "").lower() != strategy:
+            continue
+        if source and run.get("source", "").lower() != source:
+            continue
+        if platform and platform not in run.get("platform", "").lower():
+            continue
+        spots, bases = run.get("spots", 0), run.get("bases", 0)
+        if min_spots is not None and spots < min_spots:
+            continue
+        if max_spots is not None and spots > max_spots:
+            continue
+        if min_bases is not None and bases < min_bases:
+            continue
+        if max_bases is not None and bases > max_bases:
+            continue
+        if pattern and not fnmatch.fnmatchcase(run.get("accession", "").upper(), pattern):
+            continue
+        matched.append(run)
+    return matched
+
+
+# Fields list_runs returns unless asked for others: platform_family and
+# biosample are kept in the run store (for tags and sample tables) but only
+# sent on request, so default listings of large studies stay small
+LIST_RUNS_FIELDS = "accession,sample,strategy,source,platform,spots,bases"
+
+
+def _project_runs(runs: list, fields: Optional[str]) -> list:
+    """Keep only the requested fields (accession is always included); "all" keeps every field."""
+    if fields == "all":
+        return runs
+    fields = fields or LIST_RUNS_FIELDS
+    keep = ["accession"] + [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "accession"]
+    return [{k: run[k] for k in keep if k in run} for run in runs]
+
+
+# esearch returns at most this many UIDs per call; larger studies are paged
+ESEARCH_PAGE_SIZE = 10000
+
+
+def _fetch_sra_docsums(term: str) -> list:
+    """Search SRA experiments and fetch their summaries, in search order."""
+    search_url = f"{NCBI_BASE}/esearch.fcgi"
+    id_list = []
+    while True:
+        resp = _ncbi_post(search_url, {
+            "db": "sra",
+            "term": term,
+            "retstart": len(id_list),
+            "retmax": ESEARCH_PAGE_SIZE,
+            "retmode": "json",
+        })
+        result = resp.json().get("esearchresult", {})
+        page = result.get("idlist", [])
+        id_list.extend(page)
+        if not page or len(id_list) >= int(result.get("count", 0)):
+            break
+
     # Fetch summaries in batches (NCBI URL length limit)
     summary_url = f"{NCBI_BASE}/esummary.fcgi"
     doc_sums = {}
@@ -630,50 +1721,110 @@ def _list_runs_entrez(study_accession: str) -> str:
         })
         doc_sums.update(resp.json().get("result", {}))
 
-    runs = []
-    seen = set()
+    return [doc_sums[uid] for uid in id_list if isinstance(doc_sums.get(uid), dict)]
 
-    for uid in id_list:
-        if uid not in doc_sums:
-            continue
-        item = doc_sums[uid]
-        exp_xml = item.get("expxml", "")
-        runs_xml = item.get("runs", "")
 
-        # Extract experiment-level metadata
-        title = _extract_xml_text(exp_xml, "Title") or ""
-        platform = _extract_xml_attr(exp_xml, "Platform", "instrument_model") or ""
-        strategy = _extract_xml_attr(exp_xml, "Library_descriptor", "LIBRARY_STRATEGY") or ""
-        source = _extract_xml_attr(exp_xml, "Library_descriptor", "LIBRARY_SOURCE") or ""
+# Seconds a study's run list is reused for paged list_runs calls
+STUDY_RUNS_TTL = 600
 
-        # Extract individual runs from the runs XML
-        if runs_xml:
-            try:
-                root = ET.fromstring(f"<root>{runs_xml}</root>")
-                for run_el in root.findall(".//Run"):
-                    run_acc = run_el.get("acc", "")
-                    if run_acc and run_acc not in seen:
-                        seen.add(run_acc)
-                        runs.append({
-                            "accession": run_acc,
-                            "sample": title[:60],
-                            "strategy": strategy,
-                            "source": source,
-                            "platform": platform,
-                            "spots": run_el.get("total_spots", ""),
-                            "bases": run_el.get("total_bases", ""),
-                        })
-            except ET.ParseError:
-                pass
+_study_runs = {}  # study accession -> (fetched at, runs)
+_study_runs_lock = threading.Lock()
 
-    return json.dumps({
-        "study": study_accession,
-        "total_runs": len(runs),
-        "runs": runs
-    }, indent=2)
+
+def _cached_study_runs(study_accession: str) -> list:
+    """_fetch_study_runs, reusing the last result for STUDY_RUNS_TTL seconds."""
+    now = time.time()
+    with _study_runs_lock:
+        cached = _study_runs.get(study_accession)
+        if cached and now - cached[0] < STUDY_RUNS_TTL:
+            METRICS.inc("hox_cache_requests_total", cache="study_runs", result="hit")
+            return cached[1]
+    METRICS.inc("hox_cache_requests_total", cache="study_runs", result="miss")
+    return _fetch_study_runs(study_accession)
+
+
+def _fetch_study_runs(study_accession: str) -> list:
+    """All runs of a study (deduplicated), indexed locally as a side effect.
+
+    The study itself is indexed too (if it isn't already), so a study-level
+    search_local finds studies that were only browsed.
+    """
+    runs = []
+    seen = set()
+    study = None
+
+    for item in _fetch_sra_docsums(f"{study_accession}[Study]"):
+        if study is None:
+            exp_xml = item.get("expxml", "")
+            study = {
+                "accession": study_accession,
+                "title": _extract_xml_attr(exp_xml, "Study", "name") or "",
+                "organism": _extract_xml_attr(exp_xml, "Organism", "ScientificName") or "",
+            }
+        for run in _docsum_runs(item):
+            if run["accession"] not in seen:
+                seen.add(run["accession"])
+                runs.append(run)
+
+    if study and runs:
+        study.update(
+            strategy=Counter(r["strategy"] for r in runs).most_common(1)[0][0],
+            platform=Counter(r["platform"] for r in runs).most_common(1)[0][0],
+            runs=len(runs),
+        )
+        _index_records([study], "study", replace=False)
+    _index_records(runs, "run", study=study_accession)
+    try:
+        _store_runs(runs, study=study_accession)
+    except sqlite3.Error:
+        pass
+    if runs:
+        now = time.time()
+        with _study_runs_lock:
+            for key in [k for k, (at, _) in _study_runs.items() if now - at >= STUDY_RUNS_TTL]:
+                del _study_runs[key]
+            _study_runs[study_accession] = (now, runs)
+    return runs
+
+
+def _docsum_runs(item: dict) -> list:
+    """Extract the individual runs from one SRA experiment docsum."""
+    exp_xml = item.get("expxml", "")
+    runs_xml = item.get("runs", "")
+    if not runs_xml:
+        return []
+
+    # Extract experiment-level metadata
+    title = _extract_xml_text(exp_xml, "Title") or ""
+    platform = _extract_xml_attr(exp_xml, "Platform", "instrument_model") or ""
+    platform_family = _extract_xml_text(exp_xml, "Platform") or ""
+    strategy = _extract_xml_attr(exp_xml, "Library_descriptor", "LIBRARY_STRATEGY") or ""
+    source = _extract_xml_attr(exp_xml, "Library_descriptor", "LIBRARY_SOURCE") or ""
+    biosample = _extract_xml_text(exp_xml, "Biosample") or ""
+
+    runs = []
+    try:
+        root = ET.fromstring(f"<root>{runs_xml}</root>")
+        for run_el in root.findall(".//Run"):
+            run_acc = run_el.get("acc", "")
+            if run_acc:
+                runs.append({
+                    "accession": run_acc,
+                    "sample": title[:60],
+                    "strategy": strategy,
+                    "source": source,
+                    "platform": platform,
+                    "platform_family": platform_family,
+                    "spots": _to_int(run_el.get("total_spots")),
+                    "bases": _to_int(run_el.get("total_bases")),
+                    "biosample": biosample,
+                })
+    except ET.ParseError:
+        pass
+    return runs
 
 
-@mcp.tool()
+@_tool
 def get_file_urls(accession: str) -> str:
     """
     Get download URLs for sequencing data files (FASTQ, BAM, etc.).
@@ -693,9 +1844,12 @@ def get_file_urls(accession: str) -> str:
     """
     from ffq.ffq import ffq_ids
 
+    _point_ffq_at_endpoints()
+
     try:
         # ffq_ids returns a list of dicts with file info
-        data = ffq_ids([accession])
+        with _upstream("ffq", "ffq_ids", accession=accession):
+            data = ffq_ids([accession])
 
         if not data:
             return json.dumps({"error": "No files found", "accession": accession})
@@ -729,60 +1883,1144 @@ def get_file_urls(accession: str) -> str:
 
 
 # ============================================================================
-# MANIFEST - Curate datasets for approval
+# SAMPLES - BioSample attributes as a columnar, filterable table
 # ============================================================================
 
-@mcp.tool()
-def create_manifest(
-    name: str,
-    description: str,
-    accessions: str,
-    tags: Optional[str] = None
+# BioSample records per efetch POST
+BIOSAMPLE_BATCH = 200
+# Run accessions per [Accession] OR-query when resolving manifest runs
+RUN_LOOKUP_BATCH = 200
+SAMPLE_TABLE_TTL = 3600
+
+_FILTER_RE = re.compile(r"^\s*([\w .()/-]+?)\s*(>=|<=|!=|=|~|>|<)\s*(.*?)\s*$")
+_NUMBER_RE = re.compile(r"[-+]?\d*\.?\d+")
+
+
+class SampleTable:
+    """Dictionary-encoded columns over runs: filtering is a NumPy gather, not a row loop.
+
+    Each column is an int32 code array into a list of distinct values (code 0 = missing),
+    so predicates are evaluated once per distinct value and broadcast to all rows.
+    """
+
+    BASE_COLUMNS = ("run", "biosample", "strategy", "source", "platform")
+
+    def __init__(self, columns: dict, categories: dict, size: int):
+        self.columns = columns
+        self.categories = categories
+        self.size = size
+        self._numeric = {}
+
+    @classmethod
+    def from_records(cls, runs: list, biosamples: dict) -> "SampleTable":
+        names = list(cls.BASE_COLUMNS)
+        for attrs in biosamples.values():
+            for key in attrs:
+                if key not in names:
+                    names.append(key)
+
+        columns, categories = {}, {}
+        for name in names:
+            lookup = {"": 0}
+            codes = np.zeros(len(runs), dtype=np.int32)
+            for i, run in enumerate(runs):
+                if name == "run":
+                    value = run.get("accession", "")
+                elif name in cls.BASE_COLUMNS:
+                    value = run.get(name, "")
+                else:
+                    value = biosamples.get(run.get("biosample", ""), {}).get(name, "")
+                codes[i] = lookup.setdefault(str(value), len(lookup))
+            columns[name] = codes
+            categories[name] = list(lookup)
+        return cls(columns, categories, len(runs))
+
+    def _numbers(self, name: str) -> np.ndarray:
+        """Leading number of each distinct value (e.g. "45 years" -> 45), NaN if none."""
+        if name not in self._numeric:
+            values = []
+            for cat in self.categories[name]:
+                match = _NUMBER_RE.search(cat)
+                values.append(float(match.group()) if match else np.nan)
+            self._numeric[name] = np.array(values, dtype=np.float64)
+        return self._numeric[name]
+
+    def mask(self, name: str, op: str, value: str) -> np.ndarray:
+        if name not in self.columns:
+            raise ValueError(f"Unknown attribute '{name}'. Available: {', '.join(self.columns)}")
+        codes = self.columns[name]
+
+        if op in (">", ">=", "<", "<="):
+            nums = self._numbers(name)[codes]
+            target = float(value)
+            with np.errstate(invalid="ignore"):
+                return {
+                    ">": nums > target, ">=": nums >= target,
+                    "<": nums < target, "<=": nums <= target,
+                }[op]
+
+        wanted = value.lower()
+        if op == "~":
+            hits = np.array([wanted in cat.lower() for cat in self.categories[name]])
+        else:
+            hits = np.array([cat.lower() == wanted for cat in self.categories[name]])
+            if op == "!=":
+                hits = ~hits
+        return hits[codes]
+
+    def filter(self, criteria: list) -> np.ndarray:
+        """AND together (name, op, value) criteria; returns matching row indices."""
+        mask = np.ones(self.size, dtype=bool)
+        for name, op, value in criteria:
+            mask &= self.mask(name, op, value)
+        return np.flatnonzero(mask)
+
+    def value_counts(self, name: str, rows: np.ndarray, top: int = 5) -> dict:
+        counts = np.bincount(self.columns[name][rows], minlength=len(self.categories[name]))
+        counts[0] = 0
+        order = np.argsort(-counts)[:top]
+        return {self.categories[name][i]: int(counts[i]) for i in order if counts[i]}
+
+    def rows(self, rows: np.ndarray, names: Optional[list] = None) -> list:
+        names = names or list(self.columns)
+        decoded = {name: [self.categories[name][c] for c in self.columns[name][rows]] for name in names}
+        return [{name: decoded[name][i] for name in names} for i in range(len(rows))]
+
+
+_sample_tables = {}  # source -> (built at, version, table)
+_sample_tables_lock = threading.Lock()
+
+
+def _fetch_runs_by_accession(run_accessions: list) -> list:
+    """Resolve run accessions to run records (with BioSample) in batched OR-queries."""
+    wanted = set(run_accessions)
+    runs = {}
+    for i in range(0, len(run_accessions), RUN_LOOKUP_BATCH):
+        batch = run_accessions[i:i + RUN_LOOKUP_BATCH]
+        term = " OR ".join(f"{acc}[Accession]" for acc in batch)
+        for item in _fetch_sra_docsums(term):
+            for run in _docsum_runs(item):
+                if run["accession"] in wanted:
+                    runs.setdefault(run["accession"], run)
+    return [runs[acc] for acc in run_accessions if acc in runs]
+
+
+def _manifest_sample_runs(manifest: dict) -> list:
+    """A manifest's runs (store record + overrides), each once.
+
+    Only runs the store has no BioSample for are looked up at NCBI, and what
+    comes back is stored for next time.
+    """
+    runs = {}
+    for entry in manifest.get("accessions", []):
+        for run in _entry_runs(entry):
+            runs.setdefault(run["accession"], run)
+    missing = [acc for acc, run in runs.items() if not run.get("biosample")]
+    if missing:
+        fetched = _fetch_runs_by_accession(missing)
+        _store_runs(fetched)
+        for run in fetched:
+            runs[run["accession"]] = {**runs[run["accession"]], **{k: v for k, v in run.items() if v not in ("", None)}}
+    return list(runs.values())
+
+
+def _fetch_biosamples(accessions: list) -> dict:
+    """Batched BioSample efetch, parsed into {accession: {attribute: value}}."""
+    samples = {}
+    for i in range(0, len(accessions), BIOSAMPLE_BATCH):
+        batch = accessions[i:i + BIOSAMPLE_BATCH]
+        resp = _ncbi_post(f"{NCBI_BASE}/efetch.fcgi", {
+            "db": "biosample",
+            "id": ",".join(batch),
+            "retmode": "xml",
+        })
+        try:
+            root = ET.fromstring(resp.content)
+        except ET.ParseError:
+            continue
+        for sample in root.iter("BioSample"):
+            attrs = {}
+            for attr in sample.iter("Attribute"):
+                name = attr.get("harmonized_name") or attr.get("attribute_name") or ""
+                if name and attr.text:
+                    attrs[name.lower()] = attr.text.strip()
+            samples[sample.get("accession", "")] = attrs
+    return samples
+
+
+def _sample_table(source: str, runs_loader, version=None) -> SampleTable:
+    """Build (or reuse a cached) SampleTable for a study or manifest.
+
+    One table is kept per source: a new version (e.g. a rewritten manifest)
+    replaces the old one, and expired tables are dropped whenever one is added.
+    """
+    now = time.time()
+    with _sample_tables_lock:
+        cached = _sample_tables.get(source)
+        if cached and now - cached[0] < SAMPLE_TABLE_TTL and cached[1] == version:
+            METRICS.inc("hox_cache_requests_total", cache="sample_table", result="hit")
+            return cached[2]
+    METRICS.inc("hox_cache_requests_total", cache="sample_table", result="miss")
+
+    runs = runs_loader()
+    biosamples = _fetch_biosamples(sorted({r["biosample"] for r in runs if r.get("biosample")}))
+    table = SampleTable.from_records(runs, biosamples)
+
+    with _sample_tables_lock:
+        for key in [k for k, (at, _, _) in _sample_tables.items() if now - at >= SAMPLE_TABLE_TTL]:
+            del _sample_tables[key]
+        _sample_tables[source] = (now, version, table)
+    return table
+
+
+def _parse_filters(filters: Optional[str]) -> list:
+    """Parse 'tissue=brain,age>=30,disease~depress' into (name, op, value) criteria."""
+    criteria = []
+    for part in (filters or "").split(","):
+        if not part.strip():
+            continue
+        match = _FILTER_RE.match(part)
+        if not match:
+            raise ValueError(f"Cannot parse filter '{part.strip()}'")
+        name, op, value = match.groups()
+        criteria.append((name.strip().lower(), op, value))
+    return criteria
+
+
+@_tool
+def get_sample_attributes(
+    study_accession: Optional[str] = None,
+    manifest_name: Optional[str] = None,
+    filters: Optional[str] = None,
+    columns: Optional[str] = None,
+    limit: int = 100
 ) -> str:
     """
-    Create a manifest of datasets for approval before loading into Hox.
+    Get BioSample attributes (tissue, disease, age, sex...) for every run and filter on them.
 
-    The manifest captures metadata for each accession and saves it for review.
-    Use approve_manifest() after review, then import_to_hox() to load.
+    BioSample records are fetched in bulk once per study or manifest and cached
+    as a columnar table, so repeated filtering is fast even for 10k+ samples.
+    A manifest's runs take their BioSample IDs from the run store; only runs
+    it has none for are looked up at NCBI.
 
     Args:
-        name: Short name for this manifest (becomes filename)
-        description: What this data is for (e.g., "MDD RNA-seq for treatment response model")
-        accessions: Comma-separated accessions (SRR, GSM, GSE, SRP - will extract runs)
-        tags: Optional key=value pairs for Hox tags (e.g., "disease=MDD,tissue=brain")
+        study_accession: Study accession (SRP, ERP, PRJNA) - or use manifest_name
+        manifest_name: Use the runs of an existing manifest instead of a study
+        filters: Comma-separated conditions: "=", "!=", "~" (contains), and numeric
+            ">", ">=", "<", "<=" (e.g., "tissue~cortex,sex=female,age>=30")
+        columns: Comma-separated attributes to return (default: all)
+        limit: Maximum sample rows to return (default: 100); run_accessions lists all matches
 
     Returns:
-        JSON with manifest summary and file path
+        JSON with matching runs and their attributes, plus top values per attribute
 
-    Example:
-        create_manifest(
-            name="mdd_rnaseq_v1",
-            description="Prefrontal cortex RNA-seq from MDD patients for biotype classification",
-            accessions="SRR123,SRR124,SRR125",
-            tags="disease=MDD,tissue=DLPFC,assay=RNA-seq"
+    Examples:
+        get_sample_attributes("SRP123456")
+        get_sample_attributes("SRP123456", filters="tissue~prefrontal,disease=MDD")
+        get_sample_attributes(manifest_name="mdd_rnaseq_v1", filters="sex=female")
+    """
+    try:
+        if manifest_name:
+            path = _manifest_path(manifest_name)
+            manifest = _load_manifest(manifest_name)
+            if manifest is None:
+                return json.dumps({"error": f"Manifest '{manifest_name}' not found"})
+            table = _sample_table(f"manifest:{manifest_name}", lambda: _manifest_sample_runs(manifest),
+                                  version=path.stat().st_mtime_ns)
+        elif study_accession:
+            source = f"study:{study_accession}"
+            table = _sample_table(source, lambda: _fetch_study_runs(study_accession))
+        else:
+            return json.dumps({"error": "Provide study_accession or manifest_name"})
+
+        rows = table.filter(_parse_filters(filters))
+        names = [c.strip().lower() for c in columns.split(",")] if columns else list(table.columns)
+        names = [n for n in names if n in table.columns]
+        if "run" not in names:
+            names.insert(0, "run")
+
+        return json.dumps({
+            "source": study_accession or manifest_name,
+            "total_samples": table.size,
+            "matched": len(rows),
+            "attributes": {
+                name: table.value_counts(name, rows)
+                for name in table.columns if name not in ("run", "biosample")
+            },
+            "samples": table.rows(rows[:max(0, limit)], names),
+            "run_accessions": [table.categories["run"][c] for c in table.columns["run"][rows]],
+        }, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "source": study_accession or manifest_name})
+
+
+# ============================================================================
+# LOCAL INDEX - Offline full-text search over everything we've fetched
+# ============================================================================
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    accession TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    study TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    organism TEXT NOT NULL DEFAULT '',
+    strategy TEXT NOT NULL DEFAULT '',
+    platform TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL DEFAULT '{}',
+    indexed_at TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS records_kind_study ON records (kind, study);
+CREATE TABLE IF NOT EXISTS run_store (
+    accession TEXT PRIMARY KEY,
+    study TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL DEFAULT '{}',
+    updated_at TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS run_store_study ON run_store (study);
+CREATE INDEX IF NOT EXISTS run_store_updated ON run_store (updated_at);
+CREATE TABLE IF NOT EXISTS harvest_slices (
+    slice TEXT PRIMARY KEY,
+    query TEXT NOT NULL DEFAULT '',
+    organism TEXT NOT NULL DEFAULT '',
+    high_water TEXT NOT NULL DEFAULT '',
+    records INTEGER NOT NULL DEFAULT 0,
+    last_run TEXT NOT NULL DEFAULT ''
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    accession, study, title, summary, organism, strategy, platform, date,
+    content='records', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS records_ai AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts (rowid, accession, study, title, summary, organism, strategy, platform, date)
+    VALUES (new.rowid, new.accession, new.study, new.title, new.summary, new.organism, new.strategy, new.platform, new.date);
+END;
+CREATE TRIGGER IF NOT EXISTS records_ad AFTER DELETE ON records BEGIN
+    INSERT INTO records_fts (records_fts, rowid, accession, study, title, summary, organism, strategy, platform, date)
+    VALUES ('delete', old.rowid, old.accession, old.study, old.title, old.summary, old.organism, old.strategy, old.platform, old.date);
+END;
+CREATE TRIGGER IF NOT EXISTS records_au AFTER UPDATE ON records BEGIN
+    INSERT INTO records_fts (records_fts, rowid, accession, study, title, summary, organism, strategy, platform, date)
+    VALUES ('delete', old.rowid, old.accession, old.study, old.title, old.summary, old.organism, old.strategy, old.platform, old.date);
+    INSERT INTO records_fts (rowid, accession, study, title, summary, organism, strategy, platform, date)
+    VALUES (new.rowid, new.accession, new.study, new.title, new.summary, new.organism, new.strategy, new.platform, new.date);
+END;
+"""
+
+# Keep the richer value when a later fetch returns a sparser record
+_INDEX_UPSERT = """
+INSERT INTO records (accession, kind, study, title, summary, organism, strategy, platform, date, data, indexed_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (accession) DO UPDATE SET
+    kind = excluded.kind,
+    study = COALESCE(NULLIF(excluded.study, ''), records.study),
+    title = COALESCE(NULLIF(excluded.title, ''), records.title),
+    summary = COALESCE(NULLIF(excluded.summary, ''), records.summary),
+    organism = COALESCE(NULLIF(excluded.organism, ''), records.organism),
+    strategy = COALESCE(NULLIF(excluded.strategy, ''), records.strategy),
+    platform = COALESCE(NULLIF(excluded.platform, ''), records.platform),
+    date = COALESCE(NULLIF(excluded.date, ''), records.date),
+    data = excluded.data,
+    indexed_at = excluded.indexed_at
+"""
+
+_INDEX_INSERT_NEW = """
+INSERT OR IGNORE INTO records (accession, kind, study, title, summary, organism, strategy, platform, date, data, indexed_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Accessions per IN (...) lookup when checking which records are new
+INDEX_LOOKUP_BATCH = 500
+
+_index_lock = threading.Lock()
+_index_conn = None
+
+# PRAGMA user_version of the index; 1: run store rows use canonical run keys
+INDEX_SCHEMA_VERSION = 1
+
+
+def _index_db() -> sqlite3.Connection:
+    """Open (once) the shared index connection. Callers must hold _index_lock."""
+    global _index_conn
+    if _index_conn is None:
+        conn = sqlite3.connect(str(INDEX_DB), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_INDEX_SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < INDEX_SCHEMA_VERSION:
+            _migrate_run_store(conn)
+            conn.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+        _index_conn = conn
+    return _index_conn
+
+
+def _index_row(record: dict, kind: str, study: str, now: str) -> Optional[tuple]:
+    """Map a study/experiment/run record from any fetch path onto index columns."""
+    if kind == "experiment":
+        accession = record.get("experiment") or record.get("accession", "")
+        study = record.get("accession", "") if accession != record.get("accession") else study
+    else:
+        accession = record.get("accession", "")
+    if not accession:
+        return None
+
+    return (
+        accession,
+        kind,
+        study or record.get("study", ""),
+        str(record.get("title") or record.get("sample") or record.get("sample_title") or ""),
+        str(record.get("summary") or record.get("abstract") or record.get("description") or ""),
+        str(record.get("organism") or ""),
+        str(record.get("strategy") or record.get("library_strategy") or record.get("type") or ""),
+        str(record.get("platform") or ""),
+        str(record.get("date") or ""),
+        json.dumps(record, default=str),
+        now,
+    )
+
+
+def _index_records(records: list, kind: str, study: str = "", replace: bool = True) -> int:
+    """Upsert fetched records into the local index. Never fails the caller.
+
+    replace=False only adds records not indexed yet (for sparse stand-ins
+    that shouldn't overwrite a fuller record). Returns how many of the
+    records weren't indexed before (0 if the index can't be written).
+    """
+    if not records:
+        return 0
+    now = datetime.now().isoformat()
+    rows = [row for row in (_index_row(r, kind, study, now) for r in records if isinstance(r, dict)) if row]
+    if not rows:
+        return 0
+    accessions = {row[0] for row in rows}
+    try:
+        with _index_lock:
+            conn = _index_db()
+            known = set()
+            batch = sorted(accessions)
+            for i in range(0, len(batch), INDEX_LOOKUP_BATCH):
+                chunk = batch[i:i + INDEX_LOOKUP_BATCH]
+                known.update(acc for (acc,) in conn.execute(
+                    f"SELECT accession FROM records WHERE accession IN ({','.join('?' * len(chunk))})", chunk))
+            with conn:
+                conn.executemany(_INDEX_UPSERT if replace else _INDEX_INSERT_NEW, rows)
+    except sqlite3.Error:
+        return 0
+    return len(accessions - known)
+
+
+def _index_ffq_summary(summary: dict) -> None:
+    """Index the study record and runs from an _extract_ffq_summary() result."""
+    accession = summary.get("accession", "")
+    runs = summary.get("runs") or ([summary["run_info"]] if "run_info" in summary else [])
+    if not accession.upper().startswith(("SRR", "ERR", "DRR")):
+        study = {k: v for k, v in summary.items() if k not in ("runs", "run_info")}
+        _index_records([study], "study")
+    else:
+        accession = ""
+    _index_records(runs, "run", study=accession)
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every token must prefix-match."""
+    tokens = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{tok}"*' for tok in tokens)
+
+
+def _search_index(query: str, kinds: tuple, organism: Optional[str],
+                  strategy: Optional[str], limit: int) -> list:
+    """Run a ranked FTS5 query against the local index."""
+    where = [f"r.kind IN ({','.join('?' for _ in kinds)})"]
+    params = list(kinds)
+    if organism:
+        where.append("r.organism LIKE ?")
+        params.append(organism)
+    if strategy:
+        where.append("r.strategy LIKE ?")
+        params.append(strategy)
+
+    match = _fts_query(query)
+    if match:
+        # Column weights: accession, study, title, summary, organism, strategy, platform, date
+        sql = (
+            "SELECT r.*, bm25(records_fts, 10.0, 4.0, 5.0, 2.0, 1.0, 1.0, 1.0, 0.5) AS score "
+            "FROM records_fts JOIN records r ON r.rowid = records_fts.rowid "
+            f"WHERE records_fts MATCH ? AND {' AND '.join(where)} ORDER BY score LIMIT ?"
         )
+        params = [match] + params
+    else:
+        sql = f"SELECT r.*, 0 AS score FROM records r WHERE {' AND '.join(where)} ORDER BY r.date DESC LIMIT ?"
+    params.append(limit)
+
+    with _index_lock:
+        return [dict(row) for row in _index_db().execute(sql, params).fetchall()]
+
+
+def _local_studies(rows: list, limit: int) -> list:
+    """Collapse study and experiment hits into study-level results (like _search_sra)."""
+    study_map = {}
+    for row in rows:
+        data = json.loads(row["data"])
+        study_acc = row["accession"] if row["kind"] == "study" else (row["study"] or row["accession"])
+        if study_acc not in study_map and len(study_map) >= limit:
+            continue
+        if study_acc in study_map:
+            s = study_map[study_acc]
+            if row["kind"] == "experiment":
+                s["runs"] = s.get("runs", 0) + (data.get("runs", 0) or 0)
+            for key in ("title", "summary", "organism", "strategy", "platform", "date"):
+                if not s.get(key) and row[key]:
+                    s[key] = row[key]
+            continue
+        if row["kind"] == "experiment":
+            study_map[study_acc] = {**data, "accession": study_acc}
+        else:
+            study_map[study_acc] = data
+
+    # Runs the store holds for a study beat counts summed from whichever hits matched
+    if study_map:
+        accs = list(study_map)
+        with _index_lock:
+            counts = _index_db().execute(
+                f"SELECT study, count(*) FROM run_store WHERE study IN ({','.join('?' for _ in accs)}) GROUP BY study",
+                accs,
+            ).fetchall()
+        for study_acc, count in counts:
+            study_map[study_acc]["runs"] = count
+    return list(study_map.values())
+
+
+@_tool
+def search_local(
+    query: str,
+    kind: str = "study",
+    organism: Optional[str] = None,
+    strategy: Optional[str] = None,
+    limit: int = 20,
+    include_live: bool = False,
+    database: str = "sra"
+) -> str:
     """
-    manifest = {
-        "name": name,
-        "description": description,
-        "created_at": datetime.now().isoformat(),
-        "status": "pending",
-        "tags": _parse_tags(tags),
-        "accessions": [],
-        "total_runs": 0
+    Search the local index of every study and run fetched so far (works offline).
+
+    Everything returned by search_studies(), list_runs() and create_manifest()
+    is indexed locally, so repeat discovery queries answer in milliseconds.
+
+    Args:
+        query: Search terms matched against accession, study, title, summary, organism,
+            strategy, platform and date
+        kind: "study" for study-level results, "run" for individual runs (default: study)
+        organism: Optional organism filter (e.g., "Homo sapiens")
+        strategy: Optional library strategy filter (e.g., "RNA-Seq")
+        limit: Maximum results to return (default: 20, max: 500)
+        include_live: Also query NCBI via search_studies() and merge the results
+        database: NCBI database for the live query - "gds" or "sra" (default: sra)
+
+    Returns:
+        JSON with matching studies (or runs), each tagged with its origin
+        ("local", "live" or "both")
+
+    Examples:
+        search_local("prefrontal cortex")
+        search_local("SRP123456", kind="run")
+        search_local("brain RNA-seq", include_live=True)
+    """
+    start = time.perf_counter()
+    limit = max(1, min(limit, 500))
+    try:
+        if kind == "run":
+            rows = _search_index(query, ("run",), organism, strategy, limit)
+            results = [{**json.loads(r["data"]), "study": r["study"], "origin": "local"} for r in rows]
+        else:
+            # Experiments collapse into studies, so over-fetch before grouping
+            rows = _search_index(query, ("study", "experiment"), organism, strategy, limit * 10)
+            results = [{**s, "origin": "local"} for s in _local_studies(rows, limit)]
+    except sqlite3.Error as e:
+        return json.dumps({"error": f"Local index unavailable: {e}", "query": query})
+
+    response = {
+        "query": query,
+        "kind": kind,
+        "returned": len(results),
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
     }
 
-    acc_list = [a.strip() for a in accessions.split(",") if a.strip()]
+    if include_live and kind != "run":
+        live = json.loads(search_studies(query, database=database, organism=organism or "", limit=limit))
+        if "error" in live:
+            response["live_error"] = live["error"]
+        else:
+            seen = {s.get("accession"): s for s in results}
+            for study in live.get("studies", []):
+                acc = study.get("accession")
+                if acc in seen:
+                    seen[acc]["origin"] = "both"
+                else:
+                    results.append({**study, "origin": "live"})
+            response["live_total_found"] = live.get("total_found", 0)
+            response["returned"] = len(results)
 
-    for acc in acc_list:
-        entry = {"accession": acc, "status": "ok", "runs": []}
+    response["runs" if kind == "run" else "studies"] = results
+    return json.dumps(response, indent=2, default=str)
+
+
+# Experiments per esummary page when harvesting through the history server
+HARVEST_PAGE_SIZE = 500
+
+
+def _harvest_window(term: str) -> tuple:
+    """Fetch every SRA summary matching term via the history server and index it.
+
+    Returns (summaries fetched, experiments new to the index).
+    """
+    search = _ncbi_post(f"{NCBI_BASE}/esearch.fcgi", {
+        "db": "sra",
+        "term": term,
+        "retmax": 0,
+        "retmode": "json",
+        "usehistory": "y",
+    }).json().get("esearchresult", {})
+    count = int(search.get("count", 0))
+    new = 0
+
+    for retstart in range(0, count, HARVEST_PAGE_SIZE):
+        doc_sums = _ncbi_post(f"{NCBI_BASE}/esummary.fcgi", {
+            "db": "sra",
+            "WebEnv": search.get("webenv", ""),
+            "query_key": search.get("querykey", ""),
+            "retstart": retstart,
+            "retmax": HARVEST_PAGE_SIZE,
+            "retmode": "json",
+        }).json().get("result", {})
+
+        experiments = []
+        runs = []
+        for uid in doc_sums.get("uids", []):
+            item = doc_sums.get(uid)
+            if not isinstance(item, dict):
+                continue
+            parsed = _parse_entrez_summary(item, "sra")
+            experiments.append(parsed)
+            runs.extend({**run, "study": parsed.get("accession", "")} for run in _docsum_runs(item))
+
+        new += _index_records(experiments, "experiment")
+        _index_records(runs, "run")
+
+    return count, new
+
+
+def _harvest_slices() -> list:
+    """Return the stored state of every harvested slice."""
+    with _index_lock:
+        rows = _index_db().execute("SELECT * FROM harvest_slices ORDER BY slice").fetchall()
+    return [dict(row) for row in rows]
+
+
+def _save_harvest_state(slice_key: str, query: str, organism: str, high_water: str, records: int) -> None:
+    with _index_lock:
+        conn = _index_db()
+        with conn:
+            conn.execute(
+                "INSERT INTO harvest_slices (slice, query, organism, high_water, records, last_run) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (slice) DO UPDATE SET "
+                "high_water = excluded.high_water, records = harvest_slices.records + excluded.records, "
+                "last_run = excluded.last_run",
+                (slice_key, query, organism, high_water, records, datetime.now().isoformat()),
+            )
+
+
+@_tool
+def harvest_slice(
+    query: str = "",
+    organism: str = "Homo sapiens",
+    start_year: int = 2008,
+    window_days: int = 90,
+    max_records: int = 20000
+) -> str:
+    """
+    Incrementally harvest SRA metadata for an organism/strategy slice into the local index.
+
+    Walks PDAT date windows from the slice's high-water mark up to today, bulk-fetching
+    summaries through the NCBI history server. The first run backfills from start_year;
+    later runs only fetch records published since the last harvest. Run it on a schedule
+    (e.g. cron: python test_tools.py harvest_slice '{"query": "RNA-seq"}'), then answer
+    discovery queries for the slice offline with search_local().
+
+    Args:
+        query: Slice definition, same syntax as search_studies (e.g., "RNA-seq", "ATAC-seq brain")
+        organism: Organism for the slice (default: "Homo sapiens", use "" for all)
+        start_year: First year to backfill on the initial harvest (default: 2008)
+        window_days: Size of each PDAT date window (default: 90)
+        max_records: Stop after roughly this many records; the next run resumes (default: 20000)
+
+    Returns:
+        JSON with the windows fetched and the slice's new high-water mark. Each
+        window's "new" (and the slice's stored record count) only counts
+        experiments not indexed before, so the re-fetched high-water day
+        isn't counted twice.
+
+    Example:
+        harvest_slice("RNA-seq", organism="Homo sapiens")
+    """
+    base = _build_sra_query(query, organism, None)
+    if not base:
+        return json.dumps({"error": "Slice needs a query or an organism"})
+
+    state = next((s for s in _harvest_slices() if s["slice"] == base), None)
+    if state and state["high_water"]:
+        # Re-fetch the high-water day itself: records published later that day are picked up
+        start = datetime.strptime(state["high_water"], "%Y/%m/%d").date()
+    else:
+        start = datetime(start_year, 1, 1).date()
+
+    today = datetime.now().date()
+    window_days = max(1, window_days)
+    fetched = new_records = 0
+    windows = []
+    high_water = state["high_water"] if state else ""
+
+    try:
+        while start <= today and fetched < max_records:
+            end = min(start + timedelta(days=window_days - 1), today)
+            window = f"{start:%Y/%m/%d}-{end:%Y/%m/%d}"
+            count, new = _harvest_window(f"{base} AND {_year_to_pdat(window)}")
+
+            high_water = f"{end:%Y/%m/%d}"
+            _save_harvest_state(base, query, organism, high_water, new)
+            fetched += count
+            new_records += new
+            windows.append({"window": window, "records": count, "new": new})
+            start = end + timedelta(days=1)
+    except Exception as e:
+        return json.dumps({
+            "error": str(e),
+            "slice": base,
+            "high_water": high_water,
+            "windows": windows,
+            "hint": "Progress up to high_water is saved; re-run to resume"
+        }, indent=2)
+
+    return json.dumps({
+        "slice": base,
+        "high_water": high_water,
+        "records_fetched": fetched,
+        "new_records": new_records,
+        "windows": windows,
+        "complete": start > today,
+        "next_step": f"search_local(query, organism=\"{organism}\") answers from local data"
+    }, indent=2)
+
+
+# ============================================================================
+# RUN STORE - One copy of each run's metadata, referenced by manifests
+# ============================================================================
+
+_RUN_STORE_UPSERT = """
+INSERT INTO run_store (accession, study, data, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (accession) DO UPDATE SET
+    study = COALESCE(NULLIF(excluded.study, ''), run_store.study),
+    data = json_patch(run_store.data, excluded.data),
+    updated_at = excluded.updated_at
+WHERE json_patch(run_store.data, excluded.data) IS NOT json(run_store.data)
+    OR COALESCE(NULLIF(excluded.study, ''), run_store.study) IS NOT run_store.study
+"""
+
+# Accessions per IN (...) lookup (SQLite's default variable limit is 999+)
+RUN_STORE_BATCH = 500
+
+# Run fields are stored under the SRA docsum names (see _docsum_runs);
+# ffq/ENA records use these instead
+_RUN_KEY_ALIASES = {
+    "sample_title": "sample",
+    "library_strategy": "strategy",
+    "library_source": "source",
+    "instrument_platform": "platform_family",
+    "instrument_model": "platform",
+}
+
+# SRA's platform (instrument family) vocabulary, as in the SRA experiment
+# schema's PLATFORM element; any other value is an instrument model
+_PLATFORM_FAMILIES = frozenset({
+    "ABI_SOLID", "BGISEQ", "CAPILLARY", "COMPLETE_GENOMICS", "DNBSEQ", "ELEMENT", "GENAPSYS",
+    "GENEMIND", "HELICOS", "ILLUMINA", "ION_TORRENT", "LS454", "OXFORD_NANOPORE", "PACBIO_SMRT",
+    "TAPESTRI", "ULTIMA", "VELA_DIAGNOSTICS",
+})
+
+
+def _canonical_run(run: dict) -> dict:
+    """Map a run dict from any fetch path onto the run store's keys.
+
+    "platform" is the instrument model, as in docsums; ffq and ENA give the
+    instrument family there, which goes to "platform_family". A blank value
+    doesn't replace one already mapped to the same key.
+    """
+    out = {}
+    for key, value in run.items():
+        key = _RUN_KEY_ALIASES.get(key, key)
+        if key == "platform" and isinstance(value, str) and value in _PLATFORM_FAMILIES:
+            key = "platform_family"
+        if value not in ("", None) or key not in out:
+            out[key] = value
+    return out
+
+
+def _store_runs(runs: list, study: str = "") -> None:
+    """Upsert run metadata into the shared run store; newer fields win.
+
+    Rows the upsert wouldn't change are left alone, updated_at included, so
+    re-fetching a study doesn't move _run_store_version() (or manifest ETags).
+    """
+    now = datetime.now().isoformat()
+    rows = [
+        (r["accession"], study or r.get("study", ""), json.dumps(_canonical_run(r), default=str), now)
+        for r in runs if isinstance(r, dict) and r.get("accession")
+    ]
+    if not rows:
+        return
+    with _index_lock:
+        conn = _index_db()
+        with conn:
+            conn.executemany(_RUN_STORE_UPSERT, rows)
+
+
+def _run_store_version() -> str:
+    """Latest run store write (max updated_at, indexed), as every process sharing the DB sees it."""
+    with _index_lock:
+        row = _index_db().execute("SELECT max(updated_at) FROM run_store").fetchone()
+    return row[0] or ""
+
+
+def _migrate_run_store(conn: sqlite3.Connection) -> None:
+    """Rewrite run store rows saved under ffq/ENA keys with the canonical ones."""
+    updates = []
+    now = datetime.now().isoformat()
+    for acc, data in conn.execute("SELECT accession, data FROM run_store"):
+        run = json.loads(data)
+        canonical = _canonical_run(run)
+        if canonical != run:
+            updates.append((json.dumps(canonical, default=str), now, acc))
+    with conn:
+        conn.executemany("UPDATE run_store SET data = ?, updated_at = ? WHERE accession = ?", updates)
+
+
+def _load_runs(accessions: list) -> dict:
+    """Look up stored run metadata by accession: {accession: run}."""
+    found = {}
+    accessions = list(accessions)
+    with _index_lock:
+        conn = _index_db()
+        for i in range(0, len(accessions), RUN_STORE_BATCH):
+            batch = accessions[i:i + RUN_STORE_BATCH]
+            sql = f"SELECT accession, data FROM run_store WHERE accession IN ({','.join('?' for _ in batch)})"
+            for acc, data in conn.execute(sql, batch):
+                found[acc] = json.loads(data)
+    METRICS.inc("hox_cache_requests_total", len(found), cache="run_store", result="hit")
+    METRICS.inc("hox_cache_requests_total", len(accessions) - len(found), cache="run_store", result="miss")
+    return found
+
+
+# ============================================================================
+# MANIFEST - Curate datasets for approval
+# ============================================================================
+
+# Version 2: entries reference runs in the run store instead of embedding them
+MANIFEST_FORMAT = 2
+
+# Manifests with at least this many runs keep their run accessions in a
+# sidecar (<name>.<stamp>.runs.npy) that is memory-mapped on load instead of
+# parsed as JSON; run fields still come from the run store plus overrides.
+# Every save writes a new sidecar, so a reader holding the previous JSON
+# never sees its sidecar replaced or removed underneath it
+COLUMNAR_MIN_RUNS = int(os.environ.get("HOX_COLUMNAR_MIN_RUNS", "10000"))
+
+
+def _manifest_path(name: str) -> Path:
+    return MANIFEST_DIR / f"{name}.json"
+
+
+def _run_table_path(name: str, stamp: str) -> Path:
+    return MANIFEST_DIR / f"{name}.{stamp}.runs.npy"
+
+
+def _run_table_stamp(name: str, path: Path) -> Optional[int]:
+    """Write time of one of name's sidecars, 0 for an unversioned <name>.runs.npy, None if it isn't name's."""
+    if path.name == f"{name}.runs.npy":
+        return 0
+    stamp = path.name[len(name) + 1:-len(".runs.npy")]
+    if not path.name.startswith(f"{name}.") or not re.fullmatch(r"[0-9a-f]{16}", stamp):
+        return None
+    return int(stamp, 16)
+
+
+def _gc_run_tables(name: str, keep: str = None) -> None:
+    """Remove name's sidecars older than keep (the one its JSON now references; all of them if None).
+
+    Called only after the JSON stops referencing them. Newer ones belong to a
+    save still in progress elsewhere and are left alone.
+    """
+    newest = _run_table_stamp(name, MANIFEST_DIR / keep) if keep else None
+    for path in MANIFEST_DIR.glob(f"{name}.*runs.npy"):
+        stamp = _run_table_stamp(name, path)
+        if stamp is not None and path.name != keep and (newest is None or stamp < newest):
+            path.unlink(missing_ok=True)
+
+
+def _manifest_stamp(name: str = None) -> Optional[str]:
+    """Opaque version of a manifest (or of all manifests), None if it doesn't exist.
+
+    Changes whenever the manifest file is rewritten (its .runs.npy sidecar is
+    always written first) or the run store it resolves runs from is updated,
+    by this process or any other: both come from the shared files, so every
+    web app replica computes the same stamp. Cheap enough to check before
+    loading anything, e.g. for HTTP validators.
+    """
+    paths = [_manifest_path(name)] if name else sorted(MANIFEST_DIR.glob("*.json"))
+    parts = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            if name:
+                return None
+            continue
+        parts.append(f"{path.name}:{st.st_mtime_ns}:{st.st_size}")
+    parts.append(_run_store_version())
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+
+
+class _RunColumn(Sequence):
+    """Lazy view of one entry's run accessions in a memory-mapped columnar manifest.
+
+    Behaves as a list of run accessions, so entry["runs"] works unchanged.
+    """
+
+    def __init__(self, table: np.ndarray, start: int, stop: int):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            block = self.table["accession"][self.start + start:self.start + stop:step] if start < stop else []
+            return [acc.decode() for acc in block]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.table["accession"][self.start + i].decode()
+
+    def __iter__(self):
+        for acc in self.table["accession"][self.start:self.stop]:
+            yield acc.decode()
+
+
+def _load_manifest(name: str) -> Optional[dict]:
+    """Read a manifest by name (None if it doesn't exist).
+
+    Columnar manifests get _RunColumn views as entry["runs"]. Loading never
+    writes: large JSON manifests are converted by _migrate_manifests().
+    """
+    path = _manifest_path(name)
+    for _ in range(3):
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if not manifest.get("run_table"):
+            return manifest
+        try:
+            # Sidecars written before they held accessions only also carry run
+            # fields (and the manifest a "columns" vocab); both are ignored
+            table = np.load(MANIFEST_DIR / manifest["run_table"], mmap_mode="r")
+        except FileNotFoundError:
+            # Saved again (and the old sidecar collected) since we read the JSON
+            continue
+        manifest.pop("columns", None)
+        for entry in manifest.get("accessions", []):
+            start, stop = entry.pop("run_range", (0, 0))
+            entry["runs"] = _RunColumn(table, start, stop)
+        return manifest
+    raise FileNotFoundError(f"sidecar of manifest '{name}' keeps disappearing")
+
+
+def _migrate_manifests() -> list:
+    """Convert large JSON manifests to the columnar layout and version unstamped sidecars.
+
+    Run once at startup (MCP server, web app) rather than on the read path,
+    so loading a manifest never rewrites it. Returns the names converted.
+    """
+    migrated = []
+    for path in sorted(MANIFEST_DIR.glob("*.json")):
+        name = path.stem
+        with _manifest_file_lock(name):
+            try:
+                with open(path) as f:
+                    doc = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if doc.get("run_table"):
+                if doc["run_table"] != f"{name}.runs.npy":
+                    continue
+            elif sum(len(e.get("runs") or []) for e in doc.get("accessions", [])) < COLUMNAR_MIN_RUNS:
+                continue
+            manifest = _load_manifest(name)
+            if manifest is None:
+                continue
+            with _manifest_lock:
+                _save_manifest(manifest)
+            migrated.append(name)
+    return migrated
+
+
+def _write_run_table(doc: dict) -> None:
+    """Pack the run accessions of doc's entries into a new <name>.<stamp>.runs.npy, replacing entry["runs"] with row ranges."""
+    entries = doc.get("accessions", [])
+    width = max((len(acc) for e in entries for acc in e.get("runs") or []), default=1)
+    table = np.zeros(sum(len(e.get("runs") or []) for e in entries), dtype=[("accession", f"S{width}")])
+
+    offset = 0
+    for entry in entries:
+        start = offset
+        runs = entry.pop("runs", None) or []
+        table["accession"][offset:offset + len(runs)] = [acc.encode() for acc in runs]
+        offset += len(runs)
+        entry["run_range"] = [start, offset]
+
+    path = _run_table_path(doc["name"], f"{time.time_ns():016x}")
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp, path)
+    doc["run_table"] = path.name
+
+
+def _save_manifest(manifest: dict) -> Path:
+    """Write a manifest atomically, moving any embedded run metadata into the run store.
+
+    Manifests of COLUMNAR_MIN_RUNS runs or more are written in columnar form.
+
+    The manifest passed in is normalized in place: embedded metadata.runs are
+    popped, entry["runs"] becomes a list of accessions, overrides are
+    canonicalized and "format" is set. Its run lists stay in memory (columnar
+    row ranges are only written to the file), so callers can keep using it.
+    """
+    for entry in manifest.get("accessions", []):
+        _normalize_entry(entry)
+        _canonical_overrides(entry)
+    manifest["format"] = MANIFEST_FORMAT
+
+    doc = {k: v for k, v in manifest.items() if k not in ("run_table", "columns")}
+    doc["accessions"] = [dict(e) for e in manifest.get("accessions", [])]
+    total = sum(len(e.get("runs") or []) for e in doc["accessions"])
+    METRICS.observe("hox_manifest_runs", total)
+    METRICS.observe("hox_manifest_accessions", len(doc["accessions"]))
+    if total >= COLUMNAR_MIN_RUNS:
+        _write_run_table(doc)
+    else:
+        for entry in doc["accessions"]:
+            if isinstance(entry.get("runs"), _RunColumn):
+                entry["runs"] = list(entry["runs"])
+
+    path = _manifest_path(manifest["name"])
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(doc, f, indent=2, default=str)
+    os.replace(tmp, path)
+    # Only now does nothing reference the earlier sidecars
+    _gc_run_tables(manifest["name"], doc.get("run_table"))
+    return path
+
+
+def _normalize_entry(entry: dict, fresh: bool = False) -> None:
+    """Replace embedded run dicts with references into the run store.
+
+    fresh=True (metadata just fetched upstream) updates the store. Otherwise the
+    embedded data only seeds runs the store doesn't know yet; where it disagrees
+    with the store it is kept as a per-manifest override.
+    """
+    metadata = entry.get("metadata")
+    if not isinstance(metadata, dict):
+        return
+    embedded = metadata.pop("runs", None)
+    if "run_info" in metadata:
+        embedded = [metadata.pop("run_info")]
+    if not isinstance(embedded, list):
+        return
+
+    runs = [_canonical_run(r) for r in embedded if isinstance(r, dict) and r.get("accession")]
+    if not entry.get("runs"):
+        entry["runs"] = [r["accession"] if isinstance(r, dict) else r for r in embedded]
+    metadata["run_count"] = len(entry["runs"])
+
+    accession = entry.get("accession", "")
+    study = "" if accession.upper().startswith(("SRR", "ERR", "DRR")) else accession
+    if fresh:
+        _store_runs(runs, study=study)
+        return
+
+    stored = _load_runs([r["accession"] for r in runs])
+    _store_runs([r for r in runs if r["accession"] not in stored], study=study)
+    overrides = {}
+    for run in runs:
+        base = stored.get(run["accession"])
+        if base is None:
+            continue
+        diff = {k: v for k, v in run.items() if v not in ("", 0, None) and base.get(k) != v}
+        if diff:
+            overrides[run["accession"]] = diff
+    if overrides:
+        entry.setdefault("overrides", {}).update(overrides)
+
+
+def _canonical_overrides(entry: dict) -> None:
+    """Rename override fields saved under ffq/ENA keys (older manifests)."""
+    if entry.get("overrides"):
+        entry["overrides"] = {acc: _canonical_run(o) for acc, o in entry["overrides"].items()}
+
+
+def _entry_runs(entry: dict):
+    """Iterate an entry's runs as metadata dicts (store record + overrides).
+
+    Store lookups are made RUN_STORE_BATCH accessions at a time and columnar
+    rows are decoded on demand, so memory doesn't grow with the entry size.
+    """
+    embedded = (entry.get("metadata") or {}).get("runs")
+    if isinstance(embedded, list) and embedded:
+        # Format 1 manifests embed their runs
+        for r in embedded:
+            yield _canonical_run(r) if isinstance(r, dict) else {"accession": r}
+        return
+
+    refs = entry.get("runs", [])
+    overrides = entry.get("overrides", {})
+    for i in range(0, len(refs), RUN_STORE_BATCH):
+        batch = refs[i:i + RUN_STORE_BATCH]
+        stored = _load_runs(batch)
+        for acc in batch:
+            yield {**stored.get(acc, {"accession": acc}), **_canonical_run(overrides.get(acc, {}))}
+
+
+def _manifest_entry(acc: str) -> dict:
+    """Fetch metadata for one accession and build its manifest entry."""
+    entry = {"accession": acc, "status": "ok", "runs": []}
+    with _span("manifest entry", accession=acc) as span:
         try:
             # Use ffq for SRA/GEO, gget for Ensembl
             if _is_sra_accession(acc):
                 data = _fetch_sra_metadata(acc)
                 entry["metadata"] = _extract_ffq_summary(acc, data)
+                _index_ffq_summary(entry["metadata"])
             else:
-                df = gget.info(acc)
+                with _upstream("gget", "info", accession=acc):
+                    df = gget.info(acc)
                 entry["metadata"] = _extract_metadata_summary(acc, df)
 
             # Count runs
@@ -790,18 +3028,57 @@ def create_manifest(
                 entry["runs"] = [r["accession"] for r in entry["metadata"]["runs"]]
             elif acc.startswith(("SRR", "ERR", "DRR")):
                 entry["runs"] = [acc]
+            _normalize_entry(entry, fresh=True)
 
         except Exception as e:
             entry["status"] = "error"
             entry["error"] = str(e)
+            span.fail(e)
+        span.set(runs=len(entry["runs"]))
+    return entry
+
+
+@_tool
+def create_manifest(
+    name: str,
+    description: str,
+    accessions: str,
+    tags: Optional[str] = None
+) -> str:
+    """
+    Create a manifest of datasets for approval before loading into Hox.
+
+    The manifest captures metadata for each accession and saves it for review.
+    Use approve_manifest() after review, then import_to_hox() to load.
+
+    Args:
+        name: Short name for this manifest (becomes filename)
+        description: What this data is for (e.g., "MDD RNA-seq for treatment response model")
+        accessions: Comma-separated accessions (SRR, GSM, GSE, SRP - will extract runs)
+        tags: Optional key=value pairs for Hox tags (e.g., "disease=MDD,tissue=brain")
+
+    Returns:
+        JSON with manifest summary and file path
 
+    Example:
+        create_manifest(
+            name="mdd_rnaseq_v1",
+            description="Prefrontal cortex RNA-seq from MDD patients for biotype classification",
+            accessions="SRR123,SRR124,SRR125",
+            tags="disease=MDD,tissue=DLPFC,assay=RNA-seq"
+        )
+    """
+    manifest = _new_manifest(name, description, tags)
+
+    acc_list = [a.strip() for a in accessions.split(",") if a.strip()]
+
+    for acc in acc_list:
+        entry = _manifest_entry(acc)
         manifest["accessions"].append(entry)
         manifest["total_runs"] += len(entry["runs"])
 
-    # Save
-    path = MANIFEST_DIR / f"{name}.json"
-    with open(path, "w") as f:
-        json.dump(manifest, f, indent=2, default=str)
+    with _manifest_lock:
+        path = _save_manifest(manifest)
 
     return json.dumps({
         "created": name,
@@ -813,6 +3090,19 @@ def create_manifest(
     }, indent=2)
 
 
+def _new_manifest(name: str, description: str, tags: Optional[str] = None) -> dict:
+    """An empty pending manifest, ready for entries."""
+    return {
+        "name": name,
+        "description": description,
+        "created_at": datetime.now().isoformat(),
+        "status": "pending",
+        "tags": _parse_tags(tags),
+        "accessions": [],
+        "total_runs": 0
+    }
+
+
 def _parse_tags(tags: Optional[str]) -> dict:
     """Parse 'key=val,key2=val2' into dict."""
     if not tags:
@@ -825,27 +3115,45 @@ def _parse_tags(tags: Optional[str]) -> dict:
     return result
 
 
-@mcp.tool()
-def list_manifests(name: Optional[str] = None) -> str:
+@_tool
+def list_manifests(name: Optional[str] = None, include_runs: bool = False) -> str:
     """
     List manifests or get details of a specific manifest.
 
+    Manifests store run accessions only; run metadata lives once in the
+    shared run store. Set include_runs to resolve it for each entry.
+    Entries list their run accessions under "runs" whether the manifest is
+    stored as JSON or columnar.
+
     Args:
         name: Optional manifest name to get full details. If omitted, lists all.
+        include_runs: With name, add each entry's run metadata under "run_details"
 
     Returns:
         JSON with manifest(s) summary or full details
 
     Examples:
-        list_manifests()              # List all
-        list_manifests("mdd_rnaseq")  # Get details for one
+        list_manifests()                                # List all
+        list_manifests("mdd_rnaseq")                    # Get details for one
+        list_manifests("mdd_rnaseq", include_runs=True) # ...with run metadata
     """
     if name:
-        path = MANIFEST_DIR / f"{name}.json"
-        if not path.exists():
+        if not include_runs:
+            path = _manifest_path(name)
+            if not path.exists():
+                return json.dumps({"error": f"Manifest '{name}' not found"})
+            with open(path) as f:
+                text = f.read()
+            if '"run_table"' not in text:
+                return text
+        manifest = _load_manifest(name)
+        if manifest is None:
             return json.dumps({"error": f"Manifest '{name}' not found"})
-        with open(path) as f:
-            return f.read()
+        for entry in manifest.get("accessions", []):
+            if include_runs:
+                entry["run_details"] = list(_entry_runs(entry))
+            entry["runs"] = list(entry.get("runs", []))
+        return json.dumps(manifest, indent=2, default=str)
 
     manifests = []
     for path in sorted(MANIFEST_DIR.glob("*.json")):
@@ -866,7 +3174,7 @@ def list_manifests(name: Optional[str] = None) -> str:
     return json.dumps({"manifests": manifests, "count": len(manifests)}, indent=2)
 
 
-@mcp.tool()
+@_tool
 def approve_manifest(name: str) -> str:
     """
     Mark a manifest as approved for import into Hox.
@@ -883,21 +3191,17 @@ def approve_manifest(name: str) -> str:
     Example:
         approve_manifest("mdd_rnaseq_v1")
     """
-    path = MANIFEST_DIR / f"{name}.json"
-    if not path.exists():
-        return json.dumps({"error": f"Manifest '{name}' not found"})
-
-    with open(path) as f:
-        manifest = json.load(f)
-
-    if manifest.get("status") == "approved":
-        return json.dumps({"message": "Already approved", "name": name})
+    with _manifest_file_lock(name):
+        manifest = _load_manifest(name)
+        if manifest is None:
+            return json.dumps({"error": f"Manifest '{name}' not found"})
 
-    manifest["status"] = "approved"
-    manifest["approved_at"] = datetime.now().isoformat()
+        if manifest.get("status") == "approved":
+            return json.dumps({"message": "Already approved", "name": name})
 
-    with open(path, "w") as f:
-        json.dump(manifest, f, indent=2, default=str)
+        manifest["status"] = "approved"
+        manifest["approved_at"] = datetime.now().isoformat()
+        _save_manifest(manifest)
 
     return json.dumps({
         "approved": name,
@@ -906,39 +3210,994 @@ def approve_manifest(name: str) -> str:
     }, indent=2)
 
 
+# ============================================================================
+# REFRESH - Pick up runs added to or changed in curated studies
+# ============================================================================
+
+# Entries that can be refreshed: SRA/ENA/DDBJ studies and BioProjects
+_REFRESH_STUDY_RE = re.compile(r"^(SRP|ERP|DRP|PRJNA|PRJEB|PRJDB)\d+$", re.IGNORECASE)
+
+# Run fields compared against the run store when looking for changes
+_REFRESH_FIELDS = ("spots", "bases", "strategy", "source", "platform", "platform_family", "biosample")
+
+
+def _refresh_value(key: str, value):
+    """Comparable form of a run field: counts as ints, text stripped and case-folded."""
+    if key in ("spots", "bases"):
+        return _to_int(value)
+    return str(value or "").strip().casefold()
+
+
+def _study_listing(entry: dict) -> set:
+    """Run accessions of the entry's study as last listed: the baseline for "added".
+
+    Manifests often hold a curated subset of a study, so runs missing from
+    the manifest aren't necessarily new. Entries not refreshed yet have no
+    stored listing; the runs the run store has for the study (whatever
+    list_runs showed the curator) stand in for it.
+    """
+    listed = (entry.get("refresh") or {}).get("listed")
+    if listed is not None:
+        return set(listed)
+    with _index_lock:
+        rows = _index_db().execute("SELECT accession FROM run_store WHERE study = ?", (entry["accession"],)).fetchall()
+    return {row[0] for row in rows} | set(entry.get("runs", []))
+
+
+def _refresh_entry(entry: dict, since: str) -> Optional[dict]:
+    """Diff one study entry against NCBI (None when nothing changed).
+
+    Two retmax=0 counts decide whether anything needs fetching: the study's
+    experiment count and the number modified since the last refresh ([MDAT]).
+    Only modified experiments are fetched, unless the count dropped (runs were
+    withdrawn), which needs the full run list to find what's gone.
+
+    Runs count as added only if they're new to the study's listing, so runs
+    the curator left out aren't offered again; changes are reported for the
+    manifest's own runs only. Both sides are compared in canonical form
+    (_canonical_run, _refresh_value); a field the store has no value for is
+    a fill-in, not a change. Nothing is written here: fill-ins go into the
+    run store with the rest of the diff in _apply_refresh.
+    """
+    study = entry["accession"]
+    term = f"{study}[Study]"
+    previous = (entry.get("refresh") or {}).get("experiments")
+
+    modified_term = f'{term} AND ("{since}"[MDAT] : "3000"[MDAT])'
+
+    experiments = _esearch_count("sra", term)
+    modified = 0
+    if previous is None or experiments >= previous:
+        modified = _esearch_count("sra", modified_term)
+        if not modified and previous in (None, experiments):
+            entry["refresh"] = {**(entry.get("refresh") or {}), "experiments": experiments}
+            return None
+
+    # Fetched runs only go into the run store once the diff is applied
+    full = not modified
+    runs = [r for item in _fetch_sra_docsums(term if full else modified_term) for r in _docsum_runs(item)]
+
+    known = set(entry.get("runs", []))
+    listed = _study_listing(entry)
+    stored = _load_runs([r["accession"] for r in runs if r["accession"] in known])
+    added, changed, filled = [], [], []
+    for run in runs:
+        if run["accession"] not in known:
+            if run["accession"] not in listed:
+                added.append(run)
+                listed.add(run["accession"])
+            continue
+        run = _canonical_run(run)
+        base = _canonical_run(stored.get(run["accession"], {}))
+        changes, fills = {}, {}
+        for k in _REFRESH_FIELDS:
+            new = _refresh_value(k, run.get(k))
+            if not new:
+                continue
+            old = _refresh_value(k, base.get(k))
+            if not old:
+                fills[k] = run[k]
+            elif old != new:
+                changes[k] = [base.get(k), run.get(k)]
+        if changes:
+            changed.append({"accession": run["accession"], "changes": changes, "run": run})
+        elif fills:
+            filled.append({"accession": run["accession"], **fills})
+
+    current = {r["accession"] for r in runs}
+    removed = sorted(set(entry.get("runs", [])) - current) if full else []
+    listing = sorted(current if full else listed | current)
+    if not (added or changed or removed or filled):
+        entry["refresh"] = {"experiments": experiments, "listed": listing}
+        return None
+    return {"experiments": experiments, "added": added, "changed": changed, "removed": removed,
+            "filled": filled, "listed": listing}
+
+
+def _apply_refresh(manifest: dict, selected: Optional[set]) -> dict:
+    """Apply the pending refresh (all of it, or only the selected runs)."""
+    pending = manifest["pending_refresh"]
+    entries = {e.get("accession"): e for e in manifest.get("accessions", [])}
+    counts = {"added": 0, "changed": 0, "removed": 0, "filled": 0}
+
+    def take(items, key=lambda x: x):
+        keep, chosen = [], []
+        for item in items:
+            (chosen if selected is None or key(item) in selected else keep).append(item)
+        return keep, chosen
+
+    for study, diff in list(pending["studies"].items()):
+        entry = entries.get(study)
+        if entry is None:
+            del pending["studies"][study]
+            continue
+        runs = list(entry.get("runs", []))
+
+        diff["added"], added = take(diff["added"], lambda r: r["accession"])
+        diff["changed"], changed = take(diff["changed"], lambda c: c["accession"])
+        diff["removed"], removed = take(diff["removed"])
+        diff["filled"], filled = take(diff.get("filled", []), lambda f: f["accession"])
+
+        _store_runs(added + [c["run"] for c in changed] + filled, study=study)
+        runs.extend(r["accession"] for r in added)
+        if removed:
+            gone = set(removed)
+            runs = [acc for acc in runs if acc not in gone]
+            for acc in gone:
+                entry.get("overrides", {}).pop(acc, None)
+        entry["runs"] = runs
+        entry.setdefault("metadata", {})["run_count"] = len(runs)
+
+        counts["added"] += len(added)
+        counts["changed"] += len(changed)
+        counts["removed"] += len(removed)
+        counts["filled"] += len(filled)
+        if not (diff["added"] or diff["changed"] or diff["removed"] or diff["filled"]):
+            entry["refresh"] = {"experiments": diff["experiments"]}
+            if "listed" in diff:
+                entry["refresh"]["listed"] = diff["listed"]
+            del pending["studies"][study]
+
+    if not pending["studies"]:
+        # Everything up to this check is now reflected in the manifest
+        manifest["refreshed_at"] = pending["checked_at"]
+        del manifest["pending_refresh"]
+
+    manifest["total_runs"] = sum(len(e.get("runs", [])) for e in manifest.get("accessions", []))
+    manifest.setdefault("refreshes", []).append({"applied_at": datetime.now().isoformat(), **counts})
+    if counts["added"] and manifest.get("status") == "importing":
+        # New runs still need importing; re-approve so import_to_hox accepts it
+        manifest["status"] = "approved"
+    return counts
+
+
+@_tool
+def refresh_manifest(name: str, apply: Optional[str] = None) -> str:
+    """
+    Check a manifest's studies for new, changed or withdrawn runs.
+
+    Uses cheap count checks (study experiment count and [MDAT] modification
+    date) and only fetches metadata for experiments changed since the last
+    refresh. The diff is saved with the manifest for review; approve it in
+    full or run by run with apply. Only SRA study/BioProject entries
+    (SRP, ERP, DRP, PRJNA...) are checked.
+
+    Args:
+        name: Manifest name
+        apply: Apply the pending diff instead of checking - "all", or
+               comma-separated run accessions to accept
+
+    Returns:
+        JSON with the diff per study (added runs, changed fields, removed runs,
+        fields the run store had no value for) or, when applying, counts of
+        what was applied
+
+    Examples:
+        refresh_manifest("mdd_rnaseq_v1")                          # Check
+        refresh_manifest("mdd_rnaseq_v1", apply="all")             # Accept everything
+        refresh_manifest("mdd_rnaseq_v1", apply="SRR901,SRR902")   # Accept some runs
+    """
+    if apply:
+        with _manifest_file_lock(name):
+            manifest = _load_manifest(name)
+            if manifest is None:
+                return json.dumps({"error": f"Manifest '{name}' not found"})
+            if not manifest.get("pending_refresh"):
+                return json.dumps({"error": "No pending refresh", "fix": f"refresh_manifest('{name}')"})
+            selected = None if apply.strip().lower() == "all" else {a.strip() for a in apply.split(",") if a.strip()}
+            applied = _apply_refresh(manifest, selected)
+            _save_manifest(manifest)
+        return json.dumps({
+            "manifest": name,
+            "applied": applied,
+            "pending": bool(manifest.get("pending_refresh")),
+            "total_runs": manifest["total_runs"],
+            "status": manifest.get("status"),
+        }, indent=2)
+
+    manifest = _load_manifest(name)
+    if manifest is None:
+        return json.dumps({"error": f"Manifest '{name}' not found"})
+
+    since = (manifest.get("refreshed_at") or manifest.get("created_at") or "2000-01-01")[:10].replace("-", "/")
+    checked_at = datetime.now().isoformat()
+    studies, skipped, errors, baselines = {}, [], {}, {}
+    for entry in manifest.get("accessions", []):
+        acc = entry.get("accession", "")
+        if not _REFRESH_STUDY_RE.match(acc):
+            skipped.append(acc)
+            continue
+        try:
+            diff = _refresh_entry(entry, since)
+        except Exception as e:
+            errors[acc] = str(e)
+            continue
+        if diff:
+            studies[acc] = diff
+        elif "refresh" in entry:
+            baselines[acc] = entry["refresh"]
+
+    # The checks above hit NCBI without the lock; merge into the current file
+    with _manifest_file_lock(name):
+        manifest = _load_manifest(name)
+        if manifest is None:
+            return json.dumps({"error": f"Manifest '{name}' not found"})
+        for entry in manifest.get("accessions", []):
+            if entry.get("accession") in baselines:
+                entry["refresh"] = baselines[entry["accession"]]
+        if studies:
+            manifest["pending_refresh"] = {"checked_at": checked_at, "since": since, "studies": studies}
+        else:
+            manifest.pop("pending_refresh", None)
+            if not errors:
+                manifest["refreshed_at"] = checked_at
+        _save_manifest(manifest)
+
+    result = {
+        "manifest": name,
+        "since": since,
+        "changed_studies": len(studies),
+        "studies": {
+            acc: {
+                "added": [r["accession"] for r in d["added"]],
+                "changed": {c["accession"]: c["changes"] for c in d["changed"]},
+                "removed": d["removed"],
+                "filled": {f["accession"]: sorted(k for k in f if k != "accession") for f in d["filled"]},
+            }
+            for acc, d in studies.items()
+        },
+    }
+    if skipped:
+        result["skipped"] = skipped
+    if errors:
+        result["errors"] = errors
+    if studies:
+        result["next_step"] = f"refresh_manifest('{name}', apply='all')"
+    return json.dumps(result, indent=2, default=str)
+
+
 # ============================================================================
 # HOX IMPORT - Load data into warehouse
 # ============================================================================
 
-def _run_hox(args: list, profile: Optional[str] = None) -> dict:
-    """Run hox CLI command."""
-    cmd = ["hox"]
+# hox executable (e.g. a specific build, or bench/stub_hox.py for benchmarks)
+HOX_BIN = os.environ.get("HOX_BIN", "hox")
+
+# Bounded concurrent hox calls: at most this many hox processes run at once
+# across all tools. Nothing is reused between calls (the CLI has no session
+# mode, every call is a new process); the pool only overlaps their start-up
+# and auth round-trips, which helps while those wait on the network and not
+# when they are CPU-bound. Fewer calls is the real saving, so commands that
+# take several items get them in batches (HOX_SEARCH_BATCH, HOX_ATTACH_BATCH).
+HOX_WORKERS = int(os.environ.get("HOX_WORKERS", "8"))
+_HOX_POOL = ThreadPoolExecutor(max_workers=HOX_WORKERS, thread_name_prefix="hox")
+
+_hox_path = None
+
+
+def _hox_command() -> list:
+    """hox command prefix; the executable is resolved on PATH once per process."""
+    global _hox_path
+    if _hox_path is None:
+        if HOX_BIN.endswith(".py"):
+            _hox_path = [sys.executable, HOX_BIN]
+        else:
+            _hox_path = [shutil.which(HOX_BIN) or HOX_BIN]
+    return list(_hox_path)
+
+
+def _run_hox(args: list, profile: Optional[str] = None, stdin: Optional[str] = None) -> dict:
+    """Run hox CLI command (stdin: text piped to it, e.g. for --stdin flags)."""
+    cmd = _hox_command()
     if profile:
         cmd.append(f"--profile={profile}")
     cmd.extend(args)
     cmd.append("--json")
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-        if result.returncode == 0:
+    command = " ".join(arg for arg in args[:2] if not arg.startswith("-"))
+    with _span(f"hox {command}", kind="client", args=" ".join(args), profile=profile) as span:
+        start = time.perf_counter()
+        exit_code = "exception"
+        try:
+            result = subprocess.run(cmd, input=stdin, capture_output=True, text=True, timeout=300)
+            exit_code = str(result.returncode)
+            if result.returncode == 0:
+                try:
+                    return {"ok": True, "data": json.loads(result.stdout)}
+                except json.JSONDecodeError:
+                    return {"ok": True, "data": result.stdout.strip()}
+            return {"ok": False, "error": result.stderr.strip() or result.stdout.strip()}
+        except FileNotFoundError:
+            exit_code = "not_found"
+            return {"ok": False, "error": "hox CLI not found - install from https://hox.io"}
+        except subprocess.TimeoutExpired:
+            exit_code = "timeout"
+            return {"ok": False, "error": "Command timed out"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        finally:
+            METRICS.observe("hox_cli_seconds", time.perf_counter() - start, command=command)
+            METRICS.inc("hox_cli_commands_total", command=command, exit_code=exit_code)
+            span.set(exit_code=exit_code)
+            if exit_code != "0":
+                span.fail(f"hox exited with {exit_code}")
+
+
+def _run_hox_batch(calls: list, profile: Optional[str] = None) -> list:
+    """Run many hox commands on the shared pool; results come back in call order.
+
+    calls: argument lists, or (args, stdin) tuples. Must not be called from a
+    _HOX_POOL worker (the pool would wait on itself).
+    """
+    futures = [
+        _HOX_POOL.submit(_carry_span(_run_hox), *((c[0], profile, c[1]) if isinstance(c, tuple) else (c, profile)))
+        for c in calls
+    ]
+    return [f.result() for f in futures]
+
+
+# Run names per `hox search reads --name=...` call
+HOX_SEARCH_BATCH = 100
+
+# Reads IDs per `hox attach reads <id>... --set=...` call
+HOX_ATTACH_BATCH = 100
+
+
+def _hox_items(data) -> list:
+    """Resource dicts from hox --json output (a list, or a dict wrapping one)."""
+    if isinstance(data, dict):
+        data = next((v for v in data.values() if isinstance(v, list)), [data])
+    return [d for d in data if isinstance(d, dict)] if isinstance(data, list) else []
+
+
+def _find_existing_reads(runs: list, profile: Optional[str] = None) -> tuple:
+    """Look up runs already in the warehouse: ({run: reads_id}, error or None)."""
+    found, error = {}, None
+    batches = [runs[i:i + HOX_SEARCH_BATCH] for i in range(0, len(runs), HOX_SEARCH_BATCH)]
+    searches = _run_hox_batch([["search", "reads"] + [f"--name={run}" for run in b] for b in batches], profile)
+    for batch, result in zip(batches, searches):
+        if not result["ok"]:
+            error = error or result["error"]
+            continue
+        wanted = set(batch)
+        for item in _hox_items(result["data"]):
+            if item.get("name") in wanted and item.get("id"):
+                found[item["name"]] = item["id"]
+    return found, error
+
+
+def _attach_reads(reads_ids: list, set_id: str, profile: Optional[str] = None) -> dict:
+    """Attach reads to a set, HOX_ATTACH_BATCH per call: {reads_id: error or None}.
+
+    A failed call fails every ID in it; hox attaches all of them or none.
+    """
+    batches = [reads_ids[i:i + HOX_ATTACH_BATCH] for i in range(0, len(reads_ids), HOX_ATTACH_BATCH)]
+    attaches = _run_hox_batch([["attach", "reads", *b, f"--set={set_id}"] for b in batches], profile)
+    return {
+        reads_id: None if result["ok"] else result["error"]
+        for batch, result in zip(batches, attaches) for reads_id in batch
+    }
+
+
+def _imported_runs(runs: list, profile: Optional[str]) -> dict:
+    """Which of runs any manifest's import submitted: {run: {"manifest", "reads_id"}}.
+
+    Imports whose hox job failed are left out, so those runs are tried again.
+    """
+    wanted = set(runs)
+    candidates = []  # (run, manifest, import entry); a run can have several
+    for path in MANIFEST_DIR.glob("*.json"):
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        for imp in (manifest.get("import_results") or {}).get("imports", []):
+            if imp.get("run") in wanted and imp.get("status") in ("started", "linked", "exists"):
+                candidates.append((imp["run"], manifest.get("name"), imp))
+    started = [imp["reads_id"] for _, _, imp in candidates if imp["status"] == "started" and imp.get("reads_id")]
+    states = _reads_job_states(started, profile) if started else {}
+    imported = {}
+    for run, name, imp in candidates:
+        if run not in imported and states.get(imp.get("reads_id")) != "failed":
+            imported[run] = {"manifest": name, "reads_id": imp.get("reads_id")}
+    return imported
+
+
+# Rough SRA download size per sequenced base (2-bit bases + binned qualities)
+SRA_BYTES_PER_BASE = 0.5
+
+# Per-import transfer rate assumed until imports have completed (MB/s)
+IMPORT_RATE_MBPS = float(os.environ.get("HOX_IMPORT_MBPS", "50"))
+
+# How often the scheduler checks `hox get jobs` while imports are in flight
+IMPORT_POLL_SECONDS = 30
+
+# An in-flight import is given up on after IMPORT_TIMEOUT_FACTOR times its
+# transfer time at IMPORT_RATE_MBPS, and no sooner than the floor
+IMPORT_TIMEOUT_FACTOR = 4
+IMPORT_TIMEOUT_MIN_SECONDS = 2 * 3600
+
+# Consecutive failed `hox get jobs` polls before the scheduler gives up
+IMPORT_STATUS_MAX_FAILURES = 10
+
+# A claimed import's owner heartbeat is saved on a timer of its own, so a
+# slow loop (wave submit, poll sleep, `hox get jobs` up to its timeout)
+# doesn't age it; one this much older, or whose owner process is gone, is
+# orphaned and can be resumed
+IMPORT_HEARTBEAT_SECONDS = 30
+IMPORT_HEARTBEAT_STALE_SECONDS = 10 * IMPORT_HEARTBEAT_SECONDS
+
+IMPORT_ORDERS = ("manifest", "smallest", "largest")
+
+# import_results keys kept in <name>.import next to the manifest rather than
+# in it: they change every scheduler loop and heartbeat, and saving them
+# there doesn't rewrite the manifest (and its .runs.npy sidecar)
+_SCHEDULER_KEYS = ("scheduler", "owner", "pending", "in_flight", "queued", "eta_seconds",
+                   "in_flight_bytes", "limits", "order", "profile", "tag", "stalled_reason")
+
+# Serializes manifest read-modify-write (load -> change -> save) between tools,
+# web routes and background imports; reentrant so locked sections can load
+_manifest_lock = threading.RLock()
+
+# Manifests whose import is claimed by this process: registered before the
+# claim is saved, removed once the scheduler thread (or the import) is done.
+# Maps to the event that stops the manifest's heartbeat thread.
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+_HOST = socket.gethostname()
+
+# manifest name -> (lock file or fd, depth) for _manifest_file_lock held in this process
+_import_flocks = {}
+
+# Without fcntl, a lock file this old is taken as left behind by a dead
+# holder (locked sections are a load and a save)
+MANIFEST_LOCK_STALE_SECONDS = 60
+
+
+@contextmanager
+def _manifest_file_lock(manifest_name: str):
+    """Hold _manifest_lock and an fcntl lock on <name>.lock in MANIFEST_DIR.
+
+    Where fcntl is missing (Windows) <name>.lock is created with O_EXCL
+    instead and removed on release (see _exclusive_lock_file).
+
+    Every read-modify-write of a manifest that an import may be updating
+    (approve, refresh, import claim/resume, scheduler saves and heartbeats)
+    holds it, so it can't interleave with the same in another process: the
+    MCP server and each web app replica run schedulers. The manifest file
+    itself is replaced on every save, so the lock lives in a separate file.
+    Reentrant within a thread.
+    """
+    with _manifest_lock:
+        held = _import_flocks.get(manifest_name)
+        if held:
+            _import_flocks[manifest_name] = (held[0], held[1] + 1)
+        else:
+            MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+            path = MANIFEST_DIR / f"{manifest_name}.lock"
+            if fcntl:
+                f = open(path, "a")
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f = _exclusive_lock_file(path)
+            _import_flocks[manifest_name] = (f, 1)
+        try:
+            yield
+        finally:
+            f, depth = _import_flocks.pop(manifest_name)
+            if depth > 1:
+                _import_flocks[manifest_name] = (f, depth - 1)
+            elif fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+                f.close()
+            else:
+                os.close(f)
+                path.unlink(missing_ok=True)
+
+
+def _exclusive_lock_file(path: Path) -> int:
+    """Create path with O_EXCL, waiting while another holder has it; returns its fd."""
+    while True:
+        try:
+            return os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
             try:
-                return {"ok": True, "data": json.loads(result.stdout)}
-            except json.JSONDecodeError:
-                return {"ok": True, "data": result.stdout.strip()}
-        return {"ok": False, "error": result.stderr.strip() or result.stdout.strip()}
-    except FileNotFoundError:
-        return {"ok": False, "error": "hox CLI not found - install from https://hox.io"}
-    except subprocess.TimeoutExpired:
-        return {"ok": False, "error": "Command timed out"}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
+                if time.time() - path.stat().st_mtime > MANIFEST_LOCK_STALE_SECONDS:
+                    path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.05)
+
+
+def _register_scheduler(manifest_name: str) -> None:
+    stop = threading.Event()
+    with _schedulers_lock:
+        _schedulers[manifest_name] = stop
+    threading.Thread(target=_heartbeat, args=(manifest_name, stop), daemon=True,
+                     name=f"heartbeat-{manifest_name}").start()
+
+
+def _unregister_scheduler(manifest_name: str) -> None:
+    with _schedulers_lock:
+        stop = _schedulers.pop(manifest_name, None)
+    if stop:
+        stop.set()
+
+
+def _heartbeat(manifest_name: str, stop: threading.Event) -> None:
+    """Refresh the owner heartbeat of a claimed import until stop is set (or it's no longer ours)."""
+    while not stop.wait(IMPORT_HEARTBEAT_SECONDS):
+        try:
+            with _manifest_file_lock(manifest_name):
+                if stop.is_set():
+                    return
+                state = _load_import_state(manifest_name)
+                owner = state.get("owner") or {}
+                if state.get("scheduler") != "running" or (owner.get("host"), owner.get("pid")) != (_HOST, os.getpid()):
+                    return
+                state["owner"] = _scheduler_owner()
+                _write_import_state(manifest_name, state)
+        except OSError:
+            continue  # try again next beat
 
 
-@mcp.tool()
+def _import_state_path(name: str) -> Path:
+    return MANIFEST_DIR / f"{name}.import"
+
+
+def _load_import_state(name: str) -> dict:
+    """The scheduler state saved in <name>.import ({} if there is none)."""
+    try:
+        with open(_import_state_path(name)) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _write_import_state(name: str, results: dict) -> None:
+    """Atomically write the _SCHEDULER_KEYS of results to <name>.import."""
+    path = _import_state_path(name)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({k: results[k] for k in _SCHEDULER_KEYS if k in results}, f, default=str)
+    os.replace(tmp, path)
+
+
+def _import_results(manifest: dict) -> dict:
+    """A manifest's import_results with its scheduler state merged in.
+
+    Manifests saved before the state moved out keep it in import_results,
+    which still works: <name>.import only overrides what it has.
+    """
+    return {**(manifest.get("import_results") or {}), **_load_import_state(manifest["name"])}
+
+
+def _run_sizes(manifest: dict) -> dict:
+    """Estimated download bytes per run, from bases in the run store (0 = unknown)."""
+    return {
+        run["accession"]: int(_to_int(run.get("bases")) * SRA_BYTES_PER_BASE)
+        for entry in manifest.get("accessions", []) for run in _entry_runs(entry)
+    }
+
+
+def _order_runs(runs: list, sizes: dict, order: str) -> list:
+    """Order runs for submission.
+
+    "manifest" keeps the listed order; "smallest"/"largest" sort by size,
+    with runs of unknown size after all sized runs.
+    """
+    if order == "manifest":
+        return list(runs)
+    known = [r for r in runs if sizes.get(r)]
+    unknown = [r for r in runs if not sizes.get(r)]
+    return sorted(known, key=lambda r: sizes[r], reverse=order == "largest") + unknown
+
+
+def _fits(size: int, count: int, in_flight_bytes: int, budget: Optional[int], cap: Optional[int]) -> bool:
+    """Whether one more import fits the byte budget and concurrency cap.
+
+    A run larger than the whole budget still starts once nothing else is in flight.
+    """
+    if cap and count >= cap:
+        return False
+    return not (budget and count and in_flight_bytes + size > budget)
+
+
+def _limits_error(max_in_flight_gb: Optional[float], max_concurrent: Optional[int]) -> Optional[str]:
+    """Why a byte budget / concurrency cap can't be scheduled (None if it can, or isn't set)."""
+    if max_in_flight_gb is not None and max_in_flight_gb <= 0:
+        return f"max_in_flight_gb must be positive, got {max_in_flight_gb}"
+    if max_concurrent is not None and max_concurrent < 1:
+        return f"max_concurrent must be at least 1, got {max_concurrent}"
+    return None
+
+
+def _estimate_seconds(sizes: list, budget: Optional[int], cap: Optional[int], rate: float) -> float:
+    """Simulate the schedule (sizes in submission order) and return its makespan."""
+    now, finished, in_flight_bytes = 0.0, 0.0, 0
+    ends = []  # heap of (end time, size)
+    for size in sizes:
+        while ends and not _fits(size, len(ends), in_flight_bytes, budget, cap):
+            now, done = heapq.heappop(ends)
+            in_flight_bytes -= done
+        heapq.heappush(ends, (now + size / rate, size))
+        in_flight_bytes += size
+        finished = max(finished, now + size / rate)
+    return finished
+
+
+def _submit_imports(runs: list, set_id: Optional[str], profile: Optional[str]) -> list:
+    """Start SRA imports (concurrently on the hox pool); returns their import result entries."""
+    calls = [
+        ["import", "reads", f"--from-accession={run_acc}"] + ([f"--set={set_id}"] if set_id else [])
+        for run_acc in runs
+    ]
+    entries = []
+    for run_acc, result in zip(runs, _run_hox_batch(calls, profile)):
+        if not result["ok"]:
+            entries.append({"run": run_acc, "status": "failed", "error": result["error"]})
+            continue
+        data = result["data"]
+        entries.append({"run": run_acc, "status": "started", "reads_id": data.get("id") if isinstance(data, dict) else None})
+    return entries
+
+
+def _job_states_from(jobs: list) -> dict:
+    """Job state per resource ID: running, done or failed."""
+    states = {}
+    for job in jobs:
+        resource = job.get("resource_id") or job.get("resourceId") or job.get("resource")
+        state = str(job.get("status") or job.get("state") or "").lower()
+        if resource:
+            states[resource] = (
+                "done" if state in ("done", "complete", "completed", "succeeded", "success") else
+                "failed" if state in ("failed", "error", "errored", "cancelled", "canceled") else
+                "running"
+            )
+    return states
+
+
+def _job_states(profile: Optional[str]) -> dict:
+    """Job state per resource ID from a tenant-wide `hox get jobs`."""
+    result = _run_hox(["get", "jobs"], profile)
+    return _job_states_from(_hox_items(result["data"])) if result["ok"] else {}
+
+
+# Run fields tagged on reads; the value most runs share goes on the set
+_RUN_TAG_FIELDS = ("study", "strategy", "platform")
+
+
+def _run_tags(manifest: dict) -> tuple:
+    """(set tags, {run: tags}) for an import: manifest tags plus study/strategy/platform.
+
+    Each run field's most common value is tagged on the set, with the
+    manifest tags; a run gets its own tags only for the fields where it
+    differs, and runs that don't differ are left out. Reads are named after
+    their run, so the accession isn't a tag. Runs come back under the run
+    store's canonical keys (_canonical_run); platform falls back to the
+    instrument family when the model is unknown, as for runs only ffq has
+    described.
+    """
+    values = {}
+    for entry in manifest.get("accessions", []):
+        for run in _entry_runs(entry):
+            run = _canonical_run(run)
+            values[run["accession"]] = {
+                "study": entry.get("accession", ""),
+                "strategy": run.get("strategy", ""),
+                "platform": run.get("platform") or run.get("platform_family", ""),
+            }
+    set_tags = {**manifest.get("tags", {}), "manifest": manifest.get("name", "")}
+    for field in _RUN_TAG_FIELDS:
+        common = Counter(v[field] for v in values.values() if v[field]).most_common(1)
+        if common:
+            set_tags[field] = common[0][0]
+    tags = {}
+    for run_acc, run_values in values.items():
+        differ = {k: v for k, v in run_values.items() if v and v != set_tags.get(k)}
+        if differ:
+            tags[run_acc] = differ
+    return set_tags, tags
+
+
+def _tag_call(resource: str, resource_id: str, tags: dict) -> tuple:
+    """(args, stdin) setting tags via `hox tag ... --stdin` (blank values left out).
+
+    The tag verb takes one resource ID per call.
+    """
+    payload = {k: str(v) for k, v in tags.items() if v not in ("", None)}
+    return ["tag", resource, resource_id, "--stdin"], json.dumps(payload)
+
+
+def _tag_imports(results: dict, run_tags: dict, profile: Optional[str]) -> int:
+    """Tag imported/linked reads whose tags differ from the set's and aren't tagged yet (concurrently on the hox pool).
+
+    Returns how many reads it tried to tag.
+    """
+    todo = [
+        imp for imp in results["imports"]
+        if imp.get("reads_id") and imp.get("status") in ("started", "linked", "exists") and not imp.get("tagged")
+        and imp["run"] in run_tags
+    ]
+    calls = [_tag_call("reads", imp["reads_id"], run_tags.get(imp["run"], {})) for imp in todo]
+    for imp, result in zip(todo, _run_hox_batch(calls, profile)):
+        if result["ok"]:
+            imp["tagged"] = True
+            results["tagged"] = results.get("tagged", 0) + 1
+        else:
+            imp["tag_error"] = result["error"]
+            results["tag_failed"] = results.get("tag_failed", 0) + 1
+    return len(todo)
+
+
+def _save_import_results(manifest_name: str, results: dict, imports_changed: bool = True) -> None:
+    """Save scheduler state to <name>.import and, if imports_changed, the rest to the manifest."""
+    with _manifest_file_lock(manifest_name):
+        _write_import_state(manifest_name, results)
+        if imports_changed:
+            manifest = _load_manifest(manifest_name)
+            if manifest is not None:
+                manifest["import_results"] = {k: v for k, v in results.items() if k not in _SCHEDULER_KEYS}
+                _save_manifest(manifest)
+    _invalidate_status(manifest_name)
+
+
+def _import_timeout(size: int) -> float:
+    """Seconds an import of size bytes may stay unfinished before it counts as stalled."""
+    return max(IMPORT_TIMEOUT_MIN_SECONDS, IMPORT_TIMEOUT_FACTOR * size / (IMPORT_RATE_MBPS * 1e6))
+
+
+def _scheduled_imports(manifest_name: str, queue: list, sizes: dict, results: dict,
+                       profile: Optional[str], budget: Optional[int], cap: Optional[int],
+                       run_tags: Optional[dict] = None, in_flight: Optional[dict] = None) -> None:
+    """Submit queued runs as the byte budget / concurrency cap allow (background thread).
+
+    The remaining queue and the imports in flight are saved to <name>.import
+    every loop (the manifest only when imports were added), and an owner
+    heartbeat by _heartbeat(), so _resume_import() can carry on from there
+    if this process goes away (see _scheduler_orphaned).
+
+    Stops as "stalled" when an import outlives _import_timeout() or job
+    status can't be read IMPORT_STATUS_MAX_FAILURES polls in a row; the
+    affected imports are marked and runs not submitted yet are failed.
+
+    The caller registers the scheduler (_register_scheduler) before saving
+    itself as owner; it is unregistered here when the thread ends.
+    """
+    try:
+        _schedule(manifest_name, queue, sizes, results, profile, budget, cap, run_tags, in_flight or {})
+    finally:
+        _unregister_scheduler(manifest_name)
+
+
+def _schedule(manifest_name: str, queue: list, sizes: dict, results: dict, profile: Optional[str],
+              budget: Optional[int], cap: Optional[int], run_tags: Optional[dict], in_flight: dict) -> None:
+    """_scheduled_imports body; in_flight is reads_id -> (run, size, started)."""
+    pending = deque(queue)
+    in_flight_bytes, done_bytes, done_seconds = sum(v[1] for v in in_flight.values()), 0, 0.0
+    status_failures = 0
+    stalled = None  # (reads IDs, reason)
+    while pending or in_flight:
+        # Everything that fits now is submitted together as one wave
+        wave, count, wave_bytes = [], len(in_flight), in_flight_bytes
+        while pending and _fits(sizes.get(pending[0], 0), count, wave_bytes, budget, cap):
+            wave.append(pending.popleft())
+            count += 1
+            wave_bytes += sizes.get(wave[-1], 0)
+        if not wave and not in_flight:
+            # Nothing running and nothing may start: waiting won't change that
+            stalled = ([], "no queued run fits the byte budget and concurrency cap")
+            break
+        for entry in _submit_imports(wave, results.get("set_id"), profile):
+            results["imports"].append(entry)
+            results["queued"] -= 1
+            if entry["status"] == "started":
+                results["success"] += 1
+                if entry.get("reads_id"):
+                    size = sizes.get(entry["run"], 0)
+                    in_flight[entry["reads_id"]] = (entry["run"], size, time.time())
+                    in_flight_bytes += size
+            else:
+                results["failed"] += 1
+        tagged = _tag_imports(results, run_tags, profile) if run_tags is not None else 0
+
+        rate = done_bytes / done_seconds if done_seconds else IMPORT_RATE_MBPS * 1e6
+        remaining = [v[1] for v in in_flight.values()] + [sizes.get(r, 0) for r in pending]
+        results["eta_seconds"] = round(_estimate_seconds(remaining, budget, cap, rate))
+        results["in_flight_bytes"] = in_flight_bytes
+        results["pending"] = list(pending)
+        results["in_flight"] = {r: list(v) for r, v in in_flight.items()}
+        results["owner"] = _scheduler_owner()
+        _save_import_results(manifest_name, results, imports_changed=bool(wave or tagged))
+        if not in_flight:
+            continue
+
+        time.sleep(IMPORT_POLL_SECONDS)
+        listing = _run_hox(["get", "jobs"], profile)
+        if not listing["ok"]:
+            status_failures += 1
+            if status_failures >= IMPORT_STATUS_MAX_FAILURES:
+                stalled = (list(in_flight), f"job status unavailable for {status_failures} polls: {listing['error']}")
+                break
+            continue
+        status_failures = 0
+        states = _job_states_from(_hox_items(listing["data"]))
+        now = time.time()
+        for reads_id, (run_acc, size, started) in list(in_flight.items()):
+            if states.get(reads_id) in ("done", "failed"):
+                del in_flight[reads_id]
+                in_flight_bytes -= size
+                if states[reads_id] == "done" and size:
+                    done_bytes += size
+                    done_seconds += now - started
+        timed_out = [r for r, (_, size, started) in in_flight.items() if now - started > _import_timeout(size)]
+        if timed_out:
+            stalled = (timed_out, "import not finished within its timeout")
+            break
+
+    if stalled:
+        _stall(results, stalled[0], pending, stalled[1])
+    else:
+        results["scheduler"] = "finished"
+    results["eta_seconds"] = 0
+    results["in_flight_bytes"] = 0
+    results["pending"], results["in_flight"] = [], {}
+    results["owner"] = _scheduler_owner()
+    _save_import_results(manifest_name, results)
+
+
+def _stall(results: dict, reads_ids: list, pending, reason: str) -> None:
+    """Mark a scheduler stalled: flag the given imports and fail the runs never submitted."""
+    reads_ids = set(reads_ids)
+    for imp in results["imports"]:
+        if imp.get("reads_id") in reads_ids:
+            imp["stalled"] = reason
+    for run_acc in pending:
+        results["imports"].append({"run": run_acc, "status": "failed", "error": f"not submitted, scheduler stalled: {reason}"})
+    results["failed"] += len(pending)
+    results["queued"] = 0
+    results["scheduler"] = "stalled"
+    results["stalled_reason"] = reason
+
+
+def _scheduler_owner() -> dict:
+    return {"pid": os.getpid(), "host": _HOST, "heartbeat": time.time()}
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True  # exists, owned by another user
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+def _scheduler_orphaned(results: dict) -> bool:
+    """Whether a "running" scheduler has no live owner (results as from _import_results).
+
+    On this host the owner's pid (and, for this process, the thread) is
+    checked; elsewhere only the heartbeat age can tell.
+    """
+    if results.get("scheduler") != "running":
+        return False
+    owner = results.get("owner") or {}
+    if owner.get("host") == _HOST:
+        if owner.get("pid") == os.getpid():
+            with _schedulers_lock:
+                return results.get("manifest") not in _schedulers
+        if not _pid_alive(owner.get("pid")):
+            return True
+    return time.time() - owner.get("heartbeat", 0) > IMPORT_HEARTBEAT_STALE_SECONDS
+
+
+def _resume_import(manifest_name: str) -> dict:
+    """Take over an orphaned scheduler and carry on with its saved queue.
+
+    Imports saved before the queue was persisted are rebuilt from the
+    manifest: runs without an import entry are pending, started imports
+    are polled again.
+    """
+    with _manifest_file_lock(manifest_name):
+        manifest = _load_manifest(manifest_name)
+        results = _import_results(manifest) if manifest else {}
+        if not _scheduler_orphaned(results):
+            return {"error": f"Manifest '{manifest_name}' has no orphaned import to resume",
+                    "scheduler": results.get("scheduler")}
+        limits = results.get("limits") or {}
+        limits_error = _limits_error(limits.get("max_in_flight_gb"), limits.get("max_concurrent"))
+        if limits_error:
+            # Saved by a version that didn't check its limits: no run would ever start
+            _stall(results, [], results.get("pending", []), limits_error)
+            results["pending"] = []
+            _save_import_results(manifest_name, results)
+            return {"error": f"Manifest '{manifest_name}' import can't be resumed: {limits_error}",
+                    "scheduler": "stalled"}
+        _register_scheduler(manifest_name)
+        results["owner"] = _scheduler_owner()
+        _save_import_results(manifest_name, results, imports_changed=False)
+
+    try:
+        sizes = _run_sizes(manifest)
+        if "pending" in results:
+            queue = results["pending"]
+            in_flight = {r: tuple(v) for r, v in results.get("in_flight", {}).items()}
+        else:
+            seen = {imp["run"] for imp in results.get("imports", [])}
+            queue = [run for entry in manifest.get("accessions", []) for run in entry.get("runs", []) if run not in seen]
+            queue = _order_runs(list(dict.fromkeys(queue)), sizes, results.get("order", "manifest"))
+            now = time.time()
+            in_flight = {
+                imp["reads_id"]: (imp["run"], sizes.get(imp["run"], 0), now)
+                for imp in results.get("imports", [])
+                if imp.get("status") == "started" and imp.get("reads_id") and not imp.get("stalled")
+            }
+        results["queued"] = len(queue)
+        budget = int(limits["max_in_flight_gb"] * 1e9) if limits.get("max_in_flight_gb") else None
+        run_tags = _run_tags(manifest)[1] if results.get("tag", True) else None
+        threading.Thread(
+            target=_carry_span(_scheduled_imports),
+            args=(manifest_name, queue, sizes, results, results.get("profile"), budget,
+                  limits.get("max_concurrent"), run_tags, in_flight),
+            daemon=True,
+        ).start()
+    except BaseException:
+        _unregister_scheduler(manifest_name)
+        raise
+    return {"resumed": True, "queued": len(queue), "in_flight": len(in_flight),
+            "set_id": results.get("set_id"), "next_step": "get_import_status() to monitor progress"}
+
+
+def _resume_orphaned_imports() -> list:
+    """Resume every manifest import whose scheduler is orphaned (server startup)."""
+    resumed = []
+    for path in MANIFEST_DIR.glob("*.json"):
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        if "name" not in manifest:
+            continue
+        if manifest.get("status") == "importing" and _scheduler_orphaned(_import_results(manifest)):
+            if _resume_import(manifest["name"]).get("resumed"):
+                resumed.append(manifest["name"])
+    return resumed
+
+
+@_tool
 def import_to_hox(
     manifest_name: str,
     set_name: Optional[str] = None,
-    profile: Optional[str] = None
+    profile: Optional[str] = None,
+    dedup: bool = True,
+    order: str = "manifest",
+    max_in_flight_gb: Optional[float] = None,
+    max_concurrent: Optional[int] = None,
+    tag: bool = True
 ) -> str:
     """
     Import all runs from an approved manifest into Hox.
@@ -946,104 +4205,468 @@ def import_to_hox(
     Creates a Set to group the reads and imports each run from SRA.
     The manifest must be approved first with approve_manifest().
 
+    Runs listed more than once are imported once. With dedup (default),
+    runs already in the warehouse (found with batched `hox search reads`)
+    are attached to the set instead of downloaded again, and runs another
+    manifest import already submitted are skipped (unless its hox job failed).
+    A run whose attach fails counts as failed, not linked. Re-importing a
+    manifest reuses its set and keeps the runs it already imported
+    (reported as previously_imported); only the rest is submitted.
+
+    Run sizes (bases in the run store) decide the submission order and, with
+    max_in_flight_gb / max_concurrent, how much is downloading at once. With
+    either limit set, submission continues in the background as `hox get jobs`
+    reports imports finishing; the tool returns straight away with an ETA.
+    The remaining queue is saved with the manifest: if the process running
+    it exits, get_import_status() reports the scheduler as "orphaned" and
+    calling import_to_hox again (or restarting the server) resumes it.
+    The manifest is claimed under a lock shared by every process using
+    MANIFEST_DIR, so only one import of it starts or resumes at a time.
+
+    With tag (default), the set is tagged with the manifest tags and the
+    study, strategy and platform most of its runs share; a reads resource
+    gets its own tags only where its run differs from those (a read's tags
+    are its set's, overridden by its own). hox tags one resource per call,
+    so each such run still costs one `hox tag reads` process: none for a
+    single-study, single-platform manifest, one per run otherwise.
+
     Args:
         manifest_name: Name of the approved manifest
         set_name: Optional custom name for the Hox Set (defaults to manifest name)
         profile: Optional Hox CLI profile name
+        dedup: Skip/link runs that are already imported (default True)
+        order: Submission order - "manifest" (default, as listed), "smallest" or
+               "largest" first (runs of unknown size last)
+        max_in_flight_gb: Byte budget for imports downloading at the same time (> 0)
+        max_concurrent: Maximum number of imports running at the same time (>= 1)
+        tag: Propagate manifest tags and run metadata to Hox (default True)
 
     Returns:
         JSON with import results for each run
 
-    Example:
+    Examples:
         import_to_hox("mdd_rnaseq_v1")
+        import_to_hox("wgs_cohort", order="largest", max_in_flight_gb=500, max_concurrent=8)
     """
-    path = MANIFEST_DIR / f"{manifest_name}.json"
-    if not path.exists():
-        return json.dumps({"error": f"Manifest '{manifest_name}' not found"})
-
-    with open(path) as f:
-        manifest = json.load(f)
-
-    if manifest.get("status") != "approved":
-        return json.dumps({
-            "error": f"Manifest must be approved first. Current status: {manifest.get('status')}",
-            "fix": f"approve_manifest('{manifest_name}')"
-        })
-
-    results = {
-        "manifest": manifest_name,
-        "set_name": set_name or manifest_name,
-        "imports": [],
-        "success": 0,
-        "failed": 0
-    }
+    if order not in IMPORT_ORDERS:
+        return json.dumps({"error": f"Unknown order '{order}'", "orders": list(IMPORT_ORDERS)})
+    limits_error = _limits_error(max_in_flight_gb, max_concurrent)
+    if limits_error:
+        return json.dumps({"error": limits_error})
+
+    # Check and claim in one step, so concurrent calls (in any process)
+    # can't both find the manifest approved and import it
+    with _manifest_file_lock(manifest_name):
+        manifest = _load_manifest(manifest_name)
+        if manifest is None:
+            return json.dumps({"error": f"Manifest '{manifest_name}' not found"})
+
+        previous = _import_results(manifest)
+        running = manifest.get("status") == "importing" and previous.get("scheduler") == "running"
+        if running and not _scheduler_orphaned(previous):
+            return json.dumps({
+                "error": f"Manifest '{manifest_name}' is already being imported",
+                "fix": f"get_import_status(manifest_name='{manifest_name}') to monitor progress"
+            })
 
-    # Create a Set to group the reads
-    set_result = _run_hox(["create", "set", f"--name={results['set_name']}"], profile)
-    if set_result["ok"]:
-        results["set_id"] = set_result["data"].get("id") if isinstance(set_result["data"], dict) else None
-    else:
-        results["set_error"] = set_result["error"]
+        if not running and manifest.get("status") != "approved":
+            return json.dumps({
+                "error": f"Manifest must be approved first. Current status: {manifest.get('status')}",
+                "fix": f"approve_manifest('{manifest_name}')"
+            })
 
-    # Collect all runs
-    all_runs = []
-    for entry in manifest.get("accessions", []):
-        all_runs.extend(entry.get("runs", []))
+        if not running:
+            # Saved as a running scheduler owned by this process: until the
+            # real queue is saved, a resume rebuilds it from the manifest
+            # Earlier imports stay on disk so dedup sees them (_imported_runs)
+            results = {
+                "manifest": manifest_name,
+                "set_name": set_name or manifest_name,
+                "imports": list(previous.get("imports", [])),
+                "success": 0,
+                "failed": 0,
+                "order": order,
+                "limits": {"max_in_flight_gb": max_in_flight_gb, "max_concurrent": max_concurrent},
+                "profile": profile,
+                "tag": tag,
+                "scheduler": "running",
+            }
+            if previous.get("set_id") and previous.get("set_name") == results["set_name"]:
+                results["set_id"] = previous["set_id"]
+            _register_scheduler(manifest_name)
+            results["owner"] = _scheduler_owner()
+            manifest["status"] = "importing"
+            manifest["import_started"] = datetime.now().isoformat()
+            manifest["import_results"] = {k: v for k, v in results.items() if k not in _SCHEDULER_KEYS}
+            _write_import_state(manifest_name, results)
+            _save_manifest(manifest)
+    if running:
+        # Orphaned (checked again under the lock there)
+        return json.dumps(_resume_import(manifest_name), indent=2)
+    _invalidate_status(manifest_name)
+
+    handed_off = False
+    try:
+        summary, handed_off = _start_import(manifest_name, manifest, results, profile, dedup, order,
+                                            max_in_flight_gb, max_concurrent, tag)
+    finally:
+        if not handed_off:
+            _unregister_scheduler(manifest_name)
+    return json.dumps(summary, indent=2)
 
-    # Import each run
-    for run_acc in all_runs:
-        args = ["import", "reads", f"--from-accession={run_acc}"]
-        if results.get("set_id"):
-            args.append(f"--set={results['set_id']}")
 
-        import_result = _run_hox(args, profile)
+def _start_import(manifest_name: str, manifest: dict, results: dict, profile: Optional[str], dedup: bool,
+                  order: str, max_in_flight_gb: Optional[float], max_concurrent: Optional[int],
+                  tag: bool) -> tuple:
+    """import_to_hox body once the import is claimed: link, dedup and submit (or queue) the runs.
 
-        if import_result["ok"]:
-            results["success"] += 1
-            results["imports"].append({"run": run_acc, "status": "started"})
+    Returns the summary and whether a scheduler thread took over the claim.
+    """
+    # Create a Set to group the reads (a re-import reuses the earlier one)
+    if not results.get("set_id"):
+        set_result = _run_hox(["create", "set", f"--name={results['set_name']}"], profile)
+        if set_result["ok"]:
+            results["set_id"] = set_result["data"].get("id") if isinstance(set_result["data"], dict) else None
         else:
-            results["failed"] += 1
-            results["imports"].append({"run": run_acc, "status": "failed", "error": import_result["error"]})
-
-    # Update manifest
-    manifest["status"] = "importing"
-    manifest["import_started"] = datetime.now().isoformat()
-    manifest["import_results"] = results
+            results["set_error"] = set_result["error"]
+
+    set_tags, run_tags = _run_tags(manifest) if tag else ({}, None)
+    if tag and results.get("set_id"):
+        args, payload = _tag_call("set", results["set_id"], set_tags)
+        tagged = _run_hox(args, profile, stdin=payload)
+        results["set_tagged"] = tagged["ok"]
+        if not tagged["ok"]:
+            results["set_tag_error"] = tagged["error"]
+
+    # Collect all runs, once each (several entries can resolve to the same run)
+    listed = [acc for entry in manifest.get("accessions", []) for acc in entry.get("runs", [])]
+    all_runs = list(dict.fromkeys(listed))
+    results["duplicates"] = len(listed) - len(all_runs)
+
+    # A re-import keeps this manifest's earlier imports (still on disk, see
+    # import_to_hox): runs they imported or linked, unless the hox job
+    # failed, are left as they are; the rest is tried again
+    previous, results["imports"] = results["imports"], []
+    existing, submitted = {}, {}
+    if dedup:
+        submitted = _imported_runs(all_runs, profile)
+    own = {run for run, by in submitted.items() if by["manifest"] == manifest_name}
+    results["previously_imported"] = len(own)
+    todo = [run_acc for run_acc in all_runs if run_acc not in own]
+    if dedup and todo:
+        existing, dedup_error = _find_existing_reads(todo, profile)
+        if dedup_error:
+            results["dedup_error"] = dedup_error
+    results["skipped"] = 0
+
+    # Already in the warehouse: attach to the set rather than re-download
+    linked = [{"run": run_acc, "status": "exists", "reads_id": existing[run_acc]}
+              for run_acc in todo if run_acc in existing]
+    if linked and results.get("set_id"):
+        errors = _attach_reads(list(dict.fromkeys(entry["reads_id"] for entry in linked)), results["set_id"], profile)
+        for entry in linked:
+            if errors[entry["reads_id"]] is None:
+                entry["status"] = "linked"
+            else:
+                # Not in the set: a failure, so later imports don't take it as done
+                entry["status"] = "failed"
+                entry["error"] = f"attach failed: {errors[entry['reads_id']]}"
+                results["failed"] += 1
+    results["linked"] = sum(1 for entry in linked if entry["status"] != "failed")
+    results["imports"].extend(linked)
+
+    # Queue the rest for import
+    queue = []
+    for run_acc in todo:
+        if run_acc in existing:
+            continue
+        if run_acc in submitted:
+            # Import still in flight from an earlier manifest (or run of this one)
+            results["skipped"] += 1
+            results["imports"].append({"run": run_acc, "status": "skipped", "imported_by": submitted[run_acc]["manifest"],
+                                       "reads_id": submitted[run_acc]["reads_id"]})
+            continue
+        queue.append(run_acc)
+    # Earlier entries of runs tried again are replaced by this attempt's
+    retried = set(todo)
+    results["imports"] = [imp for imp in previous if imp.get("run") not in retried] + results["imports"]
+
+    sizes = _run_sizes(manifest)
+    queue = _order_runs(queue, sizes, order)
+    budget = int(max_in_flight_gb * 1e9) if max_in_flight_gb else None
+    results["order"] = order
+    results["total_bytes"] = sum(sizes.get(r, 0) for r in queue)
+    results["unsized_runs"] = sum(1 for r in queue if not sizes.get(r))
+    results["eta_seconds"] = round(_estimate_seconds(
+        [sizes.get(r, 0) for r in queue], budget, max_concurrent, IMPORT_RATE_MBPS * 1e6))
+
+    scheduled = bool(budget or max_concurrent)
+    if scheduled:
+        results["queued"] = len(queue)
+        results["pending"], results["in_flight"] = queue, {}
+        results["owner"] = _scheduler_owner()
+    else:
+        for entry in _submit_imports(queue, results.get("set_id"), profile):
+            results["imports"].append(entry)
+            results["success" if entry["status"] == "started" else "failed"] += 1
+        del results["scheduler"], results["owner"]
+    if tag and not scheduled:
+        _tag_imports(results, run_tags, profile)
 
-    with open(path, "w") as f:
-        json.dump(manifest, f, indent=2, default=str)
+    # Update manifest (re-read: the hox calls above ran without the lock)
+    _save_import_results(manifest_name, results)
 
-    return json.dumps({
+    summary = {
         "started": results["success"],
+        "queued": results.get("queued", 0),
+        "linked": results["linked"],
+        "skipped": results["skipped"],
+        "previously_imported": results["previously_imported"],
+        "duplicates": results["duplicates"],
         "failed": results["failed"],
+        "tagged": results.get("tagged", 0),
         "set_id": results.get("set_id"),
+        "order": order,
+        "total_gb": round(results["total_bytes"] / 1e9, 2),
+        "eta_seconds": results["eta_seconds"],
         "next_step": "get_import_status() to monitor progress"
-    }, indent=2)
-
+    }
+    if scheduled:
+        threading.Thread(
+            target=_carry_span(_scheduled_imports),
+            args=(manifest_name, queue, sizes, results, profile, budget, max_concurrent, run_tags),
+            daemon=True,
+        ).start()
+    return summary, scheduled
+
+
+# Adaptive poll interval: reset to the minimum on progress, doubled while idle
+STATUS_POLL_MIN_SECONDS = 5
+STATUS_POLL_MAX_SECONDS = 300
+
+# Above this many unfinished reads, one tenant-wide `hox get jobs` is cheaper
+# than a `--resource-id` query per reads resource
+STATUS_RESOURCE_QUERY_LIMIT = 50
+
+_status_cache = {}  # key -> {"expires", "interval", "progress", "version", "value"}
+# key -> [lock, callers using it]; one refresh per key at a time. Entries
+# are dropped by the last caller out, so idle keys don't accumulate.
+_status_locks = {}
+_status_guard = threading.Lock()
+
+# Finished jobs don't change again: reads_id -> "done" / "failed"
+_finished_jobs = {}
+_finished_jobs_lock = threading.Lock()
+
+
+def _cached_status(key: tuple, fetch, version=None) -> dict:
+    """TTL-cached status with singleflight and an adaptive poll interval.
+
+    fetch() returns (value, progress); the cached value is served until the
+    current poll interval expires, concurrent callers wait for one fetch,
+    and the interval grows while progress stays the same. A different
+    version (e.g. the manifest file changed, in any process) discards the
+    cached value and the backoff. Errors are never cached.
+    """
+    with _status_guard:
+        slot = _status_locks.setdefault(key, [threading.Lock(), 0])
+        slot[1] += 1
+    try:
+        with slot[0]:
+            return _refresh_status(key, fetch, version)
+    finally:
+        with _status_guard:
+            slot[1] -= 1
+            if not slot[1]:
+                del _status_locks[key]
+
+
+def _refresh_status(key: tuple, fetch, version) -> dict:
+    """_cached_status body, run holding the key's lock."""
+    cached = _status_cache.get(key)
+    if cached and cached["version"] != version:
+        cached = None
+    now = time.time()
+    if cached and now < cached["expires"]:
+        METRICS.inc("hox_cache_requests_total", cache="import_status", result="hit")
+        return {**cached["value"], "cached": True,
+                "poll_after_seconds": max(1, round(cached["expires"] - now))}
+
+    METRICS.inc("hox_cache_requests_total", cache="import_status", result="miss")
+    value, progress = fetch()
+    if "error" in value:
+        _status_cache.pop(key, None)
+        return {**value, "cached": False, "poll_after_seconds": STATUS_POLL_MIN_SECONDS}
+    if cached and progress == cached["progress"]:
+        interval = min(cached["interval"] * 2, STATUS_POLL_MAX_SECONDS)
+    else:
+        interval = STATUS_POLL_MIN_SECONDS
+    _status_cache[key] = {"expires": now + interval, "interval": interval, "progress": progress,
+                          "version": version, "value": value}
+    return {**value, "cached": False, "poll_after_seconds": interval}
+
+
+def _invalidate_status(manifest_name: str) -> None:
+    """Drop cached status of a manifest (and the tenant job list) after its imports changed."""
+    for key in list(_status_cache):
+        if key[0] == "tenant" or (key[0] == "manifest" and key[1] == manifest_name):
+            _status_cache.pop(key, None)
+
+
+def _reads_job_states(reads_ids: list, profile: Optional[str]) -> dict:
+    """Job state per reads resource, querying only reads that aren't finished."""
+    with _finished_jobs_lock:
+        states = {r: _finished_jobs[r] for r in reads_ids if r in _finished_jobs}
+    open_ids = [r for r in reads_ids if r not in states]
+    if len(open_ids) > STATUS_RESOURCE_QUERY_LIMIT:
+        tenant = _job_states(profile)
+        fetched = {r: tenant[r] for r in open_ids if r in tenant}
+    else:
+        fetched = {}
+        queries = _run_hox_batch([["get", "jobs", f"--resource-id={r}"] for r in open_ids], profile)
+        for reads_id, result in zip(open_ids, queries):
+            jobs = _hox_items(result["data"]) if result["ok"] else []
+            state = _job_states_from(jobs).get(reads_id, "running" if jobs else None)
+            if state:
+                fetched[reads_id] = state
+    with _finished_jobs_lock:
+        for reads_id, state in fetched.items():
+            if state in ("done", "failed"):
+                _finished_jobs[reads_id] = state
+    states.update(fetched)
+    return states
+
+
+def _manifest_import_status(manifest_name: str, profile: Optional[str]) -> tuple:
+    """Aggregated import status for one manifest: (status, progress key)."""
+    manifest = _load_manifest(manifest_name)
+    if manifest is None:
+        return {"error": f"Manifest '{manifest_name}' not found"}, None
+    results = _import_results(manifest)
+    imports = results.get("imports", [])
+
+    # Skipped runs follow the import that another manifest (or run) submitted
+    reads_ids = [i["reads_id"] for i in imports if i.get("status") in ("started", "skipped") and i.get("reads_id")]
+    states = _reads_job_states(reads_ids, profile)
+
+    counts = {"running": 0, "done": 0, "failed": 0, "linked": 0, "skipped": 0, "unknown": 0,
+              "stalled": 0, "queued": results.get("queued", 0)}
+    failed_runs, stalled_runs = [], []
+    skipped_done = 0
+    for imp in imports:
+        status = imp.get("status")
+        if status == "started":
+            state = states.get(imp.get("reads_id")) or "unknown"
+            if imp.get("stalled") and state not in ("done", "failed"):
+                state = "stalled"
+                stalled_runs.append(imp["run"])
+            counts[state] += 1
+            if state == "failed":
+                failed_runs.append(imp["run"])
+        elif status in ("linked", "exists"):
+            counts["linked"] += 1
+        elif status == "skipped":
+            state = states.get(imp.get("reads_id"))
+            if state == "failed":
+                counts["failed"] += 1
+                failed_runs.append(imp["run"])
+            else:
+                counts["skipped"] += 1
+                skipped_done += state == "done"
+        else:
+            counts["failed"] += 1
+            failed_runs.append(imp["run"])
 
-@mcp.tool()
-def get_import_status(profile: Optional[str] = None) -> str:
+    total = len(imports) + counts["queued"]
+    complete = counts["done"] + counts["linked"] + skipped_done
+    status = {
+        "manifest": manifest_name,
+        "status": manifest.get("status"),
+        "set_id": results.get("set_id"),
+        "total": total,
+        "counts": counts,
+        "percent_complete": round(100 * complete / total, 1) if total else 0.0,
+        "failed_runs": failed_runs[:50],
+    }
+    if stalled_runs:
+        status["stalled_runs"] = stalled_runs[:50]
+    if results.get("scheduler"):
+        status["scheduler"] = results["scheduler"]
+        status["eta_seconds"] = results.get("eta_seconds")
+        if _scheduler_orphaned(results):
+            status["scheduler"] = "orphaned"
+            status["owner"] = results.get("owner")
+            status["fix"] = f"import_to_hox('{manifest_name}') to resume"
+        if results.get("stalled_reason"):
+            status["stalled_reason"] = results["stalled_reason"]
+    return status, tuple(sorted(counts.items()))
+
+
+@_tool
+def get_import_status(profile: Optional[str] = None, manifest_name: Optional[str] = None) -> str:
     """
     Check status of Hox import jobs.
 
-    Shows running and recent jobs to monitor import progress.
+    With manifest_name, only that manifest's reads are checked (`hox get jobs
+    --resource-id`) and aggregated into counts and percent complete.
+    Without it, shows running and recent jobs for the whole tenant, as
+    `hox get jobs` reports them. Results are cached (for poll_after_seconds
+    in the manifest view), which grows while nothing changes, so many
+    pollers share one hox call; a new import resets it.
 
     Args:
         profile: Optional Hox CLI profile name
+        manifest_name: Optional manifest to scope the status to
 
     Returns:
-        JSON with job statuses
+        JSON with job statuses (or per-manifest counts) and poll_after_seconds
 
-    Example:
+    Examples:
         get_import_status()
+        get_import_status(manifest_name="mdd_rnaseq_v1")
     """
-    result = _run_hox(["get", "jobs"], profile)
+    if manifest_name:
+        try:
+            version = _manifest_path(manifest_name).stat().st_mtime_ns
+        except FileNotFoundError:
+            version = None
+        status = _cached_status(
+            ("manifest", manifest_name, profile),
+            lambda: _manifest_import_status(manifest_name, profile),
+            version,
+        )
+        return json.dumps(status, indent=2, default=str)
 
-    if not result["ok"]:
-        return json.dumps({"error": result["error"]})
+    def fetch():
+        result = _run_hox(["get", "jobs"], profile)
+        if not result["ok"]:
+            return {"error": result["error"]}, None
+        return {"jobs": result["data"]}, json.dumps(result["data"], sort_keys=True, default=str)
 
-    return json.dumps(result["data"], indent=2, default=str)
+    # The tenant listing keeps the shape of `hox get jobs`; caching only shares the call
+    status = _cached_status(("tenant", profile), fetch)
+    if "error" in status:
+        return json.dumps({"error": status["error"]})
+    return json.dumps(status["jobs"], indent=2, default=str)
 
 
 if __name__ == "__main__":
-    mcp.run()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hox Bio MCP server")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http", "sse"],
+                        default=os.environ.get("HOX_MCP_TRANSPORT", "stdio"),
+                        help="stdio (one client per process, default) or streamable-http: one long-running "
+                             "process shared by many clients (caches, NCBI rate limiter and hox call cap included)")
+    parser.add_argument("--host", default=os.environ.get("HOX_MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("HOX_MCP_PORT", "8001")))
+    parser.add_argument("--stateless", action="store_true",
+                        help="no per-client MCP sessions (for running several replicas behind a load balancer)")
+    opts = parser.parse_args()
+
+    mcp.settings.host = opts.host
+    mcp.settings.port = opts.port
+    mcp.settings.stateless_http = opts.stateless
+    _migrate_manifests()
+    _resume_orphaned_imports()
+    mcp.run(transport=opts.transport)
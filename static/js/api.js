@@ -2,23 +2,80 @@
  * API client for the Manifest Curator backend.
  */
 const API = {
+  // Runs per /api/runs page when loading a study incrementally
+  RUN_PAGE_SIZE: 2000,
+
+  /** Search results come from ResponseCache when a recent copy exists (data.cached is then set) */
   async search(query, database = 'sra', organism = 'Homo sapiens', limit = 20, year = '') {
     const params = new URLSearchParams({ query, database, organism, limit });
     if (year) params.append('year', year);
+    const key = `search?${params}`;
+    const cached = await ResponseCache.get(key);
+    if (cached) return { ...cached, cached: true };
+
+    const resp = await fetch(`/api/search?${params}`);
+    const data = await resp.json();
+    if (!data.error) ResponseCache.set(key, data, ResponseCache.TTL.search);
+    return data;
+  },
+
+  async searchFacets(query, database = 'sra', facets = 'strategy,year', organism = 'Homo sapiens', year = '') {
+    const params = new URLSearchParams({ query, database, organism, facets });
+    if (year) params.append('year', year);
     const resp = await fetch(`/api/search?${params}`);
     return resp.json();
   },
 
+  async searchLocal(query, kind = 'study', limit = 20, includeLive = false) {
+    const params = new URLSearchParams({ query, kind, limit, include_live: includeLive });
+    const resp = await fetch(`/api/search/local?${params}`);
+    return resp.json();
+  },
+
   async getStudyInfo(accession) {
     const resp = await fetch(`/api/study/${encodeURIComponent(accession)}`);
     return resp.json();
   },
 
-  async listRuns(studyAccession) {
-    const resp = await fetch(`/api/runs/${encodeURIComponent(studyAccession)}`);
+  /** filters: { strategy, source, platform, min_spots, max_spots, min_bases, max_bases, accession_pattern, fields } */
+  async listRuns(studyAccession, filters = {}) {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([k, v]) => {
+      if (v !== null && v !== undefined && v !== '') params.append(k, v);
+    });
+    const qs = params.toString() ? `?${params}` : '';
+    const resp = await fetch(`/api/runs/${encodeURIComponent(studyAccession)}${qs}`);
     return resp.json();
   },
 
+  /**
+   * Load all runs of a study a page at a time; onPage(runs, data) gets each
+   * page as it arrives. A cached run list is delivered as a single page.
+   * Resolves to the last page's data with every run under .runs.
+   */
+  async listRunsPaged(studyAccession, onPage) {
+    const key = `runs/${studyAccession}`;
+    const cached = await ResponseCache.get(key);
+    if (cached) {
+      onPage(cached.runs, { ...cached, cached: true });
+      return { ...cached, cached: true };
+    }
+
+    const runs = [];
+    let data = {};
+    let offset = 0;
+    while (offset !== null && offset !== undefined) {
+      data = await this.listRuns(studyAccession, { offset, limit: this.RUN_PAGE_SIZE });
+      if (data.error) return data;
+      runs.push(...(data.runs || []));
+      onPage(data.runs || [], data);
+      offset = data.next_offset;
+    }
+    const result = { study: data.study, total_runs: data.total_runs, runs };
+    if (runs.length) ResponseCache.set(key, result, ResponseCache.TTL.runs);
+    return result;
+  },
+
   async getFileUrls(accession) {
     const resp = await fetch(`/api/files/${encodeURIComponent(accession)}`);
     return resp.json();
@@ -62,9 +119,12 @@ const API = {
     return resp.json();
   },
 
-  async getImportStatus(profile = null) {
-    const params = profile ? `?profile=${encodeURIComponent(profile)}` : '';
-    const resp = await fetch(`/api/import-status${params}`);
+  async getImportStatus(profile = null, manifest = null) {
+    const params = new URLSearchParams();
+    if (profile) params.set('profile', profile);
+    if (manifest) params.set('manifest', manifest);
+    const qs = params.toString() ? `?${params}` : '';
+    const resp = await fetch(`/api/import-status${qs}`);
     return resp.json();
   },
 };
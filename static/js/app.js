@@ -6,6 +6,7 @@
   const $console = document.getElementById('console-lines');
   const $searchInput = document.getElementById('search-input');
   const $btnSearch = document.getElementById('btn-search');
+  const $btnCounts = document.getElementById('btn-counts');
   const $dbChips = document.getElementById('db-chips');
   const $results = document.getElementById('results');
   const $yearFilter = document.getElementById('year-filter');
@@ -23,6 +24,12 @@
   const $btnDismissApproval = document.getElementById('btn-dismiss-approval');
   const $btnManifests = document.getElementById('btn-manifests');
 
+  // Virtualized run table of the expanded study
+  let runList = null;
+  let runListStudy = null;
+  // Staged study accession -> { rows: runs listed when the modal opened, checked: Set of run accessions }
+  let stagedRows = {};
+
   // --- Init ---
   logInfo('NCBI SRA Manifest Curator ready.');
   logInfo('Select a database, enter a query, and press Search.');
@@ -57,11 +64,12 @@
 
     try {
       const data = await API.search(query, State.database, 'Homo sapiens', 20, year);
+      if (data.cached) logInfo('(cached results)');
       let studies = data.studies || [];
 
       // Client-side filter for "has reads" (SRA dedup already done server-side)
       if (hasReadsOnly) {
-        studies = studies.filter(s => (s.runs || 0) > 0);
+        studies = studies.filter(s => (s.runs || s.sra_runs || 0) > 0);
       }
 
       State.searchResults = studies;
@@ -83,6 +91,49 @@
     }
   }
 
+  // --- Facet counts (count-only, no summaries fetched) ---
+  $btnCounts.addEventListener('click', doCounts);
+
+  async function doCounts() {
+    const query = $searchInput.value.trim();
+    if (!query) return;
+
+    const year = $yearFilter.value;
+    // Strategy is SRA-only; for GEO break down by year alone
+    const facets = State.database === 'sra' ? (year ? 'strategy' : 'strategy,year') : 'year';
+    logCmd(`search "${query}" --db=${State.database} --facets=${facets}${year ? ' --year=' + year : ''}`);
+    $btnCounts.disabled = true;
+
+    try {
+      const data = await API.searchFacets(query, State.database, facets, 'Homo sapiens', year);
+      if (data.error) {
+        logError(`Counts failed: ${data.error}`);
+        return;
+      }
+      logInfo(`${formatNumber(data.total_found)} total matches`);
+      if (data.counts) {
+        const line = Object.entries(data.counts)
+          .filter(([, n]) => n)
+          .map(([value, n]) => `${value}: ${formatNumber(n)}`)
+          .join('  ');
+        logInfo(line || 'No matches for any facet value');
+      } else if (data.matrix) {
+        data.rows.forEach((row, i) => {
+          if (!data.row_totals[i]) return;
+          const cells = data.cols
+            .map((col, j) => data.matrix[i][j] ? `${col}: ${formatNumber(data.matrix[i][j])}` : '')
+            .filter(Boolean)
+            .join('  ');
+          logInfo(`${row} (${formatNumber(data.row_totals[i])}) — ${cells}`);
+        });
+      }
+    } catch (err) {
+      logError(`Counts failed: ${err.message}`);
+    } finally {
+      $btnCounts.disabled = false;
+    }
+  }
+
   // --- Results event delegation ---
   $results.addEventListener('click', (e) => {
     // Expand / Collapse
@@ -143,7 +194,7 @@
       } else {
         State.selectedRuns[study].clear();
       }
-      renderResults();
+      if (runList && runListStudy === study) runList.refresh();
       return;
     }
   });
@@ -162,21 +213,33 @@
     renderResults(); // shows spinner
 
     if (!State.studyRuns[acc]) {
-      logCmd(`list_runs("${acc}")`);
+      // GEO results carry their linked SRA study; list runs from that directly
+      const study = State.searchResults.find(s => (s.accession || s.experiment) === acc) || {};
+      const runsAcc = study.sra_study || acc;
+      logCmd(`list_runs("${runsAcc}")`);
       try {
-        const data = await API.listRuns(acc);
-        const runs = data.runs || [];
-        if (runs.length > 0) {
-          State.studyRuns[acc] = runs;
-          State.selectedRuns[acc] = new Set(runs.map(r => r.accession));
-          logInfo(`${runs.length} runs loaded for ${acc}`);
-        } else {
-          throw new Error('No runs from API');
-        }
+        // Pages are shown as they arrive, so large studies are usable right away
+        const data = await API.listRunsPaged(runsAcc, (page, pageData) => {
+          if (!State.studyRuns[acc]) {
+            State.studyRuns[acc] = [];
+            State.selectedRuns[acc] = new Set();
+          }
+          State.studyRuns[acc].push(...page);
+          page.forEach(r => State.selectedRuns[acc].add(r.accession));
+          State.studyRunTotals[acc] = pageData.matched ?? pageData.total_runs;
+          showLoadedRuns(acc);
+        });
+        if (data.error) throw new Error(data.error);
+        if (!(data.runs || []).length) throw new Error('No runs from API');
+        logInfo(`${data.runs.length} runs loaded for ${acc}${data.cached ? ' (cached)' : ''}`);
       } catch (err) {
         // Fallback: use experiment accessions from search results
         const exps = (State.searchExperiments || {})[acc] || [];
-        if (exps.length > 0) {
+        const loaded = (State.studyRuns[acc] || []).length;
+        if (loaded > 0) {
+          logError(`Loading runs stopped after ${loaded}: ${err.message}`);
+          State.studyRunTotals[acc] = loaded;
+        } else if (exps.length > 0) {
           const runs = exps.map(e => ({ accession: e, sample: '', strategy: '', source: '', platform: '' }));
           State.studyRuns[acc] = runs;
           State.selectedRuns[acc] = new Set(exps);
@@ -187,7 +250,21 @@
         }
       }
     }
-    renderResults();
+    showLoadedRuns(acc);
+  }
+
+  /** Grow the open run table in place as pages arrive (full render the first time) */
+  function showLoadedRuns(acc) {
+    if (State.expandedStudy !== acc) return;
+    if (!runList || runListStudy !== acc) {
+      renderResults();
+      return;
+    }
+    const runs = State.studyRuns[acc] || [];
+    runList.setCount(runs.length);
+    const $count = $results.querySelector('.runs-count');
+    if ($count) $count.textContent = Components.runsCountText(runs.length, State.studyRunTotals[acc]);
+    updateSelectAll(acc);
   }
 
   function renderResults() {
@@ -195,8 +272,22 @@
       State.searchResults,
       State.expandedStudy,
       State.studyRuns,
-      State.selectedRuns
+      State.selectedRuns,
+      State.studyRunTotals
     );
+
+    runList = null;
+    runListStudy = null;
+    const $list = $results.querySelector('.runs-list');
+    if ($list) {
+      const study = $list.dataset.study;
+      runListStudy = study;
+      runList = new VirtualList($list, {
+        count: State.studyRuns[study].length,
+        rowHeight: Components.RUN_ROW_HEIGHT,
+        renderRow: i => Components.renderRunRow(study, State.studyRuns[study][i], State.selectedRuns[study] || new Set()),
+      });
+    }
   }
 
   // --- Staged Banner ---
@@ -240,10 +331,15 @@
       const acc = e.target.dataset.accession;
       const run = e.target.dataset.run;
       const study = State.staged.find(s => s.accession === acc);
-      if (!study) return;
+      const listed = stagedRows[acc];
+      if (!study || !listed) return;
       if (e.target.checked) {
-        if (!study.runs.includes(run)) study.runs.push(run);
+        if (!listed.checked.has(run)) {
+          listed.checked.add(run);
+          study.runs.push(listed.rows.find(r => (typeof r === 'string' ? r : r.accession) === run) || run);
+        }
       } else {
+        listed.checked.delete(run);
         study.runs = study.runs.filter(r => (typeof r === 'string' ? r : r.accession) !== run);
         // Remove study entirely if no runs left
         if (study.runs.length === 0) {
@@ -257,6 +353,23 @@
 
   function renderStagedModal() {
     $stagedStudies.innerHTML = Components.renderStagedStudies(State.staged);
+
+    // Unchecked runs stay listed (unchecked) until the modal is re-rendered
+    stagedRows = {};
+    $stagedStudies.querySelectorAll('.staged-run-list').forEach($list => {
+      const acc = $list.dataset.accession;
+      const study = State.staged.find(s => s.accession === acc);
+      const rows = [...study.runs];
+      stagedRows[acc] = { rows, checked: new Set(rows.map(r => typeof r === 'string' ? r : r.accession)) };
+      new VirtualList($list, {
+        count: rows.length,
+        rowHeight: Components.STAGED_ROW_HEIGHT,
+        renderRow: i => {
+          const r = rows[i];
+          return Components.renderStagedRun(acc, r, stagedRows[acc].checked.has(typeof r === 'string' ? r : r.accession));
+        },
+      });
+    });
   }
 
   // --- Approve ---
@@ -358,9 +471,9 @@
       if (result.error) {
         logError(`Import error: ${result.error}`);
       } else {
-        logInfo(`Import started: ${result.started} runs queued, ${result.failed} failed`);
+        logInfo(`Import started: ${result.started} runs queued, ${result.linked || 0} already in HOX (linked), ${result.skipped || 0} skipped, ${result.failed} failed`);
         // Poll status
-        pollImportStatus();
+        pollImportStatus(name);
       }
     } catch (err) {
       logError(`Import failed: ${err.message}`);
@@ -370,11 +483,24 @@
     }
   });
 
-  async function pollImportStatus() {
-    logCmd('get_import_status()');
+  // Poll a manifest's import status, waiting as long as the server suggests
+  // (poll_after_seconds grows while nothing changes)
+  async function pollImportStatus(name) {
+    logCmd(`get_import_status(manifest_name="${name}")`);
     try {
-      const status = await API.getImportStatus();
-      logInfo(`Import status: ${JSON.stringify(status).substring(0, 200)}`);
+      const status = await API.getImportStatus(null, name);
+      if (status.error) {
+        logError(`Status check failed: ${status.error}`);
+        return;
+      }
+      const c = status.counts || {};
+      logInfo(`Import ${name}: ${status.percent_complete}% complete (${c.done || 0} done, ${c.linked || 0} linked, ${c.running || 0} running, ${c.queued || 0} queued, ${c.failed || 0} failed${c.stalled ? `, ${c.stalled} stalled` : ''})`);
+      if (status.scheduler === 'stalled') {
+        logError(`Import scheduler stalled: ${status.stalled_reason}`);
+      }
+      if ((c.running || 0) + (c.queued || 0) + (c.unknown || 0) > 0) {
+        setTimeout(() => pollImportStatus(name), (status.poll_after_seconds || 30) * 1000);
+      }
     } catch (err) {
       logError(`Status check failed: ${err.message}`);
     }
@@ -447,7 +573,8 @@
         if (result.error) {
           logError(`Import error: ${result.error}`);
         } else {
-          logInfo(`Import started: ${result.started} runs queued, ${result.failed} failed`);
+          logInfo(`Import started: ${result.started} runs queued, ${result.linked || 0} already in HOX (linked), ${result.skipped || 0} skipped, ${result.failed} failed`);
+          pollImportStatus(name);
         }
       } catch (err) {
         logError(`Import failed: ${err.message}`);
@@ -456,11 +583,12 @@
       return;
     }
 
-    // Export JSON
+    // Export JSON / CSV (streamed by the server)
     const btnExport = e.target.closest('.manifest-action-export');
     if (btnExport) {
       const name = btnExport.dataset.name;
-      window.open(`/api/manifests/${encodeURIComponent(name)}/export`, '_blank');
+      const format = btnExport.dataset.format || 'json';
+      window.open(`/api/manifests/${encodeURIComponent(name)}/export?format=${format}`, '_blank');
       return;
     }
   });
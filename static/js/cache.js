@@ -0,0 +1,81 @@
+/**
+ * IndexedDB cache of API responses (search results, study run lists).
+ *
+ * Entries expire after a per-entry TTL. Where IndexedDB isn't available
+ * (private windows, old browsers) every lookup misses and writes are dropped,
+ * so callers always fall back to the network.
+ */
+const ResponseCache = {
+  DB_NAME: 'hox-curator',
+  STORE: 'responses',
+  VERSION: 1,
+
+  // TTLs in milliseconds by kind of response
+  TTL: {
+    search: 10 * 60 * 1000,
+    runs: 60 * 60 * 1000,
+  },
+
+  _db: null,
+
+  /** Open (once) the database; resolves to null when unavailable */
+  open() {
+    if (!this._db) {
+      this._db = new Promise((resolve) => {
+        if (!window.indexedDB) { resolve(null); return; }
+        const req = indexedDB.open(this.DB_NAME, this.VERSION);
+        req.onupgradeneeded = () => {
+          const store = req.result.createObjectStore(this.STORE, { keyPath: 'key' });
+          store.createIndex('expires', 'expires');
+        };
+        req.onsuccess = () => {
+          this._prune(req.result);
+          resolve(req.result);
+        };
+        req.onerror = () => resolve(null);
+        req.onblocked = () => resolve(null);
+      });
+    }
+    return this._db;
+  },
+
+  /** Cached value for key, or null if missing/expired */
+  async get(key) {
+    const db = await this.open();
+    if (!db) return null;
+    return new Promise((resolve) => {
+      const req = db.transaction(this.STORE).objectStore(this.STORE).get(key);
+      req.onsuccess = () => {
+        const entry = req.result;
+        resolve(entry && entry.expires > Date.now() ? entry.value : null);
+      };
+      req.onerror = () => resolve(null);
+    });
+  },
+
+  /** Store value under key for ttl milliseconds */
+  async set(key, value, ttl) {
+    const db = await this.open();
+    if (!db) return;
+    return new Promise((resolve) => {
+      const tx = db.transaction(this.STORE, 'readwrite');
+      tx.objectStore(this.STORE).put({ key, value, expires: Date.now() + ttl });
+      tx.oncomplete = () => resolve();
+      tx.onerror = () => resolve();  // e.g. quota exceeded: just don't cache
+      tx.onabort = () => resolve();
+    });
+  },
+
+  /** Delete expired entries */
+  _prune(db) {
+    const range = IDBKeyRange.upperBound(Date.now());
+    const req = db.transaction(this.STORE, 'readwrite').objectStore(this.STORE).index('expires').openCursor(range);
+    req.onsuccess = () => {
+      const cursor = req.result;
+      if (cursor) {
+        cursor.delete();
+        cursor.continue();
+      }
+    };
+  },
+};
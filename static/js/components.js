@@ -3,6 +3,10 @@
  */
 const Components = {
 
+  // Fixed row heights (px) of virtualized lists; must match style.css
+  RUN_ROW_HEIGHT: 30,
+  STAGED_ROW_HEIGHT: 22,
+
   /** Render console panel lines */
   renderConsole(history) {
     return history.map(entry => {
@@ -13,24 +17,25 @@ const Components = {
   },
 
   /** Render a single study card */
-  renderStudyCard(study, isExpanded, runs, selectedRuns) {
+  renderStudyCard(study, isExpanded, runs, selectedRuns, runTotal) {
     const acc = study.accession || study.experiment || '—';
     const title = study.title || '—';
     const summary = study.summary || '';
     const organism = study.organism || '';
     const platform = study.platform || study.strategy || '';
     const date = study.date || '';
-    const runCount = study.runs || study.samples || '';
+    const runCount = study.runs || study.sra_runs || study.samples || '';
 
     let metaParts = [];
     if (organism) metaParts.push(organism);
     if (platform) metaParts.push(platform);
     if (date) metaParts.push(date);
     if (runCount) metaParts.push(`${runCount} runs`);
+    if (study.sra_study && study.sra_study !== acc) metaParts.push(study.sra_study);
 
     let runsHtml = '';
     if (isExpanded && runs) {
-      runsHtml = this.renderRunsSection(acc, runs, selectedRuns);
+      runsHtml = this.renderRunsSection(acc, runs, selectedRuns, runTotal);
     } else if (isExpanded) {
       runsHtml = `<div class="runs-section"><div class="loading-msg"><span class="spinner"></span> Loading runs...</div></div>`;
     }
@@ -51,8 +56,12 @@ const Components = {
       </div>`;
   },
 
-  /** Render runs section within a study card */
-  renderRunsSection(studyAcc, runs, selectedRuns) {
+  /**
+   * Render runs section within a study card. The rows themselves are drawn
+   * by a VirtualList mounted on .runs-list (see app.js); total is the run
+   * count the server reported, larger than runs.length while pages load.
+   */
+  renderRunsSection(studyAcc, runs, selectedRuns, total) {
     if (!runs || runs.length === 0) {
       return `<div class="runs-section"><span class="text-muted" style="font-size:12px">No runs found</span></div>`;
     }
@@ -62,41 +71,53 @@ const Components = {
 
     const header = `
       <div class="runs-header">
-        <span>${runs.length} run${runs.length > 1 ? 's' : ''}</span>
+        <span class="runs-count">${this.runsCountText(runs.length, total)}</span>
         <label style="font-size:12px;cursor:pointer;color:var(--text-muted)">
           <input type="checkbox" class="toggle-all-runs" data-study="${escapeAttr(studyAcc)}" ${allSelected ? 'checked' : ''}> Select All
         </label>
       </div>`;
 
-    const rows = runs.map(run => {
-      const checked = selected.has(run.accession) ? 'checked' : '';
-      const details = [run.strategy, run.source, run.platform].filter(Boolean).join(' / ');
-      const sample = run.sample || '';
-      return `
-        <div class="run-row">
-          <input type="checkbox" class="run-checkbox" data-study="${escapeAttr(studyAcc)}" data-run="${escapeAttr(run.accession)}" ${checked}>
-          <span class="run-acc">${escapeHtml(run.accession)}</span>
-          <span class="run-detail">${escapeHtml(details || '—')}</span>
-          ${sample ? `<span class="run-detail-sep">|</span><span class="run-detail">${escapeHtml(sample)}</span>` : ''}
-        </div>`;
-    }).join('');
+    return `<div class="runs-section">${header}<div class="virtual-list runs-list" data-study="${escapeAttr(studyAcc)}"></div></div>`;
+  },
+
+  /** "1,234 runs", or "2,000 of 20,000 runs (loading...)" while pages arrive */
+  runsCountText(loaded, total) {
+    if (total && loaded < total) {
+      return `${loaded.toLocaleString()} of ${total.toLocaleString()} runs (loading...)`;
+    }
+    return `${loaded.toLocaleString()} run${loaded !== 1 ? 's' : ''}`;
+  },
 
-    return `<div class="runs-section">${header}${rows}</div>`;
+  /** Render one row of a study's run table */
+  renderRunRow(studyAcc, run, selected) {
+    const checked = selected.has(run.accession) ? 'checked' : '';
+    const details = [run.strategy, run.source, run.platform].filter(Boolean).join(' / ');
+    const sample = run.sample || '';
+    return `
+      <div class="run-row">
+        <input type="checkbox" class="run-checkbox" data-study="${escapeAttr(studyAcc)}" data-run="${escapeAttr(run.accession)}" ${checked}>
+        <span class="run-acc">${escapeHtml(run.accession)}</span>
+        <span class="run-detail">${escapeHtml(details || '—')}</span>
+        ${sample ? `<span class="run-detail-sep">|</span><span class="run-detail">${escapeHtml(sample)}</span>` : ''}
+      </div>`;
   },
 
   /** Render all study cards */
-  renderResults(studies, expandedStudy, studyRuns, selectedRuns) {
+  renderResults(studies, expandedStudy, studyRuns, selectedRuns, studyRunTotals = {}) {
     if (!studies || studies.length === 0) return '';
     return studies.map(study => {
       const acc = study.accession || study.experiment || '';
       const isExpanded = expandedStudy === acc;
       const runs = studyRuns[acc] || null;
       const selected = selectedRuns[acc] || new Set();
-      return this.renderStudyCard(study, isExpanded, runs, selected);
+      return this.renderStudyCard(study, isExpanded, runs, selected, studyRunTotals[acc]);
     }).join('');
   },
 
-  /** Render staged studies inside the manifest modal */
+  /**
+   * Render staged studies inside the manifest modal. Each study's runs are
+   * drawn by a VirtualList mounted on its .staged-run-list (see app.js).
+   */
   renderStagedStudies(staged) {
     if (staged.length === 0) {
       return `<div class="text-muted" style="padding:16px 0;text-align:center;font-size:13px">No studies staged yet. Search and add runs first.</div>`;
@@ -125,19 +146,20 @@ const Components = {
           <button class="staged-study-remove" data-accession="${escapeAttr(s.accession)}" title="Remove study">&#128465;</button>
         </div>
         <div class="staged-study-meta">${escapeHtml(studyMeta)}</div>
-        <div class="staged-run-list">
-          ${s.runs.map(r => {
-            const acc = typeof r === 'string' ? r : r.accession;
-            const spots = r.spots ? formatNumber(parseInt(r.spots)) + ' spots' : '';
-            const bases = r.bases ? formatSize(parseInt(r.bases)) : '';
-            const meta = [r.strategy || '', spots, bases].filter(Boolean).join(' · ');
-            return `<div class="staged-run"><label><input type="checkbox" class="staged-run-checkbox" data-accession="${escapeAttr(s.accession)}" data-run="${escapeAttr(acc)}" checked> <span class="run-acc">${escapeHtml(acc)}</span>${meta ? `<span class="run-detail">${escapeHtml(meta)}</span>` : ''}</label></div>`;
-          }).join('')}
-        </div>
+        <div class="virtual-list staged-run-list" data-accession="${escapeAttr(s.accession)}"></div>
       </div>`;
     }).join('');
   },
 
+  /** Render one staged run row in the manifest modal */
+  renderStagedRun(studyAcc, r, checked) {
+    const acc = typeof r === 'string' ? r : r.accession;
+    const spots = r.spots ? formatNumber(parseInt(r.spots)) + ' spots' : '';
+    const bases = r.bases ? formatSize(parseInt(r.bases)) : '';
+    const meta = [r.strategy || '', spots, bases].filter(Boolean).join(' · ');
+    return `<div class="staged-run"><label><input type="checkbox" class="staged-run-checkbox" data-accession="${escapeAttr(studyAcc)}" data-run="${escapeAttr(acc)}" ${checked ? 'checked' : ''}> <span class="run-acc">${escapeHtml(acc)}</span>${meta ? `<span class="run-detail">${escapeHtml(meta)}</span>` : ''}</label></div>`;
+  },
+
   /** Render manifests list */
   renderManifestsList(manifests) {
     if (!manifests || manifests.length === 0) {
@@ -158,7 +180,8 @@ const Components = {
       } else if (m.status === 'importing') {
         actions = `<span class="text-muted" style="font-size:12px"><span class="spinner"></span> Importing...</span>`;
       }
-      actions += ` <button class="btn btn-sm btn-outline manifest-action-export" data-name="${escapeAttr(m.name)}">Export JSON</button>`;
+      actions += ` <button class="btn btn-sm btn-outline manifest-action-export" data-name="${escapeAttr(m.name)}" data-format="json">Export JSON</button>`;
+      actions += ` <button class="btn btn-sm btn-outline manifest-action-export" data-name="${escapeAttr(m.name)}" data-format="csv">Export CSV</button>`;
 
       return `
       <div class="manifest-card">
@@ -178,6 +201,67 @@ const Components = {
   },
 };
 
+/**
+ * Windowed list: only the rows in (or near) view are in the DOM, so a
+ * 20k-run table costs as much to draw as a 20-run one. Rows must all be
+ * rowHeight pixels tall. renderRow(i) returns the HTML of row i.
+ */
+class VirtualList {
+  constructor(viewport, { count, rowHeight, renderRow, overscan = 10 }) {
+    this.viewport = viewport;
+    this.rowHeight = rowHeight;
+    this.renderRow = renderRow;
+    this.overscan = overscan;
+    this.count = 0;
+    this.range = null;
+    this.frame = null;
+
+    this.spacer = document.createElement('div');
+    this.spacer.className = 'virtual-spacer';
+    this.window = document.createElement('div');
+    this.window.className = 'virtual-window';
+    this.spacer.appendChild(this.window);
+    viewport.appendChild(this.spacer);
+
+    viewport.addEventListener('scroll', () => {
+      if (this.frame === null) {
+        this.frame = requestAnimationFrame(() => {
+          this.frame = null;
+          this.draw();
+        });
+      }
+    });
+    this.setCount(count);
+  }
+
+  /** Rows were appended (or removed): resize the scroll area and redraw */
+  setCount(count) {
+    this.count = count;
+    this.spacer.style.height = `${count * this.rowHeight}px`;
+    this.refresh();
+  }
+
+  /** Redraw the visible rows, e.g. after their selection changed */
+  refresh() {
+    this.range = null;
+    this.draw();
+  }
+
+  draw() {
+    const top = this.viewport.scrollTop;
+    const height = this.viewport.clientHeight || this.rowHeight * 20;
+    const start = Math.max(0, Math.floor(top / this.rowHeight) - this.overscan);
+    const end = Math.min(this.count, Math.ceil((top + height) / this.rowHeight) + this.overscan);
+    if (this.range && this.range[0] === start && this.range[1] === end) return;
+    this.range = [start, end];
+
+    const rows = [];
+    for (let i = start; i < end; i++) rows.push(this.renderRow(i));
+    this.window.style.transform = `translateY(${start * this.rowHeight}px)`;
+    this.window.innerHTML = rows.join('');
+  }
+}
+
 /* Utility: escape HTML */
 function escapeHtml(str) {
   const div = document.createElement('div');
@@ -11,6 +11,9 @@ const State = {
   // Map of study accession -> runs array (loaded on expand)
   studyRuns: {},
 
+  // Map of study accession -> run count reported by the server (runs load in pages)
+  studyRunTotals: {},
+
   // Map of study accession -> Set of selected run accessions
   selectedRuns: {},
 
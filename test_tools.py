@@ -13,8 +13,11 @@ import json
 
 # Import tools directly from main
 from main import (
+    search_local,
+    harvest_slice,
     get_study_info,
     list_runs,
+    get_sample_attributes,
     create_manifest,
     list_manifests,
     approve_manifest,
@@ -23,8 +26,11 @@ from main import (
 )
 
 TOOLS = {
+    "search_local": search_local,
+    "harvest_slice": harvest_slice,
     "get_study_info": get_study_info,
     "list_runs": list_runs,
+    "get_sample_attributes": get_sample_attributes,
     "create_manifest": create_manifest,
     "list_manifests": list_manifests,
     "approve_manifest": approve_manifest,
@@ -2,30 +2,250 @@
 FastAPI web app wrapping the MCP tool functions.
 Serves a vanilla JS frontend for the NCBI SRA Manifest Curator.
 """
+import csv
+import hashlib
+import io
+import ipaddress
 import json
-from datetime import datetime
-from pathlib import Path
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from typing import Optional, List
 
-from fastapi import FastAPI, Query
+import anyio.to_thread
+from fastapi import FastAPI, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, field_validator
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
 
 from main import (
     search_studies,
+    search_local,
+    harvest_slice,
     get_study_info,
     list_runs,
     get_file_urls,
+    get_sample_attributes,
     list_manifests,
     approve_manifest,
+    refresh_manifest,
     import_to_hox,
     get_import_status,
-    MANIFEST_DIR,
-    _parse_tags,
+    _new_manifest,
+    _harvest_slices,
+    _load_manifest,
+    _save_manifest,
+    _manifest_lock,
+    _entry_runs,
+    _manifest_stamp,
+    _resume_orphaned_imports,
+    _migrate_manifests,
+    _is_error_result,
+    METRICS,
+    _span,
+    _profile_request,
 )
 
-app = FastAPI(title="NCBI SRA Manifest Curator")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Convert large JSON manifests, then carry on with manifest imports whose
+    # scheduler died with a previous process
+    await anyio.to_thread.run_sync(_migrate_manifests)
+    await anyio.to_thread.run_sync(_resume_orphaned_imports)
+    yield
+
+
+app = FastAPI(title="NCBI SRA Manifest Curator", lifespan=lifespan)
+
+# ?_profile=1 turns on tracemalloc and the stack sampler for a request, so it
+# is honoured only with HOX_WEB_PROFILE=1 and only for loopback clients
+WEB_PROFILE = os.environ.get("HOX_WEB_PROFILE", "") == "1"
+
+
+def _profiling_allowed(request: Request) -> bool:
+    if not WEB_PROFILE or request.client is None:
+        return False
+    try:
+        return ipaddress.ip_address(request.client.host).is_loopback
+    except ValueError:
+        return False
+
+
+METRICS.describe("hox_http_requests_total", "HTTP requests by route template, method and status")
+METRICS.describe("hox_http_request_seconds", "HTTP latency in seconds, until the response starts")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route metrics, and the root span that tool spans of this request nest under.
+
+    ?_profile=1 profiles the tool calls the route makes (see main.profile_tool);
+    the report directories come back in an X-Hox-Profile header. Ignored
+    unless _profiling_allowed().
+    """
+    start = time.perf_counter()
+    status = 500
+    profiles = [] if request.query_params.get("_profile") == "1" and _profiling_allowed(request) else None
+    profile_token = _profile_request.set(profiles)
+    with _span("http", kind="server", method=request.method, target=request.url.path) as span:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            if profiles:
+                response.headers["X-Hox-Profile"] = ",".join(str(p) for p in profiles)
+            return response
+        finally:
+            _profile_request.reset(profile_token)
+            # Route templates keep label cardinality bounded; mounts don't set one
+            route = request.scope.get("route")
+            path = getattr(route, "path", "/static" if request.url.path.startswith("/static/") else "unmatched")
+            METRICS.observe("hox_http_request_seconds", time.perf_counter() - start, route=path, method=request.method)
+            METRICS.inc("hox_http_requests_total", route=path, method=request.method, status=str(status))
+            span.name = f"{request.method} {path}"
+            span.set(status=status)
+            if status >= 500:
+                span.fail(f"HTTP {status}")
+
+
+# --- HTTP caching and compression ---
+
+# Cache-Control by kind of resource
+CACHE_CONTROL = {
+    # Study/run/file listings of an accession rarely change once published
+    "accession": "public, max-age=600, stale-while-revalidate=86400",
+    # Manifests are edited in place: always revalidate (cheap, see _manifest_stamp)
+    "manifest": "private, no-cache",
+    "error": "no-store",
+}
+
+# Bodies smaller than this go out uncompressed
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Compressed bodies kept for the next client asking for the same content
+COMPRESSED_CACHE_BYTES = 64 * 1024 * 1024
+
+_compressed_cache = OrderedDict()  # (content hash, encoding) -> bytes
+_compressed_lock = threading.Lock()
+_compressed_size = 0
+
+# Everything else (search, import status, static files) is gzipped generically;
+# responses below that already carry a Content-Encoding are passed through
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
+
+def _accepted_encoding(request: Request) -> Optional[str]:
+    """Best encoding the client accepts: br (if installed), gzip or None."""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    return "gzip" if "gzip" in accepted else None
+
+
+def _etag(tag: str, encoding: Optional[str]) -> str:
+    """Strong ETag of one representation: compressed variants are suffixed."""
+    return f'"{tag}.{encoding}"' if encoding else f'"{tag}"'
+
+
+def _not_modified(request: Request, tag: str, headers: dict) -> Optional[Response]:
+    """A 304 if If-None-Match names any representation of tag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    held = {t.strip().removeprefix("W/").strip('"').split(".")[0] for t in header.split(",")}
+    if tag in held or "*" in held:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    """Compressed body, reused across requests for the same content."""
+    global _compressed_size
+    key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+    with _compressed_lock:
+        cached = _compressed_cache.get(key)
+        if cached is not None:
+            _compressed_cache.move_to_end(key)
+    if cached is not None:
+        METRICS.inc("hox_cache_requests_total", cache="compressed_body", result="hit")
+        return cached
+    METRICS.inc("hox_cache_requests_total", cache="compressed_body", result="miss")
+    if encoding == "br":
+        data = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        data = zlib.compress(body, GZIP_LEVEL, wbits=31)
+    with _compressed_lock:
+        if key not in _compressed_cache:
+            _compressed_cache[key] = data
+            _compressed_size += len(data)
+        while _compressed_size > COMPRESSED_CACHE_BYTES and len(_compressed_cache) > 1:
+            _compressed_size -= len(_compressed_cache.popitem(last=False)[1])
+    return data
+
+
+def _compress_stream(chunks, encoding: str):
+    """Compress a streamed body chunk by chunk."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = process(chunk.encode() if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def _json_response(request: Request, result: str, cache: str, tag: str = None) -> Response:
+    """Send a tool's JSON result compact and compressed, with validators.
+
+    tag (the ETag value) defaults to a hash of the body. Errors are sent
+    with no-store and no ETag, so a transient failure is never cached.
+    """
+    body = json.dumps(json.loads(result), separators=(",", ":"), ensure_ascii=False, default=str).encode()
+    if _is_error_result(result):
+        return Response(body, media_type="application/json", headers={"Cache-Control": CACHE_CONTROL["error"]})
+    tag = tag or hashlib.blake2b(body, digest_size=16).hexdigest()
+    encoding = _accepted_encoding(request) if len(body) >= COMPRESS_MIN_BYTES else None
+    headers = {"ETag": _etag(tag, encoding), "Cache-Control": CACHE_CONTROL[cache], "Vary": "Accept-Encoding"}
+    not_modified = _not_modified(request, tag, headers)
+    if not_modified:
+        return not_modified
+    if encoding:
+        body = _compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _manifest_validators(request: Request, name: Optional[str], variant: str = ""):
+    """(tag, headers, 304 or None) for a manifest route, checked before any loading.
+
+    tag is None when the manifest doesn't exist.
+    """
+    stamp = _manifest_stamp(name)
+    if stamp is None:
+        return None, {}, None
+    tag = f"m{stamp}{variant}"
+    encoding = _accepted_encoding(request)
+    headers = {"ETag": _etag(tag, encoding), "Cache-Control": CACHE_CONTROL["manifest"], "Vary": "Accept-Encoding"}
+    return tag, headers, _not_modified(request, tag, headers)
 
 
 # --- Pydantic models for POST bodies ---
@@ -36,8 +256,13 @@ class RunInfo(BaseModel):
     strategy: str = ""
     source: str = ""
     platform: str = ""
-    spots: str = ""
-    bases: str = ""
+    spots: int = 0
+    bases: int = 0
+
+    @field_validator("spots", "bases", mode="before")
+    @classmethod
+    def _blank_as_zero(cls, value):
+        return value or 0
 
 
 class StagedStudy(BaseModel):
@@ -53,9 +278,26 @@ class ManifestCreate(BaseModel):
     tags: Optional[str] = None
 
 
+class HarvestRequest(BaseModel):
+    query: str = ""
+    organism: str = "Homo sapiens"
+    start_year: int = 2008
+    window_days: int = 90
+    max_records: int = 20000
+
+
 class ImportRequest(BaseModel):
     set_name: Optional[str] = None
     profile: Optional[str] = None
+    dedup: bool = True
+    order: str = "manifest"
+    max_in_flight_gb: Optional[float] = None
+    max_concurrent: Optional[int] = None
+    tag: bool = True
+
+
+class RefreshRequest(BaseModel):
+    apply: Optional[str] = None
 
 
 # --- API routes (sync def so FastAPI threads them) ---
@@ -67,39 +309,109 @@ def api_search(
     organism: str = "Homo sapiens",
     limit: int = 20,
     year: Optional[str] = None,
+    facets: Optional[str] = None,
+    facet_organisms: Optional[str] = None,
 ):
-    result = search_studies(query, database=database, organism=organism, limit=limit, year=year)
+    result = search_studies(
+        query, database=database, organism=organism, limit=limit, year=year,
+        facets=facets, facet_organisms=facet_organisms,
+    )
     return json.loads(result)
 
 
-@app.get("/api/study/{accession}")
-def api_study(accession: str):
-    result = get_study_info(accession)
+@app.get("/api/search/local")
+def api_search_local(
+    query: str = "",
+    kind: str = "study",
+    organism: Optional[str] = None,
+    strategy: Optional[str] = None,
+    limit: int = 20,
+    include_live: bool = False,
+    database: str = "sra",
+):
+    result = search_local(
+        query, kind=kind, organism=organism, strategy=strategy,
+        limit=limit, include_live=include_live, database=database,
+    )
     return json.loads(result)
 
 
-@app.get("/api/runs/{study_accession}")
-def api_runs(study_accession: str):
-    result = list_runs(study_accession)
+@app.get("/api/harvest")
+def api_list_harvests():
+    slices = _harvest_slices()
+    return {"slices": slices, "count": len(slices)}
+
+
+@app.post("/api/harvest")
+def api_harvest(body: HarvestRequest):
+    result = harvest_slice(
+        query=body.query,
+        organism=body.organism,
+        start_year=body.start_year,
+        window_days=body.window_days,
+        max_records=body.max_records,
+    )
     return json.loads(result)
 
 
+@app.get("/api/study/{accession}")
+def api_study(request: Request, accession: str):
+    return _json_response(request, get_study_info(accession), "accession")
+
+
+@app.get("/api/runs/{study_accession}")
+def api_runs(
+    request: Request,
+    study_accession: str,
+    strategy: Optional[str] = None,
+    source: Optional[str] = None,
+    platform: Optional[str] = None,
+    min_spots: Optional[int] = None,
+    max_spots: Optional[int] = None,
+    min_bases: Optional[int] = None,
+    max_bases: Optional[int] = None,
+    accession_pattern: Optional[str] = None,
+    fields: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+):
+    result = list_runs(
+        study_accession,
+        strategy=strategy, source=source, platform=platform,
+        min_spots=min_spots, max_spots=max_spots,
+        min_bases=min_bases, max_bases=max_bases,
+        accession_pattern=accession_pattern, fields=fields,
+        offset=offset, limit=limit,
+    )
+    return _json_response(request, result, "accession")
+
+
 @app.get("/api/files/{accession}")
-def api_files(accession: str):
-    result = get_file_urls(accession)
-    return json.loads(result)
+def api_files(request: Request, accession: str):
+    return _json_response(request, get_file_urls(accession), "accession")
+
+
+@app.get("/api/samples/{study_accession}")
+def api_samples(
+    request: Request,
+    study_accession: str,
+    filters: Optional[str] = None,
+    columns: Optional[str] = None,
+    limit: int = 100,
+):
+    result = get_sample_attributes(study_accession, filters=filters, columns=columns, limit=limit)
+    return _json_response(request, result, "accession")
 
 
 @app.post("/api/manifests")
 def api_create_manifest(body: ManifestCreate):
     """Fast manifest creation — uses pre-fetched run data from the frontend."""
-    accessions = []
-    all_runs = []
+    manifest = _new_manifest(body.name, body.description, body.tags)
 
     for study in body.studies:
         run_accs = [r.accession for r in study.runs]
-        all_runs.extend(run_accs)
-        accessions.append({
+        manifest["total_runs"] += len(run_accs)
+        manifest["accessions"].append({
             "accession": study.accession,
             "title": study.title,
             "status": "ok",
@@ -112,91 +424,163 @@ def api_create_manifest(body: ManifestCreate):
             },
         })
 
-    manifest = {
-        "name": body.name,
-        "description": body.description,
-        "created_at": datetime.now().isoformat(),
-        "status": "pending",
-        "tags": _parse_tags(body.tags),
-        "accessions": accessions,
-        "total_runs": len(all_runs),
-    }
-
-    path = MANIFEST_DIR / f"{body.name}.json"
-    with open(path, "w") as f:
-        json.dump(manifest, f, indent=2, default=str)
+    with _manifest_lock:
+        path = _save_manifest(manifest)
 
     return {
         "created": body.name,
         "path": str(path),
-        "accession_count": len(accessions),
-        "total_runs": len(all_runs),
+        "accession_count": len(manifest["accessions"]),
+        "total_runs": manifest["total_runs"],
         "status": "pending",
     }
 
 
 @app.get("/api/manifests")
-def api_list_manifests(name: Optional[str] = Query(None)):
-    result = list_manifests(name=name)
-    return json.loads(result)
+def api_list_manifests(request: Request, name: Optional[str] = Query(None), include_runs: bool = False):
+    tag, _, not_modified = _manifest_validators(request, name)
+    if not_modified:
+        return not_modified
+    result = list_manifests(name=name, include_runs=include_runs)
+    return _json_response(request, result, "manifest", tag)
+
+
+@app.get("/api/manifests/{name}/samples")
+def api_manifest_samples(
+    request: Request,
+    name: str,
+    filters: Optional[str] = None,
+    columns: Optional[str] = None,
+    limit: int = 100,
+):
+    # Sample attributes come from upstream (cached), not the manifest: hash the body
+    result = get_sample_attributes(manifest_name=name, filters=filters, columns=columns, limit=limit)
+    return _json_response(request, result, "manifest")
+
+
+# Export formats: media type and file extension
+EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "tsv": ("text/tab-separated-values", "tsv"),
+    "accessions": ("text/plain", "txt"),
+}
+
+EXPORT_COLUMNS = ["study_accession", "accession", "spots", "bases", "strategy", "platform"]
+
+# Rows buffered per chunk written to the response
+EXPORT_CHUNK_ROWS = 1000
+
+
+def _export_runs(entry: dict):
+    """Run rows of one manifest entry, in export column order."""
+    study = entry.get("accession", "")
+    for r in _entry_runs(entry):
+        yield {
+            "study_accession": study,
+            "accession": r.get("accession", ""),
+            "spots": r.get("spots", ""),
+            "bases": r.get("bases", ""),
+            "strategy": r.get("strategy", ""),
+            "platform": r.get("platform", ""),
+        }
 
 
-@app.get("/api/manifests/{name}/export")
-def api_export_manifest(name: str):
-    """Export a manifest as a clean JSON for hox import iteration."""
-    from fastapi.responses import JSONResponse
+def _chunked(lines):
+    """Join lines into EXPORT_CHUNK_ROWS-sized chunks for the response body."""
+    buf = []
+    for line in lines:
+        buf.append(line)
+        if len(buf) >= EXPORT_CHUNK_ROWS:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
 
-    path = MANIFEST_DIR / f"{name}.json"
-    if not path.exists():
-        return JSONResponse({"error": f"Manifest '{name}' not found"}, status_code=404)
 
-    with open(path) as f:
-        manifest = json.load(f)
-
-    # Build a clean export: flat list of runs grouped by study
-    studies = []
-    for entry in manifest.get("accessions", []):
-        runs_data = entry.get("metadata", {}).get("runs", [])
-        study = {
-            "study_accession": entry.get("accession", ""),
-            "title": entry.get("title", entry.get("metadata", {}).get("title", "")),
-            "runs": [],
-        }
-        for r in runs_data:
-            if isinstance(r, dict):
-                study["runs"].append({
-                    "accession": r.get("accession", ""),
-                    "spots": r.get("spots", ""),
-                    "bases": r.get("bases", ""),
-                    "strategy": r.get("strategy", ""),
-                    "platform": r.get("platform", ""),
-                })
-            elif isinstance(r, str):
-                study["runs"].append({"accession": r})
-        # Fallback: if no detailed runs, use the accession list
-        if not study["runs"]:
-            for acc in entry.get("runs", []):
-                study["runs"].append({"accession": acc})
-        studies.append(study)
-
-    export = {
+def _export_json(name: str, manifest: dict):
+    """Stream the JSON export document, one run at a time.
+
+    run_accessions is written in a second pass over the entries' accession
+    lists, so nothing is accumulated in memory.
+    """
+    header = {
         "manifest": name,
         "description": manifest.get("description", ""),
         "status": manifest.get("status", ""),
         "tags": manifest.get("tags", {}),
         "total_runs": manifest.get("total_runs", 0),
-        "studies": studies,
-        "run_accessions": [
-            r["accession"] for s in studies for r in s["runs"]
-        ],
     }
-
-    return JSONResponse(
-        content=export,
-        headers={
-            "Content-Disposition": f'attachment; filename="{name}.json"',
-        },
+    yield json.dumps(header)[:-1] + ', "studies": ['
+    for i, entry in enumerate(manifest.get("accessions", [])):
+        title = entry.get("title", entry.get("metadata", {}).get("title", ""))
+        yield ("," if i else "") + json.dumps({"study_accession": entry.get("accession", ""), "title": title})[:-1]
+        yield ', "runs": ['
+        rows = (
+            ("," if j else "") + json.dumps({k: v for k, v in row.items() if k != "study_accession"})
+            for j, row in enumerate(_export_runs(entry))
+        )
+        yield from _chunked(rows)
+        yield "]}"
+    yield '], "run_accessions": ['
+    accessions = (
+        json.dumps(acc) for entry in manifest.get("accessions", []) for acc in entry.get("runs", [])
     )
+    yield from _chunked(("," if j else "") + acc for j, acc in enumerate(accessions))
+    yield "]}\n"
+
+
+def _export_lines(manifest: dict, fmt: str):
+    """Stream NDJSON, CSV/TSV run sheets or a plain accession list."""
+    entries = manifest.get("accessions", [])
+    if fmt == "accessions":
+        yield from _chunked(f"{acc}\n" for entry in entries for acc in entry.get("runs", []))
+        return
+
+    rows = (row for entry in entries for row in _export_runs(entry))
+    if fmt == "ndjson":
+        yield from _chunked(json.dumps(row) + "\n" for row in rows)
+        return
+
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS, delimiter="\t" if fmt == "tsv" else ",", lineterminator="\n")
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % EXPORT_CHUNK_ROWS == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+@app.get("/api/manifests/{name}/export")
+def api_export_manifest(request: Request, name: str, format: str = Query("json")):
+    """Stream a manifest export for hox import iteration.
+
+    format: json (studies with their runs), ndjson or csv/tsv (one run per
+    line/row), or accessions (one run accession per line).
+    """
+    if format not in EXPORT_FORMATS:
+        return JSONResponse(
+            {"error": f"Unknown format '{format}'", "formats": list(EXPORT_FORMATS)}, status_code=400
+        )
+    tag, headers, not_modified = _manifest_validators(request, name, variant=format)
+    if not_modified:
+        return not_modified
+    manifest = _load_manifest(name) if tag else None
+    if manifest is None:
+        return JSONResponse({"error": f"Manifest '{name}' not found"}, status_code=404)
+
+    media_type, ext = EXPORT_FORMATS[format]
+    body = _export_json(name, manifest) if format == "json" else _export_lines(manifest, format)
+    encoding = _accepted_encoding(request)
+    if encoding:
+        body = _compress_stream(body, encoding)
+        headers["Content-Encoding"] = encoding
+    headers["Content-Disposition"] = f'attachment; filename="{name}.{ext}"'
+    return StreamingResponse(body, media_type=media_type, headers=headers)
 
 
 @app.post("/api/manifests/{name}/approve")
@@ -205,22 +589,58 @@ def api_approve_manifest(name: str):
     return json.loads(result)
 
 
+@app.post("/api/manifests/{name}/refresh")
+def api_refresh_manifest(name: str, body: RefreshRequest = RefreshRequest()):
+    result = refresh_manifest(name, apply=body.apply)
+    return json.loads(result)
+
+
 @app.post("/api/manifests/{name}/import")
 def api_import(name: str, body: ImportRequest = ImportRequest()):
     result = import_to_hox(
         manifest_name=name,
         set_name=body.set_name,
         profile=body.profile,
+        dedup=body.dedup,
+        order=body.order,
+        max_in_flight_gb=body.max_in_flight_gb,
+        max_concurrent=body.max_concurrent,
+        tag=body.tag,
     )
     return json.loads(result)
 
 
 @app.get("/api/import-status")
-def api_import_status(profile: Optional[str] = Query(None)):
-    result = get_import_status(profile=profile)
+def api_import_status(profile: Optional[str] = Query(None), manifest: Optional[str] = Query(None)):
+    result = get_import_status(profile=profile, manifest_name=manifest)
     return json.loads(result)
 
 
+@app.get("/api/health")
+async def api_health():
+    """Liveness plus thread-pool usage (async so it answers even when the pool is full).
+
+    Sync routes each hold one token of anyio's default limiter while they run;
+    waiting > 0 means requests are queued for a worker thread.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    return {
+        "status": "ok",
+        "threadpool": {
+            "size": limiter.total_tokens,
+            "busy": stats.borrowed_tokens,
+            "waiting": stats.tasks_waiting,
+        },
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint: web routes plus everything main.py records."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
 # --- Static files & SPA fallback ---
 
 app.mount("/static", StaticFiles(directory="static"), name="static")